@@ -4,16 +4,24 @@ resilience of emergency material logistics storage and allocation systems.
 
 This library supports multiple resilience assessment methods and provides
 a unified interface for various decision-making approaches.
+
+The public names are imported on first access, so importing the package does
+not load NumPy, pandas or any assessment method.
 """
 
-from .core import (
-    DecisionMethod,
-    DecisionMethodFactory,
-    ExceptionHandler,
-    ScalingMethod,
-    ScalingMethodFactory,
-    UnifiedModel,
-)
+from typing import TYPE_CHECKING
+
+from ._lazy import lazy_package
+
+if TYPE_CHECKING:
+    from .core import (
+        DecisionMethod,
+        DecisionMethodFactory,
+        ExceptionHandler,
+        ScalingMethod,
+        ScalingMethodFactory,
+        UnifiedModel,
+    )
 
 __version__ = "1.0.0"
 __author__ = "Wenjie Xu <wenjie.xu.cn@outlook.com>"
@@ -26,3 +34,5 @@ __all__ = [
     "ScalingMethod",
     "ExceptionHandler",
 ]
+
+lazy_package(__name__, dict.fromkeys(__all__, ".core"))
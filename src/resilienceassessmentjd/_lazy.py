@@ -0,0 +1,57 @@
+# !/usr/bin/env python
+# @FileName  :_lazy.py
+# @Time      :2026/10/19 下午2:05
+# @Author    :Wenjie Xu
+# @Email     :wenjie.xu.cn@outlook.com
+
+import importlib
+import sys
+import types
+
+
+class LazyPackage(types.ModuleType):
+    """
+    A package namespace that imports its exported names on first access.
+
+    Most modules of this project share the name of the class they define
+    (``methods/VIKOR.py`` defines ``VIKOR``). The import system binds every
+    imported submodule on its package, so those bindings are replaced by the class
+    of the same name, keeping ``package.VIKOR`` the class as with eager imports.
+    """
+
+    def __getattr__(self, name):
+        exports = self.__dict__.get("_lazy_exports", {})
+        if name not in exports:
+            raise AttributeError(f"module {self.__name__!r} has no attribute {name!r}")
+        module = importlib.import_module(exports[name], self.__name__)
+        value = getattr(module, name)
+        setattr(self, name, value)
+        return value
+
+    def __setattr__(self, name, value):
+        if (
+            isinstance(value, types.ModuleType)
+            and name in self.__dict__.get("_lazy_exports", {})
+            and value.__name__ == f"{self.__name__}.{name}"
+        ):
+            value = getattr(value, name, value)
+        super().__setattr__(name, value)
+
+    def __dir__(self):
+        return sorted(set(super().__dir__()) | set(self._lazy_exports))
+
+
+def lazy_package(module_name, exports):
+    """
+    Make the package ``module_name`` import its exported names on first access.
+
+    Parameters
+    ----------
+    module_name : str
+        The ``__name__`` of the package.
+    exports : dict
+        Maps each exported name to the module defining it, relative to the package.
+    """
+    module = sys.modules[module_name]
+    module._lazy_exports = exports
+    module.__class__ = LazyPackage
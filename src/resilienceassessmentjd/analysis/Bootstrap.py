@@ -0,0 +1,295 @@
+# !/usr/bin/env python
+# @FileName  :Bootstrap.py
+# @Time      :2026/10/19 下午9:50
+# @Author    :Wenjie Xu
+# @Email     :wenjie.xu.cn@outlook.com
+
+import copy
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from ..core.UnifiedModel import UnifiedModel
+from ..methods.RankingCore import RankingCore
+from .Sensitivity import find_group
+
+# Replicates per task; fixed so the results do not depend on the worker count
+CHUNK_SIZE = 50
+# Target size of one batch of K×n×m regrets, in float64 values
+BATCH_VALUES = 2**23
+
+# The arrays of the bootstrap, set once in every worker process
+_state = {}
+
+
+def _init_worker(values, weights, v, resample):
+    _state.update(values=values, weights=weights, v=v, resample=resample)
+
+
+def _run_chunk(task):
+    """Run one chunk of replicates in a worker process."""
+    seed, size = task
+    return VikorBootstrap.replicate(
+        _state["values"],
+        _state["weights"],
+        _state["v"],
+        _state["resample"],
+        size,
+        np.random.default_rng(seed),
+    )
+
+
+class VikorBootstrap:
+    """
+    Bootstrap confidence intervals of the VIKOR index RI = 1 - Q and the ranks.
+
+    Every replicate resamples, with replacement, either
+
+    alternatives
+        The objects: the ideal values f*, f- and the ranges of S and R come from
+        the resampled objects, against which every object is scored and ranked
+        (its rank is 1 + the number of resampled objects with a higher RI).
+    criteria
+        The criteria: every object is scored on the resampled criteria, its
+        weights rescaled to their original sum, and the objects are ranked.
+
+    The ranking block is divided by the column sums of the whole data; VIKOR is
+    invariant to the scale of a column, so the replicates reuse it as is. The
+    replicates are evaluated in K×n×m batches, in chunks of ``CHUNK_SIZE`` spread
+    over a process pool. Every chunk draws from its own stream of
+    ``numpy.random.SeedSequence(seed).spawn``, so the results only depend on the
+    seed, not on the number of workers.
+
+    Parameters
+    ----------
+    params : dict
+        The prepared params of a request (``UnifiedModel.prepare``).
+    group : dict, optional
+        The fields of the assessment group to analyze, by default 综合评估.
+    """
+
+    schemes = ("alternatives", "criteria")
+
+    def __init__(self, params, group=None):
+        self.params = params
+        self.context = context = params["context"]
+        self.fields, self.columns = find_group(context, group)
+        values = context.derived("ranking_block", RankingCore.ranking_block)
+        self.values = np.ascontiguousarray(values[:, self.columns])
+        self.weights = np.ascontiguousarray(
+            np.asarray(context.weights)[:, self.columns]
+        )
+        self.v = params.get("vikor_params", {}).get("v", 0.5)
+
+    @staticmethod
+    def replicate(values, weights, v, resample, size, rng, batch_size=None):
+        """
+        Evaluate ``size`` bootstrap replicates.
+
+        Returns
+        -------
+        tuple of ndarray
+            The RI (K×n) and the ranks (K×n) of every replicate and object.
+        """
+        n, m = values.shape
+        if batch_size is None:
+            batch_size = max(1, BATCH_VALUES // max(n * m, 1))
+        scores, ranks = [], []
+        for start in range(0, size, batch_size):
+            k = min(batch_size, size - start)
+            if resample == "alternatives":
+                index = rng.integers(0, n, size=(k, n))
+                ri, rank = VikorBootstrap.resample_alternatives(
+                    values, weights, v, index
+                )
+            else:
+                index = rng.integers(0, m, size=(k, m))
+                ri, rank = VikorBootstrap.resample_criteria(values, weights, v, index)
+            scores.append(ri)
+            ranks.append(rank)
+        if not scores:
+            return np.empty((0, n)), np.empty((0, n), dtype=int)
+        return np.concatenate(scores), np.concatenate(ranks)
+
+    @staticmethod
+    def resample_alternatives(values, weights, v, index):
+        """
+        RI and ranks of all objects against K resamples of the objects.
+
+        Every object is scored as a member of the resample: the ideal values and
+        the ranges of S and R are those of the resampled objects and the object
+        itself, so objects left out of a resample stay within the scale of VIKOR.
+        """
+        sample = values[index]
+        f_star = np.maximum(np.nanmax(sample, axis=1)[:, np.newaxis], values)
+        f_minus = np.minimum(np.nanmin(sample, axis=1)[:, np.newaxis], values)
+        spread = f_star - f_minus
+        # 无差异的准则不含信息, 与 RankingCore.vikor 一样跳过
+        with np.errstate(divide="ignore", invalid="ignore"):
+            regret = weights * np.where(spread != 0, (f_star - values) / spread, np.nan)
+        S = np.nansum(regret, axis=2)
+        R = np.fmax.reduce(regret, axis=2)
+        ri = 1 - v * _scale(S, index) - (1 - v) * _scale(R, index)
+        # 名次 = 1 + 抽中对象中 RI 更高者的个数
+        ri_sample = np.sort(np.take_along_axis(ri, index, axis=1), axis=1)
+        ranks = np.empty(ri.shape, dtype=int)
+        n = index.shape[1]
+        for row in range(len(ri)):
+            ranks[row] = n - np.searchsorted(ri_sample[row], ri[row], side="right") + 1
+        return ri, ranks
+
+    @staticmethod
+    def resample_criteria(values, weights, v, index):
+        """RI and ranks of all objects on K resamples of the criteria."""
+        f_star = values.max(axis=0)
+        f_minus = values.min(axis=0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            distance = (f_star - values) / (f_star - f_minus)
+        sampled = weights[:, index].transpose(1, 0, 2)
+        sums = sampled.sum(axis=2, keepdims=True)
+        row_sums = weights.sum(axis=1)[:, np.newaxis]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            sampled = sampled * np.where(sums != 0, row_sums / sums, 0)
+        regret = sampled * distance[:, index].transpose(1, 0, 2)
+        S = np.nansum(regret, axis=2)
+        R = np.fmax.reduce(regret, axis=2)
+        ri = 1 - RankingCore.compromise(S.T, R.T, v).T
+        return ri, RankingCore.rank_rows(ri)
+
+    def run(self, replicates=1000, resample="alternatives", seed=None, workers=None):
+        """
+        Evaluate ``replicates`` bootstrap replicates.
+
+        Parameters
+        ----------
+        replicates : int
+            The number B of replicates.
+        resample : str
+            "alternatives" or "criteria".
+        seed : int, optional
+            The root seed of the replicates.
+        workers : int, optional
+            The number of worker processes, by default the number of CPUs; with 1
+            the replicates run in the calling process.
+
+        Returns
+        -------
+        dict
+            The base RI and ranks, and the RI (``scores``) and ``ranks`` of every
+            replicate (B×n).
+        """
+        if resample not in self.schemes:
+            raise ValueError(f"Unknown resampling scheme: {resample}")
+        sizes = [
+            min(CHUNK_SIZE, replicates - start)
+            for start in range(0, replicates, CHUNK_SIZE)
+        ]
+        seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+        tasks = list(zip(seeds, sizes, strict=True))
+        workers = min(workers or os.cpu_count() or 1, max(len(tasks), 1))
+        args = (self.values, self.weights, self.v, resample)
+        if workers <= 1:
+            _init_worker(*args)
+            chunks = [_run_chunk(task) for task in tasks]
+        else:
+            with ProcessPoolExecutor(
+                max_workers=workers, initializer=_init_worker, initargs=args
+            ) as executor:
+                chunks = list(executor.map(_run_chunk, tasks))
+        n = len(self.values)
+        _, _, q = RankingCore.vikor(
+            self.values,
+            self.weights,
+            self.values.max(axis=0),
+            self.values.min(axis=0),
+            self.v,
+        )
+        return {
+            "base_scores": 1 - q,
+            "base_ranks": RankingCore.rank(1 - q),
+            "scores": np.concatenate([c[0] for c in chunks])
+            if chunks
+            else np.empty((0, n)),
+            "ranks": np.concatenate([c[1] for c in chunks])
+            if chunks
+            else np.empty((0, n), dtype=int),
+        }
+
+    def report(self, outcome, interval=0.95):
+        """
+        Build the per-object report of a ``run``: the percentile intervals of RI
+        and of the rank. Objects without valid data are left out.
+        """
+        context = self.context
+        tail = (1 - interval) / 2 * 100
+        bounds = (tail, 100 - tail)
+        scores, ranks = outcome["scores"], outcome["ranks"]
+        score_bounds = np.percentile(scores, bounds, axis=0)
+        rank_bounds = np.percentile(ranks, bounds, axis=0)
+        objects = []
+        for row in np.flatnonzero(~np.asarray(context.invalid)):
+            objects.append(
+                {
+                    "id": context.ids[row],
+                    "area": context.areas[row],
+                    "index_value": float(outcome["base_scores"][row]),
+                    "level": int(outcome["base_ranks"][row]),
+                    "mean_index_value": float(scores[:, row].mean()),
+                    "index_interval": score_bounds[:, row].tolist(),
+                    "median_level": float(np.median(ranks[:, row])),
+                    "level_interval": rank_bounds[:, row].tolist(),
+                }
+            )
+        return {
+            "method": "VIKOR",
+            "group": self.fields,
+            "replicates": len(scores),
+            "interval": interval,
+            "objects": objects,
+        }
+
+
+def _scale(values, index):
+    """
+    Scale every row of a K×n array to [0, 1] by the range of its resampled
+    entries and each entry itself.
+    """
+    sample = np.take_along_axis(values, index, axis=1)
+    low = np.minimum(sample.min(axis=1, keepdims=True), values)
+    spread = np.maximum(sample.max(axis=1, keepdims=True), values) - low
+    return np.divide(values - low, spread, out=np.zeros_like(values), where=spread != 0)
+
+
+def vikor_bootstrap(
+    request,
+    replicates=1000,
+    resample="alternatives",
+    interval=0.95,
+    seed=None,
+    group=None,
+    workers=None,
+):
+    """
+    Compute bootstrap confidence intervals of the VIKOR ranking of a request.
+
+    The request is parsed, scaled and weighted once; then ``replicates``
+    resamples of the objects or of the criteria are evaluated on a process pool
+    (see ``VikorBootstrap``).
+
+    Returns
+    -------
+    dict
+        The settings and, per object, the base RI (``index_value``) and rank
+        (``level``) with their percentile intervals covering ``interval`` of the
+        replicates.
+    """
+    request = copy.deepcopy(request)
+    request["assess_method"] = "VIKOR"
+    params = UnifiedModel(request).prepare()
+    analysis = VikorBootstrap(params, group)
+    outcome = analysis.run(replicates, resample, seed, workers)
+    report = analysis.report(outcome, interval)
+    report["resample"] = resample
+    report["seed"] = seed
+    return report
@@ -0,0 +1,394 @@
+# !/usr/bin/env python
+# @FileName  :Imputation.py
+# @Time      :2026/10/19 下午9:20
+# @Author    :Wenjie Xu
+# @Email     :wenjie.xu.cn@outlook.com
+
+import copy
+
+import numpy as np
+import pandas as pd
+
+from ..core.MethodFactory import ScalingMethodFactory
+from ..core.UnifiedModel import UnifiedModel
+from ..methods.MEE import GRADE_FIELDS, GRADES, MEE
+from ..methods.RankingCore import RankingCore
+from .Sensitivity import find_group
+
+MISSING = -99
+# Weight methods that only depend on the missing-value pattern (or on expert
+# judgments), so all imputations of a request share their weights
+MASK_WEIGHT_METHODS = ("HEWM", "AHP", "HierarchicalAHP")
+# Scaling methods evaluated on the stacked imputations as whole arrays
+STACKED_SCALING = ("MinMax", "BRM")
+# Target size of one batch of R×n×m values, in float64 values
+BATCH_VALUES = 2**23
+
+
+class ImputationRobustness:
+    """
+    Robustness of the scores and ranks to the imputation of missing values.
+
+    ``Criterion`` replaces every -99 by the mean of its column. Here R
+    imputations of the missing cells are drawn instead:
+
+    mean
+        The column mean, as ``Criterion`` does (every imputation is the same).
+    bootstrap
+        A random observed value of the same column.
+    knn
+        The value of one of the ``k`` nearest objects observed in that column,
+        drawn at random; the distance is the RMS difference of the standardized
+        criteria both objects observe.
+
+    All imputations share the missing-value pattern, so everything that only
+    depends on it is computed once: the donors of every missing cell, the weights
+    of mask-only weight methods (``MASK_WEIGHT_METHODS``) and the scaling of the
+    complete columns. The completed matrices are stacked and evaluated as R×n×m
+    batches.
+
+    Parameters
+    ----------
+    model : UnifiedModel
+        A prepared model (``UnifiedModel.prepare``) of the request.
+    method : str
+        "VIKOR" or "MEE".
+    group : dict, optional
+        The fields of the assessment group to analyze, by default 综合评估.
+    """
+
+    methods = ("VIKOR", "MEE")
+    imputers = ("mean", "bootstrap", "knn")
+
+    def __init__(self, model, method="VIKOR", group=None):
+        if method not in self.methods:
+            raise ValueError(f"Imputation robustness supports {self.methods}.")
+        self.model = model
+        self.params = params = model.params
+        self.method = method
+        self.context = context = params["context"]
+        self.fields, self.columns = find_group(context, group)
+        names = list(context.criteria_names)
+        self.raw = params["init_data"][names].to_numpy(dtype=float)
+        self.filled = np.asarray(context.filled)
+        # 无有效数据的对象保持填充值, 不参与插补
+        self.mask = (self.raw == MISSING) & ~np.asarray(context.invalid)[:, None]
+        self.rows, self.cols = np.nonzero(self.mask)
+        self.incomplete = self.mask.any(axis=0)
+        self.normalization = model.request.get("normalization", "MinMax")
+        weight_method = model.request.get("weight_method", {})
+        self.shared_weights = (
+            not weight_method.get("objective_method")
+            and weight_method.get("subjective_method") in MASK_WEIGHT_METHODS
+        )
+        if method == "MEE":
+            self.mee = MEE(params)
+        else:
+            self.cost = np.array([a == "1" for a in context.attributes])
+            self.v = params.get("vikor_params", {}).get("v", 0.5)
+
+    def donors(self, imputer="bootstrap", k=5):
+        """
+        Return the candidate values of every missing cell.
+
+        Returns
+        -------
+        tuple
+            The (cells × donors) candidate values, padded with NaN, and the number
+            of candidates of every cell.
+        """
+        if imputer not in self.imputers:
+            raise ValueError(f"Unknown imputer: {imputer}")
+        cells = len(self.rows)
+        observed = np.where(self.mask | (self.raw == MISSING), np.nan, self.raw)
+        if imputer == "mean":
+            return self.filled[self.rows, self.cols][:, None], np.ones(cells, int)
+        if imputer == "bootstrap":
+            width = int((~np.isnan(observed)).sum(axis=0).max(initial=1))
+            values = np.full((cells, width), np.nan)
+            counts = np.zeros(cells, dtype=int)
+            for c in np.unique(self.cols):
+                column = observed[:, c][~np.isnan(observed[:, c])]
+                at = self.cols == c
+                values[at, : len(column)] = column
+                counts[at] = len(column)
+            return values, counts
+
+        # k 近邻: 按共同观测准则的标准化均方根距离选取供体
+        with np.errstate(invalid="ignore", divide="ignore"):
+            scale = np.nanstd(observed, axis=0)
+            z = (observed - np.nanmean(observed, axis=0)) / np.where(
+                scale > 0, scale, 1
+            )
+        values = np.full((cells, k), np.nan)
+        counts = np.zeros(cells, dtype=int)
+        for row in np.unique(self.rows):
+            diff = (z - z[row]) ** 2
+            common = (~np.isnan(diff)).sum(axis=1)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                distance = np.sqrt(np.nansum(diff, axis=1) / common)
+            distance[common == 0] = np.inf
+            distance[row] = np.inf
+            order = np.argsort(distance, kind="stable")
+            for cell in np.flatnonzero(self.rows == row):
+                c = self.cols[cell]
+                candidates = order[~np.isnan(observed[order, c])][:k]
+                values[cell, : len(candidates)] = observed[candidates, c]
+                counts[cell] = len(candidates)
+        return values, counts
+
+    def draw(self, imputations, imputer="bootstrap", k=5, seed=None):
+        """Draw the values of the missing cells for R imputations (R × cells)."""
+        values, counts = self.donors(imputer, k)
+        if (counts == 0).any():
+            raise ValueError("Some missing values have no observed donor.")
+        rng = np.random.default_rng(seed)
+        picks = (rng.random((imputations, len(counts))) * counts).astype(int)
+        return values[np.arange(len(counts)), picks]
+
+    def stack(self, imputed):
+        """The completed R×n×m matrices of the imputed cell values."""
+        stack = np.repeat(self.filled[np.newaxis], len(imputed), axis=0)
+        stack[:, self.rows, self.cols] = imputed
+        return stack
+
+    def scale(self, stack):
+        """
+        Scale the completed matrices.
+
+        The complete columns keep the scaled values of the request; the others
+        are min-max scaled along the objects of every imputation at once. Other
+        scaling methods run on every imputation separately.
+        """
+        base = np.asarray(self.context.normalized)
+        if self.normalization not in STACKED_SCALING:
+            names = list(self.context.criteria_names)
+            ids = list(self.context.ids)
+            scaled = []
+            for values in stack:
+                params = {
+                    **self.params,
+                    "filled_data": pd.DataFrame(values, ids, names),
+                }
+                result = ScalingMethodFactory.get_method(
+                    self.normalization, params
+                ).execute()
+                scaled.append(result["data"][names].to_numpy(dtype=float))
+            return np.stack(scaled)
+        scaled = np.repeat(base[np.newaxis], len(stack), axis=0)
+        columns = self.incomplete
+        values = stack[:, :, columns]
+        low, high = values.min(axis=1, keepdims=True), values.max(axis=1, keepdims=True)
+        span = high - low
+        # 与 MinMax 相同: 取值范围为 0 的列保持原值
+        scaled[:, :, columns] = np.where(
+            span != 0, (values - low) / np.where(span != 0, span, 1), values
+        )
+        return scaled
+
+    def weights(self, stack, scaled=None):
+        """
+        The R×n×m weights of the imputations.
+
+        Mask-only weight methods give the same weights for every imputation; the
+        others are recomputed on every completed matrix, by a shallow copy of the
+        model with its own params, so the prepared model is left untouched.
+        """
+        if self.shared_weights:
+            return np.asarray(self.context.weights)[np.newaxis]
+        if scaled is None:
+            scaled = self.scale(stack)
+        names = list(self.context.criteria_names)
+        ids = list(self.context.ids)
+        weights = []
+        for values, norm in zip(stack, scaled, strict=True):
+            model = copy.copy(self.model)
+            model.params = {
+                **self.model.params,
+                "filled_data": pd.DataFrame(values, ids, names),
+                "norm_data": pd.DataFrame(norm, ids, names),
+            }
+            result = model.determine_weight()
+            weights.append(model.expand_weights(result["weights"]))
+        return np.asarray(weights, dtype=float)
+
+    def evaluate_vikor(self, stack, weights):
+        """The VIKOR index 1 - Q of every imputation and object (R×n)."""
+        values = stack.copy()
+        values[:, :, self.cost] = 1 - values[:, :, self.cost]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            values = values / np.abs(values).sum(axis=1, keepdims=True)
+        values = values[:, :, self.columns]
+        f_star = values.max(axis=1, keepdims=True)
+        f_minus = values.min(axis=1, keepdims=True)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            regret = weights[:, :, self.columns] * (
+                (f_star - values) / (f_star - f_minus)
+            )
+        S = np.nansum(regret, axis=2)
+        R = np.fmax.reduce(regret, axis=2)
+        return 1 - RankingCore.compromise(S.T, R.T, self.v).T
+
+    def evaluate_mee(self, scaled, weights):
+        """
+        The weighted correlation degrees of every imputation, object and grade.
+
+        The correlation kernel is column-wise, so the criteria of all imputations
+        are laid side by side and go through the kernel in one call.
+        """
+        r, n, m = scaled.shape
+        names = list(self.context.criteria_names)
+        domains = [
+            self.mee.domain_from_range(
+                np.nanmin(v, axis=0), np.nanmax(v, axis=0), names
+            )
+            for v in scaled
+        ]
+        lower, upper, domain_min, domain_max = (
+            np.concatenate(parts) for parts in zip(*domains, strict=True)
+        )
+        block = scaled.transpose(1, 0, 2).reshape(n, r * m)
+        degrees = MEE.correlation_kernel(block, lower, upper, domain_min, domain_max)
+        degrees = degrees.reshape(r, m, n, len(GRADES))[:, self.columns]
+        group_weights = np.broadcast_to(weights, (r, n, m))[:, :, self.columns]
+        return (degrees * group_weights.transpose(0, 2, 1)[..., np.newaxis]).sum(axis=1)
+
+    def evaluate(self, stack):
+        """Evaluate the method on a batch of completed matrices."""
+        scaled = None
+        if self.method == "MEE" or not self.shared_weights:
+            scaled = self.scale(stack)
+        weights = self.weights(stack, scaled)
+        if self.method == "VIKOR":
+            return self.evaluate_vikor(stack, weights)
+        return self.evaluate_mee(scaled, weights)
+
+    def run(
+        self, imputations=100, imputer="bootstrap", k=5, seed=None, batch_size=None
+    ):
+        """
+        Evaluate the method on R imputations.
+
+        Returns
+        -------
+        dict
+            The ``base`` outcome of the mean imputation of the request and the
+            outcome of every imputation: ``scores`` (R×n index values) for VIKOR,
+            ``degrees`` (R×n×grades) for MEE.
+        """
+        imputed = self.draw(imputations, imputer, k, seed)
+        n, m = self.filled.shape
+        if batch_size is None:
+            batch_size = max(1, BATCH_VALUES // max(n * m, 1))
+        outcomes = [
+            self.evaluate(self.stack(imputed[start : start + batch_size]))
+            for start in range(0, imputations, batch_size)
+        ]
+        base = self.evaluate(self.filled[np.newaxis])[0]
+        key = "scores" if self.method == "VIKOR" else "degrees"
+        return {"base": base, key: np.concatenate(outcomes)}
+
+    def report(self, outcome, interval=0.9):
+        """
+        Build the per-object report of a ``run``: score intervals and rank
+        intervals for VIKOR, degree intervals and grade probabilities for MEE.
+        Objects without valid data are left out.
+        """
+        context = self.context
+        tail = (1 - interval) / 2 * 100
+        bounds = (tail, 100 - tail)
+        missing = self.mask.sum(axis=1)
+        valid = np.flatnonzero(~np.asarray(context.invalid))
+        objects = []
+        if self.method == "VIKOR":
+            scores = outcome["scores"]
+            ranks = RankingCore.rank_rows(scores)
+            base_rank = RankingCore.rank(outcome["base"])
+            score_bounds = np.percentile(scores, bounds, axis=0)
+            rank_bounds = np.percentile(ranks, bounds, axis=0)
+            for row in valid:
+                objects.append(
+                    {
+                        "id": context.ids[row],
+                        "area": context.areas[row],
+                        "missing": int(missing[row]),
+                        "base_score": float(outcome["base"][row]),
+                        "mean_score": float(scores[:, row].mean()),
+                        "score_interval": score_bounds[:, row].tolist(),
+                        "base_rank": int(base_rank[row]),
+                        "median_rank": float(np.median(ranks[:, row])),
+                        "rank_interval": rank_bounds[:, row].tolist(),
+                    }
+                )
+        else:
+            degrees = outcome["degrees"]
+            grades = np.where(np.isnan(degrees), -np.inf, degrees).argmax(axis=2)
+            base = np.where(np.isnan(outcome["base"]), -np.inf, outcome["base"])
+            base_grade = base.argmax(axis=1)
+            degree_bounds = np.percentile(degrees, bounds, axis=0)
+            for row in valid:
+                objects.append(
+                    {
+                        "id": context.ids[row],
+                        "area": context.areas[row],
+                        "missing": int(missing[row]),
+                        "base_grade": GRADES[base_grade[row]],
+                        "grade_probabilities": {
+                            grade: float((grades[:, row] == g).mean())
+                            for g, grade in enumerate(GRADES)
+                        },
+                        "degree_intervals": {
+                            field: degree_bounds[:, row, g].tolist()
+                            for g, field in enumerate(GRADE_FIELDS)
+                        },
+                    }
+                )
+        return {
+            "method": self.method,
+            "group": self.fields,
+            "imputations": len(
+                outcome["scores" if self.method == "VIKOR" else "degrees"]
+            ),
+            "interval": interval,
+            "missing_values": len(self.rows),
+            "shared_weights": self.shared_weights,
+            "objects": objects,
+        }
+
+
+def imputation_robustness(
+    request,
+    method="VIKOR",
+    imputations=100,
+    imputer="bootstrap",
+    k=5,
+    interval=0.9,
+    seed=None,
+    group=None,
+    batch_size=None,
+):
+    """
+    Analyze the robustness of a request to the imputation of its missing values.
+
+    The request is parsed, scaled and weighted once; then ``imputations``
+    completed matrices are drawn with ``imputer`` and evaluated with ``method``
+    in stacked batches (see ``ImputationRobustness``).
+
+    Returns
+    -------
+    dict
+        The settings and the per-object report, with the score and rank
+        intervals (VIKOR) or the degree intervals and grade probabilities (MEE)
+        covering ``interval`` of the imputations.
+    """
+    request = copy.deepcopy(request)
+    request["assess_method"] = method
+    model = UnifiedModel(request)
+    model.prepare()
+    analysis = ImputationRobustness(model, method, group)
+    outcome = analysis.run(imputations, imputer, k, seed, batch_size)
+    report = analysis.report(outcome, interval)
+    report["imputer"] = imputer
+    if imputer == "knn":
+        report["k"] = k
+    return report
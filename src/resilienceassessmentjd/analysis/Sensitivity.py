@@ -0,0 +1,324 @@
+# !/usr/bin/env python
+# @FileName  :Sensitivity.py
+# @Time      :2026/10/19 下午8:45
+# @Author    :Wenjie Xu
+# @Email     :wenjie.xu.cn@outlook.com
+
+import copy
+
+import numpy as np
+
+from ..core.UnifiedModel import UnifiedModel
+from ..methods.MEE import GRADES, MEE
+from ..methods.RankingCore import RankingCore
+
+# Percentiles of the rank distribution reported per object
+RANK_PERCENTILES = (5, 25, 50, 75, 95)
+# Target size of one batch of K×n×m weights, in float64 values
+BATCH_VALUES = 2**23
+
+
+def find_group(context, group=None):
+    """
+    Return the fields and the columns of an assessment group of the context.
+
+    ``group`` holds the fields of the group, e.g. ``{"type": "要素评估",
+    "element": "E1"}``; by default the 综合评估 group.
+    """
+    group = {"type": "综合评估"} if group is None else dict(group)
+    for fields, columns in context.groups:
+        if dict(fields) == group:
+            return dict(fields), columns
+    raise ValueError(f"Unknown assessment group: {group}")
+
+
+class WeightSensitivity:
+    """
+    Sensitivity of the ranks and grades of the objects to the criteria weights.
+
+    Every draw is a vector of per-criterion factors, applied to the weight row of
+    every object; each row is then rescaled to its original sum. The factors are
+    either Dirichlet draws around the mean criterion weights, divided by them, or
+    uniform ±``delta`` perturbations. All K draws of a batch are evaluated in one
+    K×n×m computation: for VIKOR the regrets of every draw, for MEE only the
+    weighting of the correlation degrees, which do not depend on the weights and
+    are computed once.
+
+    Parameters
+    ----------
+    params : dict
+        The prepared params of a request (``UnifiedModel.prepare``).
+    method : str
+        "VIKOR" or "MEE".
+    group : dict, optional
+        The fields of the assessment group to analyze, by default 综合评估.
+    """
+
+    methods = ("VIKOR", "MEE")
+    schemes = ("dirichlet", "uniform")
+
+    def __init__(self, params, method="VIKOR", group=None):
+        if method not in self.methods:
+            raise ValueError(f"Sensitivity analysis supports {self.methods}.")
+        self.params = params
+        self.method = method
+        self.context = context = params["context"]
+        self.fields, self.columns = find_group(context, group)
+        self.weights = np.asarray(context.weights)
+        self.row_sums = self.weights.sum(axis=1, keepdims=True)
+        if method == "VIKOR":
+            values = context.derived("ranking_block", RankingCore.ranking_block)
+            self.values = np.ascontiguousarray(values[:, self.columns])
+            self.f_star = self.values.max(axis=0)
+            self.f_minus = self.values.min(axis=0)
+            self.v = params.get("vikor_params", {}).get("v", 0.5)
+        else:
+            mee = MEE(params)
+            names = list(params["criteria_names"])
+            block = mee.norm_df[names].to_numpy(dtype=float)
+            domain = mee.domain_from_range(
+                np.nanmin(block, axis=0), np.nanmax(block, axis=0), names
+            )
+            # 关联度与权重无关, 只计算一次; 形状为 (对象数, 准则数, 等级数)
+            degrees = MEE.correlation_kernel(block, *domain).transpose(1, 0, 2)
+            self.degrees = np.ascontiguousarray(degrees[:, self.columns])
+
+    def draw(
+        self, draws, scheme="dirichlet", concentration=100.0, delta=0.1, seed=None
+    ):
+        """
+        Draw the per-criterion weight factors.
+
+        Parameters
+        ----------
+        draws : int
+            The number K of draws.
+        scheme : str
+            "dirichlet": weight vectors from a Dirichlet distribution with mean
+            the mean criterion weights and the given ``concentration`` (larger is
+            tighter), divided by the mean weights. "uniform": factors 1 ± ``delta``.
+        seed : int or numpy.random.Generator, optional
+            The seed of the draws.
+
+        Returns
+        -------
+        ndarray
+            The K×m factors.
+        """
+        if scheme not in self.schemes:
+            raise ValueError(f"Unknown perturbation scheme: {scheme}")
+        rng = np.random.default_rng(seed)
+        m = self.weights.shape[1]
+        if scheme == "uniform":
+            return 1 + delta * rng.uniform(-1.0, 1.0, size=(draws, m))
+        mean_weights = self.weights.mean(axis=0)
+        mean_weights = mean_weights / mean_weights.sum()
+        factors = np.ones((draws, m))
+        # 权重为 0 的准则不参与抽样
+        active = mean_weights > 0
+        factors[:, active] = (
+            rng.dirichlet(concentration * mean_weights[active], size=draws)
+            / mean_weights[active]
+        )
+        return factors
+
+    def perturbed_weights(self, factors):
+        """The K×n×g weights of the group for K factor vectors, rows rescaled."""
+        weights = self.weights[np.newaxis] * factors[:, np.newaxis, :]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scale = np.where(
+                self.row_sums != 0,
+                self.row_sums / weights.sum(axis=2, keepdims=True),
+                0,
+            )
+        return (weights * scale)[:, :, self.columns]
+
+    def index_values(self, weights):
+        """The VIKOR index 1 - Q of every draw and object (K×n)."""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            regret = weights * (
+                (self.f_star - self.values) / (self.f_star - self.f_minus)
+            )
+        S = np.nansum(regret, axis=2)
+        R = np.fmax.reduce(regret, axis=2)
+        return 1 - RankingCore.compromise(S.T, R.T, self.v).T
+
+    def grade_indices(self, weights):
+        """The MEE grade (index into ``GRADES``) of every draw and object (K×n)."""
+        totals = np.einsum("kic,icg->kig", weights, self.degrees)
+        return np.where(np.isnan(totals), -np.inf, totals).argmax(axis=2)
+
+    def run(
+        self,
+        draws=1000,
+        scheme="dirichlet",
+        concentration=100.0,
+        delta=0.1,
+        seed=None,
+        batch_size=None,
+    ):
+        """
+        Evaluate the method for K weight draws.
+
+        Returns
+        -------
+        dict
+            The base outcome and the outcome of every draw: ``ranks`` (K×n) for
+            VIKOR, ``grades`` (K×n indices into ``GRADES``) for MEE, with the
+            ``factors`` drawn.
+        """
+        factors = self.draw(draws, scheme, concentration, delta, seed)
+        n, m = self.weights.shape
+        if batch_size is None:
+            batch_size = max(1, BATCH_VALUES // max(n * m, 1))
+        outcomes = []
+        for start in range(0, draws, batch_size):
+            weights = self.perturbed_weights(factors[start : start + batch_size])
+            if self.method == "VIKOR":
+                outcomes.append(RankingCore.rank_rows(self.index_values(weights)))
+            else:
+                outcomes.append(self.grade_indices(weights))
+        outcomes = np.concatenate(outcomes) if outcomes else np.empty((0, n), int)
+        base_weights = self.weights[:, self.columns]
+        if self.method == "VIKOR":
+            _, _, q = RankingCore.vikor(
+                self.values, base_weights, self.f_star, self.f_minus, self.v
+            )
+            return {
+                "factors": factors,
+                "base": RankingCore.rank(1 - q),
+                "ranks": outcomes,
+            }
+        totals = (self.degrees * base_weights[:, :, np.newaxis]).sum(axis=1)
+        base = np.where(np.isnan(totals), -np.inf, totals).argmax(axis=1)
+        return {"factors": factors, "base": base, "grades": outcomes}
+
+    @staticmethod
+    def rank_statistics(ranks, base):
+        """
+        Summarize the rank distribution of every object.
+
+        Besides the moments and percentiles of the ranks, the rank-reversal
+        probabilities: ``p_overtaken`` that an object ranked below it in the base
+        ranking is ranked above it, ``p_overtakes`` that it is ranked above an
+        object ranked above it in the base ranking, and ``p_reversal`` that any
+        of its pairwise orders is reversed.
+        """
+        order = np.argsort(base, kind="stable")
+        by_base = ranks[:, order]
+        # 基准排名更靠后的对象中, 抽样中的最好排名
+        below = np.minimum.accumulate(by_base[:, ::-1], axis=1)[:, ::-1]
+        below = np.concatenate([below[:, 1:], np.full((len(ranks), 1), np.inf)], axis=1)
+        above = np.maximum.accumulate(by_base, axis=1)
+        above = np.concatenate(
+            [np.full((len(ranks), 1), -np.inf), above[:, :-1]], axis=1
+        )
+        overtaken = np.empty(ranks.shape, dtype=bool)
+        overtakes = np.empty(ranks.shape, dtype=bool)
+        overtaken[:, order] = below < by_base
+        overtakes[:, order] = above > by_base
+        return {
+            "mean_rank": ranks.mean(axis=0),
+            "std_rank": ranks.std(axis=0),
+            "min_rank": ranks.min(axis=0),
+            "max_rank": ranks.max(axis=0),
+            "percentiles": np.percentile(ranks, RANK_PERCENTILES, axis=0),
+            "p_rank_change": (ranks != base).mean(axis=0),
+            "p_overtaken": overtaken.mean(axis=0),
+            "p_overtakes": overtakes.mean(axis=0),
+            "p_reversal": (overtaken | overtakes).mean(axis=0),
+        }
+
+    def report(self, outcome):
+        """
+        Build the per-object report of a ``run``; objects without valid data are
+        left out.
+        """
+        context = self.context
+        valid = np.flatnonzero(~context.invalid)
+        objects = []
+        if self.method == "VIKOR":
+            stats = self.rank_statistics(outcome["ranks"], outcome["base"])
+            for row in valid:
+                objects.append(
+                    {
+                        "id": context.ids[row],
+                        "area": context.areas[row],
+                        "base_rank": int(outcome["base"][row]),
+                        "mean_rank": float(stats["mean_rank"][row]),
+                        "std_rank": float(stats["std_rank"][row]),
+                        "min_rank": int(stats["min_rank"][row]),
+                        "max_rank": int(stats["max_rank"][row]),
+                        "rank_percentiles": {
+                            str(p): float(stats["percentiles"][i, row])
+                            for i, p in enumerate(RANK_PERCENTILES)
+                        },
+                        "p_rank_change": float(stats["p_rank_change"][row]),
+                        "p_overtaken": float(stats["p_overtaken"][row]),
+                        "p_overtakes": float(stats["p_overtakes"][row]),
+                        "p_reversal": float(stats["p_reversal"][row]),
+                    }
+                )
+        else:
+            grades = outcome["grades"]
+            probabilities = np.stack(
+                [(grades == g).mean(axis=0) for g in range(len(GRADES))], axis=1
+            )
+            for row in valid:
+                objects.append(
+                    {
+                        "id": context.ids[row],
+                        "area": context.areas[row],
+                        "base_grade": GRADES[outcome["base"][row]],
+                        "grade_probabilities": dict(
+                            zip(GRADES, probabilities[row].tolist(), strict=True)
+                        ),
+                        "p_grade_flip": float(
+                            (grades[:, row] != outcome["base"][row]).mean()
+                        ),
+                    }
+                )
+        return {
+            "method": self.method,
+            "group": self.fields,
+            "draws": len(outcome["factors"]),
+            "objects": objects,
+        }
+
+
+def weight_sensitivity(
+    request,
+    method="VIKOR",
+    draws=1000,
+    scheme="dirichlet",
+    concentration=100.0,
+    delta=0.1,
+    seed=None,
+    group=None,
+    batch_size=None,
+):
+    """
+    Analyze the weight sensitivity of a request in a single call.
+
+    The request is parsed, scaled and weighted once; then ``draws`` perturbed
+    weight sets are evaluated with ``method`` in batches (see
+    ``WeightSensitivity``).
+
+    Returns
+    -------
+    dict
+        The settings and the per-object report: the rank distribution and the
+        rank-reversal probabilities for VIKOR, the grade probabilities and the
+        grade-flip probability for MEE.
+    """
+    request = copy.deepcopy(request)
+    request["assess_method"] = method
+    params = UnifiedModel(request).prepare()
+    analysis = WeightSensitivity(params, method, group)
+    outcome = analysis.run(draws, scheme, concentration, delta, seed, batch_size)
+    report = analysis.report(outcome)
+    report["scheme"] = scheme
+    report["concentration" if scheme == "dirichlet" else "delta"] = (
+        concentration if scheme == "dirichlet" else delta
+    )
+    return report
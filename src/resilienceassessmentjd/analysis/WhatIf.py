@@ -0,0 +1,346 @@
+# !/usr/bin/env python
+# @FileName  :WhatIf.py
+# @Time      :2026/10/19 下午10:20
+# @Author    :Wenjie Xu
+# @Email     :wenjie.xu.cn@outlook.com
+
+import copy
+
+import numpy as np
+import pandas as pd
+
+from ..core.MethodFactory import ScalingMethodFactory
+from ..core.UnifiedModel import UnifiedModel
+from ..methods.MEE import GRADE_FIELDS, GRADES, MEE
+from ..methods.RankingCore import RankingCore
+from .Sensitivity import find_group
+
+MISSING = -99
+
+
+def _extremes(values):
+    """The minimum and maximum of every column, and how many rows attain them."""
+    low, high = values.min(axis=0), values.max(axis=0)
+    return low, high, (values == low).sum(axis=0), (values == high).sum(axis=0)
+
+
+def _moves_extreme(old, new, low, high, low_count, high_count):
+    """Whether changing ``old`` to ``new`` changes the minimum or the maximum."""
+    return (
+        (new > high)
+        | (new < low)
+        | ((old == high) & (high_count == 1) & (new < high))
+        | ((old == low) & (low_count == 1) & (new > low))
+    )
+
+
+def _moves_extremes(values, rows, new, bounds):
+    """
+    Whether setting the ``rows`` of ``values`` to ``new`` changes the minimum or
+    the maximum of a column. A single row is checked against the counts of
+    ``bounds``; several rows, e.g. refilled ones, by the extremes of the
+    updated values.
+    """
+    if len(rows) == 1:
+        return bool(_moves_extreme(values[rows[0]], new[0], *bounds).any())
+    values = values.copy()
+    values[rows] = new
+    low, high = bounds[:2]
+    return bool(np.any(values.min(axis=0) != low) or np.any(values.max(axis=0) != high))
+
+
+class WhatIfService:
+    """
+    Fast what-if queries on the assessment of a single warehouse.
+
+    A query changes some criteria values of one warehouse, e.g. "if warehouse X
+    improves criterion k by 10%", and returns its new VIKOR index and rank, or
+    its new MEE grade. The request is parsed, scaled and weighted once; the
+    service caches what a single-warehouse change leaves untouched:
+
+    VIKOR
+        The ideal values f*, f- of every criterion, the group utility S and
+        individual regret R of every warehouse with their extremes, and the
+        sorted index values. A query recomputes S and R of the warehouse (O(m))
+        and looks its rank up by bisection (O(log n)).
+    MEE
+        The range of every raw column and the level boundaries. A query scales
+        the row of the warehouse and runs the correlation kernel on it alone.
+
+    A change in a column with missing values also moves the column mean, which
+    fills the missing cells of the other warehouses; the query updates those
+    warehouses too (for VIKOR their S, R and index values). A change that moves
+    a column extreme, or the S/R extremes of VIKOR, changes the scale of every
+    warehouse; such a query falls back to recomputing the whole group, as do MEE
+    requests not scaled by MinMax. The weights of the request are kept:
+    objective weights are not re-estimated for a query.
+
+    Ties in the index are resolved in favour of the queried warehouse: its rank
+    is 1 + the number of other warehouses with a higher index.
+
+    Parameters
+    ----------
+    request : dict
+        The assessment request.
+    method : str
+        "VIKOR" or "MEE".
+    group : dict, optional
+        The fields of the assessment group, by default 综合评估.
+    """
+
+    methods = ("VIKOR", "MEE")
+
+    def __init__(self, request, method="VIKOR", group=None):
+        if method not in self.methods:
+            raise ValueError(f"What-if queries support {self.methods}.")
+        request = copy.deepcopy(request)
+        request["assess_method"] = method
+        self.model = UnifiedModel(request)
+        self.params = params = self.model.prepare()
+        self.method = method
+        self.context = context = params["context"]
+        self.fields, self.columns = find_group(context, group)
+        self.names = list(context.criteria_names)
+        self.position = {name: j for j, name in enumerate(self.names)}
+        self.filled = np.asarray(context.filled)
+        self.weights = np.asarray(context.weights)
+        raw = params["init_data"][self.names].to_numpy(dtype=float)
+        # Criterion 用各列观测值(含以 1 填充的无效对象)的均值填充 -99
+        self.observed = (raw != MISSING) | np.asarray(context.invalid)[:, None]
+        self.incomplete = ~self.observed.all(axis=0)
+        if method == "VIKOR":
+            self._cache_vikor()
+        else:
+            self._cache_mee()
+
+    def _cache_vikor(self):
+        cols = self.columns
+        self.cost = np.array([a == "1" for a in self.context.attributes])
+        self.v = self.params.get("vikor_params", {}).get("v", 0.5)
+        self.values = self.ranking_values(self.filled)
+        self.f_minus, self.f_star, self.f_minus_count, self.f_star_count = _extremes(
+            self.values
+        )
+        self.S, self.R, Q = RankingCore.vikor(
+            self.values, self.weights[:, cols], self.f_star, self.f_minus, self.v
+        )
+        S_star, S_minus, S_star_count, S_minus_count = _extremes(self.S)
+        R_star, R_minus, R_star_count, R_minus_count = _extremes(self.R)
+        self.S_bounds = (S_star, S_minus, S_star_count, S_minus_count)
+        self.R_bounds = (R_star, R_minus, R_star_count, R_minus_count)
+        self.index_value = 1 - Q
+        self.sorted_index = np.sort(self.index_value)
+        self.base_level = RankingCore.rank(self.index_value)
+
+    def _cache_mee(self):
+        self.normalization = self.model.request.get("normalization", "MinMax")
+        self.mee = MEE(self.params)
+        self.normalized = np.asarray(self.context.normalized)
+        self.raw_bounds = _extremes(self.filled)
+        self.domain = self.mee.domain_from_range(
+            np.nanmin(self.normalized, axis=0),
+            np.nanmax(self.normalized, axis=0),
+            self.names,
+        )
+        degrees = MEE.correlation_kernel(self.normalized, *self.domain)
+        self.base_degrees = self.group_degrees(degrees, self.weights)
+
+    def ranking_values(self, filled):
+        """
+        The VIKOR values of the group columns: the cost criteria converted by
+        1 - x. VIKOR does not depend on the scale of a column, so the column sums
+        of the ranking block are left out.
+        """
+        values = filled.copy()
+        values[:, self.cost] = 1 - values[:, self.cost]
+        return np.ascontiguousarray(values[:, self.columns])
+
+    def group_degrees(self, degrees, weights):
+        """The weighted correlation degrees of the group, per object and grade."""
+        group = degrees[self.columns]
+        return (group * weights[:, self.columns].T[:, :, np.newaxis]).sum(axis=0)
+
+    def improve(self, warehouse, criterion, fraction):
+        """
+        Answer "if ``warehouse`` improves ``criterion`` by ``fraction``": benefit
+        criteria grow by the fraction, cost criteria (attribute "1") shrink.
+        """
+        row = self._row(warehouse)
+        j = self._column(criterion)
+        sign = -1 if self.context.attributes[j] == "1" else 1
+        value = self.filled[row, j] * (1 + sign * fraction)
+        return self.query(warehouse, {criterion: value})
+
+    def query(self, warehouse, changes):
+        """
+        Assess ``warehouse`` with the criteria values of ``changes``.
+
+        Parameters
+        ----------
+        warehouse : str
+            The id of the warehouse.
+        changes : dict
+            The new (raw) value of every changed criterion.
+
+        Returns
+        -------
+        dict
+            The new ``index_value`` and ``level`` (VIKOR) or grade ``level`` and
+            correlation degrees (MEE) of the warehouse, its base values, and
+            whether the query had to ``recompute`` the whole group.
+        """
+        row = self._row(warehouse)
+        new = self.filled[row].copy()
+        for criterion, value in changes.items():
+            new[self._column(criterion)] = float(value)
+        if self.method == "VIKOR":
+            return self._query_vikor(warehouse, row, new)
+        return self._query_mee(warehouse, row, new)
+
+    def _row(self, warehouse):
+        try:
+            return self.context.row_of[warehouse]
+        except KeyError:
+            raise ValueError(f"Unknown warehouse: {warehouse}") from None
+
+    def _column(self, criterion):
+        try:
+            return self.position[criterion]
+        except KeyError:
+            raise ValueError(f"Unknown criterion: {criterion}") from None
+
+    def _refill(self, row, new):
+        """
+        The other rows whose missing cells are filled by the mean of a changed
+        column, and their filled values after the change. The column means are
+        computed as ``Criterion`` computes them.
+        """
+        changed = np.flatnonzero((new != self.filled[row]) & self.incomplete)
+        if not len(changed):
+            return np.empty(0, dtype=np.intp), self.filled[:0]
+        observed = self.observed[:, changed].copy()
+        observed[row] = True
+        refilled = ~observed
+        rows = np.flatnonzero(refilled.any(axis=1))
+        block = self.filled[rows].copy()
+        for c, j in enumerate(changed):
+            column = self.filled[:, j].copy()
+            column[row] = new[j]
+            block[refilled[rows, c], j] = column[observed[:, c]].mean()
+        return rows, block
+
+    def _refilled(self, row, new):
+        """The filled data with the changed row and the refilled rows."""
+        filled = self.filled.copy()
+        filled[row] = new
+        rows, block = self._refill(row, new)
+        filled[rows] = block
+        return filled
+
+    def _query_vikor(self, warehouse, row, new):
+        rows, block = self._refill(row, new)
+        # 该对象与补值变化的对象
+        changed = np.concatenate([[row], rows])
+        values = self.ranking_values(np.vstack([new[np.newaxis], block]))
+        recompute = _moves_extremes(
+            self.values,
+            changed,
+            values,
+            (self.f_minus, self.f_star, self.f_minus_count, self.f_star_count),
+        )
+        if not recompute:
+            # 与缓存相同的计算, 未受影响的补值对象的 S, R 逐位不变
+            S, R, _ = RankingCore.vikor(
+                values,
+                self.weights[changed][:, self.columns],
+                self.f_star,
+                self.f_minus,
+                self.v,
+            )
+            recompute = _moves_extremes(
+                self.S, changed, S, self.S_bounds
+            ) or _moves_extremes(self.R, changed, R, self.R_bounds)
+        if recompute:
+            filled = self._refilled(row, new)
+            values = self.ranking_values(filled)
+            _, _, Q = RankingCore.vikor(
+                values,
+                self.weights[:, self.columns],
+                values.max(axis=0),
+                values.min(axis=0),
+                self.v,
+            )
+            index_value = 1 - Q
+            score = index_value[row]
+            higher = int((index_value > score).sum())
+        else:
+            # S, R 的取值范围不变, 只计算变化对象的 Q
+            S_star, S_minus = self.S_bounds[:2]
+            R_star, R_minus = self.R_bounds[:2]
+            S_term = (S - S_star) / (S_minus - S_star) if S_minus != S_star else 0.0
+            R_term = (R - R_star) / (R_minus - R_star) if R_minus != R_star else 0.0
+            index_value = 1 - (self.v * S_term + (1 - self.v) * R_term)
+            score = index_value[0]
+            # 二分查找: 其余对象中指数更高者的个数, 再以补值对象的新指数替换旧值
+            higher = len(self.sorted_index) - np.searchsorted(
+                self.sorted_index, score, side="right"
+            )
+            higher -= int((self.index_value[changed] > score).sum())
+            higher += int((index_value[1:] > score).sum())
+        return {
+            "id": warehouse,
+            "method": "VIKOR",
+            "index_value": float(score),
+            "level": int(higher) + 1,
+            "base_index_value": float(self.index_value[row]),
+            "base_level": int(self.base_level[row]),
+            "recompute": recompute,
+        }
+
+    def _query_mee(self, warehouse, row, new):
+        low, high = self.raw_bounds[:2]
+        rows, block = self._refill(row, new)
+        # 该对象的隶属度只取决于其自身与各列的取值范围
+        recompute = self.normalization != "MinMax" or _moves_extremes(
+            self.filled,
+            np.concatenate([[row], rows]),
+            np.vstack([new[np.newaxis], block]),
+            self.raw_bounds,
+        )
+        domain = self.domain
+        if recompute:
+            filled = self._refilled(row, new)
+            params = {
+                **self.params,
+                "filled_data": pd.DataFrame(filled, self.context.ids, self.names),
+            }
+            result = ScalingMethodFactory.get_method(
+                self.normalization, params
+            ).execute()
+            normalized = result["data"][self.names].to_numpy(dtype=float)
+            domain = self.mee.domain_from_range(
+                np.nanmin(normalized, axis=0), np.nanmax(normalized, axis=0), self.names
+            )
+            scaled = normalized[row]
+        else:
+            span = high - low
+            # 与 MinMax 相同: 取值范围为 0 的列保持原值
+            scaled = np.where(
+                span != 0, (new - low) / np.where(span != 0, span, 1), new
+            )
+        degrees = MEE.correlation_kernel(scaled[np.newaxis], *domain)
+        totals = self.group_degrees(degrees, self.weights[row : row + 1])[0]
+        base = self.base_degrees[row]
+        return {
+            "id": warehouse,
+            "method": "MEE",
+            "level": _grade(totals),
+            **dict(zip(GRADE_FIELDS, totals.tolist(), strict=True)),
+            "base_level": _grade(base),
+            "recompute": recompute,
+        }
+
+
+def _grade(totals):
+    """The grade of the largest weighted correlation degree."""
+    return GRADES[int(np.where(np.isnan(totals), -np.inf, totals).argmax())]
@@ -0,0 +1,40 @@
+"""
+Analysis module for ResilienceAssessmentJD.
+This module contains the analyses built on repeated assessments of a request,
+such as the sensitivity of the ranks and grades to the weights and to the
+imputation of missing values, bootstrap intervals of the ranks and what-if
+queries on single warehouses.
+"""
+
+from typing import TYPE_CHECKING
+
+from .._lazy import lazy_package
+
+if TYPE_CHECKING:
+    from .Bootstrap import VikorBootstrap, vikor_bootstrap
+    from .Imputation import ImputationRobustness, imputation_robustness
+    from .Sensitivity import WeightSensitivity, weight_sensitivity
+    from .WhatIf import WhatIfService
+
+__all__ = [
+    "VikorBootstrap",
+    "vikor_bootstrap",
+    "ImputationRobustness",
+    "imputation_robustness",
+    "WeightSensitivity",
+    "weight_sensitivity",
+    "WhatIfService",
+]
+
+lazy_package(
+    __name__,
+    {
+        "VikorBootstrap": ".Bootstrap",
+        "vikor_bootstrap": ".Bootstrap",
+        "ImputationRobustness": ".Imputation",
+        "imputation_robustness": ".Imputation",
+        "WeightSensitivity": ".Sensitivity",
+        "weight_sensitivity": ".Sensitivity",
+        "WhatIfService": ".WhatIf",
+    },
+)
@@ -0,0 +1,6 @@
+"""
+Benchmarks for ResilienceAssessmentJD.
+
+Run ``python -m resilienceassessmentjd.benchmark --help`` for the available
+benchmarks.
+"""
@@ -0,0 +1,158 @@
+import argparse
+import json
+import sys
+
+from . import import_time
+
+
+def _add_request_arguments(parser):
+    """The options of the synthetic requests."""
+    parser.add_argument("--n", type=int, default=200, help="Warehouses.")
+    parser.add_argument("--m", type=int, default=14, help="Criteria.")
+    parser.add_argument(
+        "--periods",
+        type=int,
+        default=None,
+        help="Periods per warehouse (default: 3 for self_assessment, else 1).",
+    )
+    parser.add_argument("--elements", type=int, default=1)
+    parser.add_argument("--dimensions", type=int, default=3)
+    parser.add_argument("--tree-depth", type=int, default=0)
+    parser.add_argument("--tree-branching", type=int, default=2)
+    parser.add_argument("--missing-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def _request_config(args):
+    return {
+        "n": args.n,
+        "m": args.m,
+        "periods": args.periods,
+        "elements": args.elements,
+        "dimensions": args.dimensions,
+        "tree_depth": args.tree_depth,
+        "tree_branching": args.tree_branching,
+        "missing_rate": args.missing_rate,
+        "seed": args.seed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run ResilienceAssessmentJD benchmarks."
+    )
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    import_parser = subparsers.add_parser(
+        "import-time", help="Guard the cold start of the package and the CLI."
+    )
+    import_parser.add_argument("--import-budget-ms", type=float, default=100.0)
+    import_parser.add_argument("--cli-budget-ms", type=float, default=150.0)
+    import_parser.add_argument("--repeat", type=int, default=5)
+
+    methods_parser = subparsers.add_parser(
+        "methods", help="Time the weight and assessment methods on synthetic data."
+    )
+    _add_request_arguments(methods_parser)
+    methods_parser.add_argument(
+        "--cases", nargs="+", default=None, help="Cases to run (default: all)."
+    )
+    methods_parser.add_argument("--repeat", type=int, default=3)
+    methods_parser.add_argument(
+        "--save", type=str, default=None, help="Save the results as a baseline."
+    )
+    methods_parser.add_argument(
+        "--baseline",
+        type=str,
+        default=None,
+        help="Compare against a saved baseline; exit 1 on regressions.",
+    )
+    methods_parser.add_argument("--tolerance", type=float, default=0.25)
+    methods_parser.add_argument("--min-ms", type=float, default=1.0)
+
+    golden_parser = subparsers.add_parser(
+        "golden",
+        help="Check the fast methods against the reference implementations.",
+    )
+    golden_parser.add_argument(
+        "--methods", nargs="+", default=None, help="Methods (default: all)."
+    )
+    golden_parser.add_argument("--sizes", nargs="+", type=int, default=[20, 100])
+    golden_parser.add_argument("--missing-rate", type=float, default=0.05)
+    golden_parser.add_argument("--seed", type=int, default=0)
+    golden_parser.add_argument("--repeat", type=int, default=3)
+    golden_parser.add_argument("--rtol", type=float, default=1e-9)
+    golden_parser.add_argument("--atol", type=float, default=1e-12)
+    golden_parser.add_argument(
+        "--data-dir", type=str, default="data", help="Directory of sample requests."
+    )
+
+    generate_parser = subparsers.add_parser(
+        "generate", help="Write a synthetic request to a JSON file."
+    )
+    _add_request_arguments(generate_parser)
+    generate_parser.add_argument(
+        "--assess-type",
+        choices=("ranking", "classification", "self_assessment"),
+        default="ranking",
+    )
+    generate_parser.add_argument("output", type=str)
+
+    args = parser.parse_args()
+
+    if args.benchmark == "import-time":
+        result = import_time.run(args.import_budget_ms, args.cli_budget_ms, args.repeat)
+        print(json.dumps(result, indent=4))
+        sys.exit(0 if result["passed"] else 1)
+
+    if args.benchmark == "generate":
+        from . import synthetic
+
+        request = synthetic.generate_request(args.assess_type, **_request_config(args))
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(request, file, ensure_ascii=False)
+
+    if args.benchmark == "golden":
+        from . import golden
+
+        unknown = set(args.methods or ()) - set(golden.METHODS)
+        if unknown:
+            parser.error(f"Unknown methods: {', '.join(sorted(unknown))}")
+        result = golden.run(
+            args.methods,
+            args.sizes,
+            args.missing_rate,
+            args.seed,
+            args.repeat,
+            args.rtol,
+            args.atol,
+            args.data_dir,
+        )
+        print(json.dumps(result, ensure_ascii=False, indent=4))
+        sys.exit(0 if result["passed"] else 1)
+
+    if args.benchmark == "methods":
+        from . import method_time
+
+        unknown = set(args.cases or ()) - set(method_time.CASES)
+        if unknown:
+            parser.error(f"Unknown cases: {', '.join(sorted(unknown))}")
+        result = method_time.run(args.cases, _request_config(args), args.repeat)
+        if args.save:
+            with open(args.save, "w", encoding="utf-8") as file:
+                json.dump(result, file, ensure_ascii=False, indent=4)
+        if args.baseline:
+            with open(args.baseline, encoding="utf-8") as file:
+                baseline = json.load(file)
+            try:
+                result["regressions"] = method_time.compare(
+                    result, baseline, args.tolerance, args.min_ms
+                )
+            except ValueError as e:
+                parser.error(str(e))
+        print(json.dumps(result, ensure_ascii=False, indent=4))
+        sys.exit(1 if result.get("regressions") else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+# !/usr/bin/env python
+# @FileName  :golden.py
+# @Time      :2026/10/19 下午8:20
+# @Author    :Wenjie Xu
+# @Email     :wenjie.xu.cn@outlook.com
+
+"""
+Golden-output harness validating the fast methods against the reference ones.
+
+Every method runs in its current implementation and in the frozen reference
+implementation of ``benchmark.reference`` on the same sample and synthetic
+requests. Index values must agree within a tolerance; ranks, grade labels and all
+other non-float fields must agree exactly. The harness also reports the
+throughput of both implementations.
+"""
+
+import copy
+import importlib
+import json
+import math
+import numbers
+import os
+import statistics
+import time
+
+from ..core.MethodFactory import DecisionMethodFactory
+from ..core.UnifiedModel import UnifiedModel
+from . import synthetic
+
+# The assessment type, sample request and reference class of each method
+METHODS = {
+    "VIKOR": ("ranking", "ranking_data.json", "VIKOR"),
+    "MEE": ("classification", "classification_data.json", "MEE"),
+    "MACBETH": ("self_assessment", "selfassessment_data.json", "MACBETH"),
+}
+
+# Fields compared exactly even when numeric: ranks and grade labels
+EXACT_FIELDS = ("level",)
+# Fields identifying a record
+KEY_FIELDS = ("type", "dimension", "element", "node", "id")
+# Mismatches listed per comparison, beyond which they are only counted
+MAX_LISTED = 10
+
+
+def reference_class(method):
+    """Import the reference implementation of a method."""
+    module = importlib.import_module(f".reference.{METHODS[method][2]}", __package__)
+    return getattr(module, METHODS[method][2])
+
+
+def record_key(record):
+    return tuple(record.get(field) for field in KEY_FIELDS)
+
+
+def _is_float(value):
+    return isinstance(value, numbers.Real) and not isinstance(
+        value, (bool, numbers.Integral)
+    )
+
+
+def compare_values(reference, fast, rtol, atol, exact=False):
+    """
+    Compare two field values.
+
+    Returns
+    -------
+    tuple
+        Whether the values agree, and their absolute difference (0 for non-float
+        values).
+    """
+    if isinstance(reference, dict):
+        if not isinstance(fast, dict) or set(reference) != set(fast):
+            return False, 0.0
+        worst, agree = 0.0, True
+        for key, value in reference.items():
+            ok, diff = compare_values(value, fast[key], rtol, atol, exact)
+            agree, worst = agree and ok, max(worst, diff)
+        return agree, worst
+    if not exact and _is_float(reference) and _is_float(fast):
+        if math.isnan(reference) or math.isnan(fast):
+            return math.isnan(reference) and math.isnan(fast), 0.0
+        diff = abs(reference - fast)
+        return diff <= atol + rtol * abs(reference), diff
+    return reference == fast, 0.0
+
+
+def compare_records(reference, fast, rtol=1e-9, atol=1e-12):
+    """
+    Compare the records of the reference and the fast implementation.
+
+    Records are matched by their type, dimension, element, node and id. Every
+    reference record must have a fast counterpart; records only the fast
+    implementation emits (e.g. the nodes of a criteria tree) are counted.
+
+    Returns
+    -------
+    dict
+        The number of compared records, the missing and extra records, the value
+        and exact-field mismatches, the largest absolute difference of the index
+        values and whether the outputs agree.
+    """
+    fast_records = {record_key(record): record for record in fast}
+    missing, value_mismatches, exact_mismatches = [], [], []
+    mismatch_count = {"value": 0, "exact": 0}
+    max_abs_diff = 0.0
+    for record in reference:
+        key = record_key(record)
+        counterpart = fast_records.pop(key, None)
+        if counterpart is None:
+            missing.append(key)
+            continue
+        for field, value in record.items():
+            exact = field in EXACT_FIELDS
+            ok, diff = compare_values(
+                value, counterpart.get(field), rtol, atol, exact=exact
+            )
+            max_abs_diff = max(max_abs_diff, diff)
+            if ok:
+                continue
+            kind = "exact" if exact or not _is_float(value) else "value"
+            mismatch_count[kind] += 1
+            listed = exact_mismatches if kind == "exact" else value_mismatches
+            if len(listed) < MAX_LISTED:
+                listed.append(
+                    {
+                        "key": list(key),
+                        "field": field,
+                        "reference": value,
+                        "fast": counterpart.get(field),
+                    }
+                )
+    return {
+        "records": len(reference),
+        "missing": len(missing),
+        "missing_keys": [list(key) for key in missing[:MAX_LISTED]],
+        "extra": len(fast_records),
+        "value_mismatches": mismatch_count["value"],
+        "exact_mismatches": mismatch_count["exact"],
+        "mismatches": value_mismatches + exact_mismatches,
+        "max_abs_diff": max_abs_diff,
+        "passed": not missing and not any(mismatch_count.values()),
+    }
+
+
+def _run(factory, request, repeat):
+    """
+    Run one implementation ``repeat`` times on the prepared params of a request.
+
+    The weights and the scaling are computed once, outside the timings, so only
+    the assessment method is timed.
+    """
+    params = UnifiedModel(copy.deepcopy(request)).prepare()
+    timings, results = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = factory(params).execute()
+        timings.append((time.perf_counter() - start) * 1000)
+        if results is None:
+            raise RuntimeError("The method did not return results.")
+    return list(results), statistics.median(timings)
+
+
+def check(method, request, label, repeat=3, rtol=1e-9, atol=1e-12):
+    """
+    Compare the reference and the fast implementation of a method on a request.
+
+    Returns
+    -------
+    dict
+        The comparison of ``compare_records`` with the median time of both
+        implementations, the ``speedup`` of the fast one and its throughput.
+    """
+    reference_results, reference_ms = _run(reference_class(method), request, repeat)
+    fast_results, fast_ms = _run(
+        lambda params: DecisionMethodFactory.get_method(method, params),
+        request,
+        repeat,
+    )
+    # 按 JSON 输出比较, 与报告中的数值一致
+    reference_results = json.loads(json.dumps(reference_results, default=float))
+    fast_results = json.loads(json.dumps(fast_results, default=float))
+    report = {
+        "method": method,
+        "input": label,
+        **compare_records(reference_results, fast_results, rtol, atol),
+        "reference_ms": round(reference_ms, 3),
+        "fast_ms": round(fast_ms, 3),
+        "speedup": round(reference_ms / fast_ms, 2) if fast_ms else None,
+        "fast_records_per_s": round(len(fast_results) / fast_ms * 1000)
+        if fast_ms
+        else None,
+    }
+    return report
+
+
+def inputs(method, sizes, missing_rate=0.0, seed=0, data_dir="data"):
+    """
+    Yield the labelled requests a method is checked on.
+
+    The sample request of the method's assessment type (if ``data_dir`` holds
+    it), and a synthetic request of every size, each with and without a criteria
+    tree; the reference ignores the tree, so the tree only adds records.
+    """
+    assess_type, sample, _ = METHODS[method]
+    path = os.path.join(data_dir, sample)
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as file:
+            yield sample, json.load(file)
+    for n in sizes:
+        for tree_depth in (0, 2):
+            request = synthetic.generate_request(
+                assess_type,
+                n=n,
+                tree_depth=tree_depth,
+                missing_rate=missing_rate,
+                seed=seed,
+            )
+            request["assess_method"] = method
+            label = f"synthetic n={n} missing={missing_rate}"
+            yield label + (f" tree={tree_depth}" if tree_depth else ""), request
+
+
+def run(
+    methods=None,
+    sizes=(20, 100),
+    missing_rate=0.05,
+    seed=0,
+    repeat=3,
+    rtol=1e-9,
+    atol=1e-12,
+    data_dir="data",
+):
+    """
+    Run the golden-output harness.
+
+    Returns
+    -------
+    dict
+        The report of every method and input, and whether all of them passed.
+    """
+    reports = []
+    for method in methods or METHODS:
+        for label, request in inputs(method, sizes, missing_rate, seed, data_dir):
+            reports.append(check(method, request, label, repeat, rtol, atol))
+    return {
+        "rtol": rtol,
+        "atol": atol,
+        "reports": reports,
+        "passed": all(report["passed"] for report in reports),
+    }
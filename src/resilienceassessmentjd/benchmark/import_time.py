@@ -0,0 +1,117 @@
+# !/usr/bin/env python
+# @FileName  :import_time.py
+# @Time      :2026/10/19 下午2:40
+# @Author    :Wenjie Xu
+# @Email     :wenjie.xu.cn@outlook.com
+
+"""
+Import-time benchmark guarding the cold start of the package and the CLI.
+
+Every measurement runs in a fresh interpreter. Importing the package must stay
+within its time budget and must not load any of the heavy dependencies; the CLI
+``--help`` budget is measured on top of a bare interpreter start.
+"""
+
+import os
+import subprocess
+import sys
+import time
+
+import resilienceassessmentjd
+
+HEAVY_MODULES = ("numpy", "pandas", "scipy")
+
+_IMPORT_SNIPPET = """\
+import sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(elapsed, ",".join(m for m in {heavy!r} if m in sys.modules))
+"""
+
+
+def _environment():
+    """Make the package importable in the child interpreters."""
+    source_root = os.path.dirname(os.path.dirname(resilienceassessmentjd.__file__))
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        path for path in (source_root, env.get("PYTHONPATH")) if path
+    )
+    return env
+
+
+def measure_import(module="resilienceassessmentjd", repeat=5):
+    """
+    Measure the import time of ``module`` in fresh interpreters.
+
+    Returns
+    -------
+    tuple
+        The best import time in milliseconds and the heavy modules it loaded.
+    """
+    snippet = _IMPORT_SNIPPET.format(module=module, heavy=HEAVY_MODULES)
+    timings, loaded = [], set()
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", snippet],
+            capture_output=True,
+            text=True,
+            check=True,
+            env=_environment(),
+        ).stdout.split()
+        timings.append(float(output[0]) * 1000)
+        if len(output) > 1:
+            loaded.update(output[1].split(","))
+    return min(timings), sorted(loaded)
+
+
+def measure_command(args, repeat=5):
+    """Measure the best wall time of a Python command in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, *args],
+            capture_output=True,
+            check=True,
+            env=_environment(),
+        )
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+
+def run(import_budget_ms=100.0, cli_budget_ms=150.0, repeat=5):
+    """
+    Run the import-time benchmark.
+
+    Parameters
+    ----------
+    import_budget_ms : float
+        The maximum import time of the package.
+    cli_budget_ms : float
+        The maximum time of ``python -m resilienceassessmentjd --help`` beyond a
+        bare interpreter start.
+    repeat : int
+        The number of fresh interpreters per measurement; the best run counts.
+
+    Returns
+    -------
+    dict
+        The measurements, the budgets and whether all of them passed.
+    """
+    import_ms, loaded = measure_import(repeat=repeat)
+    interpreter_ms = measure_command(["-c", "pass"], repeat=repeat)
+    cli_ms = (
+        measure_command(["-m", "resilienceassessmentjd", "--help"], repeat=repeat)
+        - interpreter_ms
+    )
+    return {
+        "import_ms": round(import_ms, 2),
+        "import_budget_ms": import_budget_ms,
+        "heavy_modules_loaded": loaded,
+        "cli_help_ms": round(cli_ms, 2),
+        "cli_budget_ms": cli_budget_ms,
+        "passed": import_ms <= import_budget_ms
+        and cli_ms <= cli_budget_ms
+        and not loaded,
+    }
@@ -0,0 +1,200 @@
+# !/usr/bin/env python
+# @FileName  :method_time.py
+# @Time      :2026/10/19 下午7:55
+# @Author    :Wenjie Xu
+# @Email     :wenjie.xu.cn@outlook.com
+
+"""
+Method benchmark timing every weight and assessment method on synthetic requests.
+
+Every case runs a full request through ``UnifiedModel`` several times with the
+profiler on (without memory tracing, which would distort the timings), and
+records the median of the end-to-end time and of every stage. The results can be
+saved as a JSON baseline and later runs compared against it.
+"""
+
+import copy
+import platform
+import statistics
+import time
+
+import numpy as np
+
+from ..core.UnifiedModel import UnifiedModel
+from . import synthetic
+
+# The request changes of each case on top of the synthetic request of its type
+CASES = {
+    "VIKOR": ("ranking", {"assess_method": "VIKOR"}),
+    "MEE": ("classification", {"assess_method": "MEE"}),
+    "MACBETH": ("self_assessment", {"assess_method": "MACBETH"}),
+    "HEWM": ("ranking", {"weight_method": {"subjective_method": "HEWM"}}),
+    "AHP": ("ranking", {"weight_method": {"subjective_method": "AHP"}}),
+    "EWM": ("ranking", {"weight_method": {"objective_method": "EWM"}}),
+    "PCA": ("ranking", {"weight_method": {"objective_method": "PCA"}}),
+    "DEMATEL": ("ranking", {"assess_method": "DEMATEL"}),
+}
+
+
+def build_request(case, config):
+    """
+    Build the synthetic request of a benchmark case.
+
+    Parameters
+    ----------
+    case : str
+        One of ``CASES``.
+    config : dict
+        The keyword arguments of ``synthetic.generate_request``, except
+        ``assess_type``.
+    """
+    assess_type, changes = CASES[case]
+    request = synthetic.generate_request(assess_type, **config)
+    request.update(copy.deepcopy(changes))
+    m = len(request["parameters"]["criteria"])
+    rng = np.random.default_rng(config.get("seed", 0))
+    if case == "AHP":
+        request["parameters"]["ahp_params"] = synthetic.judgment_matrix(
+            m, rng=rng
+        ).tolist()
+    elif case == "DEMATEL":
+        request["parameters"]["dematel_params"] = {
+            "matrix": synthetic.influence_matrix(m, rng=rng).tolist(),
+            "include_matrices": False,
+        }
+    return request
+
+
+def _failure(response):
+    """The error message of a response, or None if the request succeeded."""
+    if response.get("status") != "0":
+        return response.get("message", "The request failed.")
+    results = response.get("results")
+    if isinstance(results, dict) and "error" in results:
+        return results["error"]
+    return None
+
+
+def time_case(case, config, repeat=5):
+    """
+    Time one benchmark case.
+
+    Returns
+    -------
+    dict
+        The status, the end-to-end ``median_ms`` and ``best_ms``, and the median
+        wall time of every stage under ``stages``.
+    """
+    request = build_request(case, config)
+    request["profile"] = {"trace_memory": False}
+    timings, stages = [], {}
+    for _ in range(repeat):
+        # Criterion consumes the request, so every run gets a fresh copy
+        run_request = copy.deepcopy(request)
+        start = time.perf_counter()
+        response = UnifiedModel(run_request).execute()
+        timings.append((time.perf_counter() - start) * 1000)
+        error = _failure(response)
+        if error is not None:
+            return {"case": case, "status": "error", "message": error}
+        for record in response["profile"]:
+            stages.setdefault(record["stage"], []).append(record["wall_ms"])
+    return {
+        "case": case,
+        "status": "success",
+        "median_ms": round(statistics.median(timings), 3),
+        "best_ms": round(min(timings), 3),
+        "stages": {
+            stage: round(statistics.median(values), 3)
+            for stage, values in stages.items()
+        },
+    }
+
+
+def run(cases=None, config=None, repeat=5):
+    """
+    Run the method benchmark.
+
+    Parameters
+    ----------
+    cases : list of str, optional
+        The cases to run, by default all of ``CASES``.
+    config : dict, optional
+        The keyword arguments of ``synthetic.generate_request``.
+    repeat : int
+        The number of runs of every case; the medians are reported.
+
+    Returns
+    -------
+    dict
+        The configuration, the environment and the result of every case; the
+        format of a baseline.
+    """
+    config = dict(config or {})
+    results = [time_case(case, config, repeat) for case in cases or CASES]
+    return {
+        "config": config,
+        "repeat": repeat,
+        "environment": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "system": platform.system(),
+        },
+        "results": results,
+    }
+
+
+def compare(current, baseline, tolerance=0.25, min_ms=1.0):
+    """
+    Compare a benchmark run against a baseline.
+
+    A case or stage regresses when its median time exceeds the baseline by more
+    than ``tolerance`` (relative) and ``min_ms`` (absolute, so that sub-millisecond
+    stages do not flag noise). Cases that succeeded in the baseline and fail now
+    regress as well.
+
+    Returns
+    -------
+    list of dict
+        The regressions, empty if none.
+
+    Raises
+    ------
+    ValueError
+        If the two runs used different synthetic request configurations.
+    """
+    if current["config"] != baseline["config"]:
+        raise ValueError(
+            "The baseline was recorded with another configuration: "
+            f"{baseline['config']}"
+        )
+    previous = {result["case"]: result for result in baseline["results"]}
+    regressions = []
+    for result in current["results"]:
+        before = previous.get(result["case"])
+        if before is None or before["status"] != "success":
+            continue
+        if result["status"] != "success":
+            regressions.append(
+                {"case": result["case"], "stage": None, "message": result["message"]}
+            )
+            continue
+        timings = [(None, before["median_ms"], result["median_ms"])]
+        timings += [
+            (stage, before["stages"][stage], median)
+            for stage, median in result["stages"].items()
+            if stage in before["stages"]
+        ]
+        for stage, old, new in timings:
+            if new > old * (1 + tolerance) and new - old > min_ms:
+                regressions.append(
+                    {
+                        "case": result["case"],
+                        "stage": stage,
+                        "baseline_ms": old,
+                        "median_ms": new,
+                        "ratio": round(new / old, 3),
+                    }
+                )
+    return regressions
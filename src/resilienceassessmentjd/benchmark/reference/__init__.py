@@ -0,0 +1,7 @@
+"""
+Reference implementations of the assessment methods.
+
+Frozen copies of the original, unvectorized ``VIKOR``, ``MEE`` and ``MACBETH``.
+They are not registered in the factory; the golden-output harness runs them next
+to the current implementations to validate every fast path. Do not optimize them.
+"""
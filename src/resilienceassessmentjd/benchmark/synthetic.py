@@ -0,0 +1,211 @@
+# !/usr/bin/env python
+# @FileName  :synthetic.py
+# @Time      :2026/10/19 下午7:40
+# @Author    :Wenjie Xu
+# @Email     :wenjie.xu.cn@outlook.com
+
+"""
+Synthetic assessment requests in the schema of the ``data/*.json`` samples.
+
+The size (warehouses, criteria, periods), the shape of the criteria hierarchy
+and the rate of missing (-99) values are controlled independently, and every
+request is reproducible from its seed.
+"""
+
+import numpy as np
+
+MISSING = -99
+
+# The request skeleton of each assessment type, as in the sample requests
+ASSESS_TYPES = {
+    "ranking": {"normalization": "MinMax", "assess_method": "VIKOR"},
+    "classification": {"normalization": "MinMax", "assess_method": "MEE"},
+    "self_assessment": {"normalization": "BRM", "assess_method": "MACBETH"},
+}
+
+AREAS = ("110101", "110102", "310101", "440103", "510104")
+
+
+def generate_criteria(m, elements=1, dimensions=3, rng=None):
+    """
+    Generate ``m`` criteria spread round-robin over the dimensions of the elements.
+
+    Parameters
+    ----------
+    m : int
+        The number of criteria.
+    elements : int
+        The number of elements.
+    dimensions : int
+        The number of dimensions of every element.
+    rng : numpy.random.Generator, optional
+        Draws the attribute ("0", "1" or "2") of every criterion.
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    attributes = rng.choice(["0", "1", "2"], size=m, p=[0.45, 0.45, 0.1])
+    criteria = []
+    for i in range(m):
+        group = i % (elements * dimensions)
+        criteria.append(
+            {
+                "name": f"Criterion {i + 1}",
+                "dimension": f"D{group % dimensions + 1}",
+                "element": f"E{group // dimensions + 1}",
+                "attribute": str(attributes[i]),
+            }
+        )
+    return criteria
+
+
+def generate_tree(criteria, depth, branching=2):
+    """
+    Attach the criteria to the leaves of a balanced criteria tree.
+
+    Parameters
+    ----------
+    criteria : list of dict
+        The criteria; every one gets the ``parent`` leaf it hangs on.
+    depth : int
+        The depth of the leaves below the root.
+    branching : int
+        The number of children of every inner node.
+
+    Returns
+    -------
+    list of dict
+        The parent-pointer nodes of ``parameters.criteria_tree``.
+    """
+    nodes = [{"name": "N", "parent": None}]
+    level = ["N"]
+    for _ in range(depth):
+        children = []
+        for parent in level:
+            for b in range(branching):
+                name = f"{parent}.{b + 1}"
+                nodes.append({"name": name, "parent": parent})
+                children.append(name)
+        level = children
+    for i, criterion in enumerate(criteria):
+        criterion["parent"] = level[i % len(level)]
+    return nodes
+
+
+def generate_values(n, m, periods=1, missing_rate=0.0, rng=None):
+    """
+    Generate the criterion values of ``n`` warehouses over ``periods`` periods.
+
+    The values are log-normal, so the criteria span several orders of magnitude
+    like the sample data, and drift slowly between periods. A share
+    ``missing_rate`` of the values is replaced by -99.
+
+    Returns
+    -------
+    ndarray
+        The (n * periods)×m values, the periods of a warehouse in adjacent rows.
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    scales = rng.lognormal(mean=2.0, sigma=2.0, size=m)
+    base = rng.lognormal(mean=0.0, sigma=1.0, size=(n, 1, m)) * scales
+    drift = rng.normal(1.0, 0.05, size=(n, periods, m)).cumprod(axis=1)
+    values = np.round(base * drift, 3).reshape(n * periods, m)
+    values[rng.random(values.shape) < missing_rate] = MISSING
+    return values
+
+
+def generate_request(
+    assess_type="ranking",
+    n=100,
+    m=14,
+    periods=None,
+    elements=1,
+    dimensions=3,
+    tree_depth=0,
+    tree_branching=2,
+    missing_rate=0.0,
+    seed=0,
+):
+    """
+    Generate a synthetic assessment request.
+
+    Parameters
+    ----------
+    assess_type : str
+        "ranking", "classification" or "self_assessment"; sets the normalization
+        and the assessment method of the request as in the sample requests.
+    n : int
+        The number of warehouses.
+    m : int
+        The number of criteria.
+    periods : int, optional
+        The number of periods of every warehouse. By default 3 for
+        "self_assessment" and 1 otherwise; with more than one period every data
+        entry gets a ``period``.
+    elements, dimensions : int
+        The shape of the dimension/element hierarchy.
+    tree_depth, tree_branching : int
+        The shape of an additional ``criteria_tree``; 0 for no tree.
+    missing_rate : float
+        The share of values replaced by -99.
+    seed : int
+        The seed of the random generator.
+
+    Returns
+    -------
+    dict
+        The request, with HEWM weights.
+    """
+    if assess_type not in ASSESS_TYPES:
+        raise ValueError(f"Unknown assessment type: {assess_type}")
+    if periods is None:
+        periods = 3 if assess_type == "self_assessment" else 1
+    rng = np.random.default_rng(seed)
+    criteria = generate_criteria(m, elements, dimensions, rng)
+    values = generate_values(n, m, periods, missing_rate, rng).tolist()
+    areas = rng.choice(AREAS, size=n)
+
+    data = []
+    for i in range(n):
+        for p in range(periods):
+            entry = {
+                "id": f"Warehouse {i + 1}",
+                "value": values[i * periods + p],
+                "area": str(areas[i]),
+            }
+            if periods > 1:
+                entry["period"] = str(2020 + p)
+            data.append(entry)
+
+    parameters = {"criteria": criteria, "data": data}
+    if tree_depth:
+        parameters["criteria_tree"] = generate_tree(
+            criteria, tree_depth, tree_branching
+        )
+    return {
+        "assess_type": assess_type,
+        "weight_method": {"subjective_method": "HEWM"},
+        **ASSESS_TYPES[assess_type],
+        "parameters": parameters,
+    }
+
+
+def judgment_matrix(m, noise=0.1, rng=None):
+    """
+    Generate a positive reciprocal AHP judgment matrix of order ``m``.
+
+    The judgments are the ratios of random priorities, perturbed log-normally, so
+    the matrix is nearly consistent.
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    priorities = rng.dirichlet(np.ones(m))
+    # 反对称的对数扰动保持互反性 a_ji = 1 / a_ij
+    log_noise = np.triu(rng.normal(0.0, noise, size=(m, m)), 1)
+    matrix = np.outer(priorities, 1 / priorities) * np.exp(log_noise - log_noise.T)
+    return matrix
+
+
+def influence_matrix(m, density=0.5, rng=None):
+    """Generate a DEMATEL direct influence matrix with judgments 0-4."""
+    rng = np.random.default_rng() if rng is None else rng
+    matrix = rng.integers(1, 5, size=(m, m)) * (rng.random((m, m)) < density)
+    np.fill_diagonal(matrix, 0)
+    return matrix.astype(float)
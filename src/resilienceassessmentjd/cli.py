@@ -2,33 +2,166 @@ import argparse
 import json
 import os
 
-from .core.UnifiedModel import UnifiedModel
+# 各输出格式与压缩方式的文件扩展名
+FORMAT_EXTENSIONS = {
+    "pretty": ".json",
+    "json": ".json",
+    "jsonl": ".jsonl",
+    "parquet": ".parquet",
+}
+COMPRESSION_EXTENSIONS = {None: "", "gzip": ".gz", "zstd": ".zst"}
 
 
 def main():
     parser = argparse.ArgumentParser(description="Run Resilience Assessment.")
-    parser.add_argument("input_path", type=str, help="Path to the input JSON file.")
+    parser.add_argument(
+        "input_path",
+        type=str,
+        help="Path to the input JSON file, or a directory of them (batch mode).",
+    )
     parser.add_argument("output_path", type=str, help="Path to the output JSON file.")
+    parser.add_argument(
+        "--format",
+        choices=tuple(FORMAT_EXTENSIONS),
+        default="pretty",
+        help="pretty: indented JSON (default); json: compact JSON streamed record "
+        "by record; jsonl: one record per line, streamed; parquet: typed columns, "
+        "one file per method (pyarrow must be installed).",
+    )
+    parser.add_argument(
+        "--encoder",
+        choices=("json", "orjson"),
+        default="json",
+        help="JSON encoder of the streamed formats (orjson must be installed).",
+    )
+    parser.add_argument(
+        "--compress",
+        choices=("gzip", "zstd"),
+        default=None,
+        help="Compress the output (zstd requires zstandard).",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Add the wall time, CPU time and memory of every stage to the "
+        "response under 'profile'.",
+    )
+    parser.add_argument(
+        "--metrics",
+        type=str,
+        default=None,
+        help="Write the stage timings of all requests as Prometheus counters to "
+        "this file (implies --profile).",
+    )
 
     args = parser.parse_args()
 
+    # 延迟导入模型, 使 --help 等无需加载 NumPy/pandas
+    from .core.Profiler import ProfileMetrics
+    from .core.ResultSink import check_compression, get_encoder
+    from .core.ResultTable import require_pyarrow
+
+    if args.format == "parquet" and args.compress:
+        parser.error("Parquet files are compressed internally; drop --compress.")
+    # 可选依赖缺失时, 在计算之前报错
+    try:
+        get_encoder(args.encoder)
+        check_compression(args.compress)
+        if args.format == "parquet":
+            require_pyarrow()
+    except ImportError as e:
+        parser.error(str(e))
+
+    # 汇总指标需要各请求的阶段耗时
+    profile = args.profile or bool(args.metrics)
+    # 目录输入时批量处理其中的所有 JSON 请求
+    if os.path.isdir(args.input_path):
+        input_paths = sorted(
+            os.path.join(args.input_path, entry)
+            for entry in os.listdir(args.input_path)
+            if entry.endswith(".json")
+        )
+    else:
+        input_paths = [args.input_path]
+
+    metrics = ProfileMetrics()
+    for input_path in input_paths:
+        response = run_request(args, input_path, profile)
+        metrics.add(response)
+    if args.metrics:
+        with open(args.metrics, "w", encoding="utf-8") as file:
+            file.write(metrics.to_prometheus())
+
+
+def run_request(args, input_path, profile=False):
+    """Assess one request file and write its result; return the response."""
+    from .core.ResultSink import open_output, write_response
+    from .core.UnifiedModel import UnifiedModel
+
     # 读取输入文件
-    with open(args.input_path, encoding="utf-8") as file:
+    with open(input_path, encoding="utf-8") as file:
         request_json = json.load(file)
-
-    # 初始化模型并执行
-    model = UnifiedModel(request_json)
-    result = model.execute()
+    if profile:
+        request_json["profile"] = True
 
     # 自动生成输出文件名
-    base_name = os.path.basename(args.input_path)  # 获取输入文件名
+    base_name = os.path.basename(input_path)  # 获取输入文件名
     name, ext = os.path.splitext(base_name)  # 分离文件名和扩展名
-    output_filename = f"{name}_result.json"  # 新文件名
+    output_filename = (
+        f"{name}_result"
+        + FORMAT_EXTENSIONS[args.format]
+        + COMPRESSION_EXTENSIONS[args.compress]
+    )  # 新文件名
     output_file_path = os.path.join(args.output_path, output_filename)
 
-    # 保存结果
-    with open(output_file_path, "w", encoding="utf-8") as file:
-        json.dump(result, file, ensure_ascii=False, indent=4)
+    # 初始化模型并执行
+    model = UnifiedModel(request_json)
+    if args.format == "parquet":
+        import pyarrow.parquet as pq
+
+        response = model.execute(columnar=True)
+        if response["status"] != "0":
+            # 没有结果表时写出错误响应
+            path = os.path.join(args.output_path, f"{name}_result.json")
+            with open(path, "w", encoding="utf-8") as file:
+                json.dump(response, file, ensure_ascii=False, indent=4)
+            return response
+        results = response["results"]
+        # 多方法时各方法的列类型不同, 每个方法写出一个文件
+        tables = results if isinstance(results, dict) else {None: results}
+        for method, table in tables.items():
+            path = output_file_path
+            if method is not None:
+                path = os.path.join(args.output_path, f"{name}_result.{method}.parquet")
+            pq.write_table(table, path)
+        return response
+    if args.format == "pretty":
+        result = model.execute()
+        # 保存结果
+        with open_output(output_file_path, args.compress) as file:
+            file.write(json.dumps(result, ensure_ascii=False, indent=4).encode("utf-8"))
+        return result
+
+    # 流式写出: 记录边计算边编码写入, 不在内存中保留完整结果
+    response = model.execute(stream=True)
+    try:
+        write_response(
+            response,
+            output_file_path,
+            args.format,
+            args.encoder,
+            args.compress,
+        )
+    except Exception as e:
+        response = {"status": "1", "message": f"Exception information: {str(e)}"}
+        write_response(
+            response,
+            output_file_path,
+            args.format,
+            args.encoder,
+            args.compress,
+        )
+    return response
 
 
 if __name__ == "__main__":
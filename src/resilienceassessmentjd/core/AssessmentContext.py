@@ -0,0 +1,178 @@
+# !/usr/bin/env python
+# @FileName  :AssessmentContext.py
+# @Time      :2026/10/19 下午4:45
+# @Author    :Wenjie Xu
+# @Email     :wenjie.xu.cn@outlook.com
+
+import threading
+from types import MappingProxyType
+
+import numpy as np
+
+from .CriteriaHierarchy import CriteriaHierarchy
+
+
+def _read_only(array, dtype=float):
+    """Return ``array`` as a read-only array, copying only to convert the dtype."""
+    array = np.asarray(array, dtype=dtype)
+    if array.flags.writeable:
+        array = array.view()
+        array.setflags(write=False)
+    return array
+
+
+class AssessmentContext:
+    """
+    The immutable, precomputed data of one assessment request.
+
+    The context is built once per request, after scaling and weighting, and is
+    shared by every assessment method. The NumPy blocks are read-only, so methods
+    slice them without copying and several methods can read the same context from
+    different threads.
+
+    Attributes
+    ----------
+    ids : tuple
+        The object ids, in the row order of the blocks.
+    areas : tuple
+        The area of every object.
+    row_of : mapping
+        Maps each id to its row in the blocks.
+    invalid : ndarray
+        True for the objects without any valid data.
+    criteria_names : tuple
+        The criteria, in the column order of the blocks.
+    criteria : mapping
+        The read-only metadata (dimension, element, attribute) of each criterion.
+    attributes : tuple
+        The attribute of every criterion ("0" benefit, "1" cost, "2" binary).
+    filled : ndarray
+        The n×m filled data.
+    normalized : ndarray or None
+        The n×m normalized data, if a scaling method succeeded.
+    weights : ndarray
+        The n×m weights, one row per object.
+    hierarchy : CriteriaHierarchy
+        The column positions of every element, dimension and dimension/element.
+    groups : tuple
+        The ``(fields, columns)`` assessment groups in output order: 综合评估,
+        要素评估 per element and 维度评估 per dimension/element, where ``columns``
+        holds the column positions of the criteria of the group.
+    tree : CriteriaTree or None
+        The parent-pointer tree of criteria, if the request gives one.
+    """
+
+    __slots__ = (
+        "ids",
+        "areas",
+        "row_of",
+        "invalid",
+        "criteria_names",
+        "criteria",
+        "attributes",
+        "filled",
+        "normalized",
+        "weights",
+        "hierarchy",
+        "groups",
+        "tree",
+        "_derived",
+        "_lock",
+    )
+
+    def __init__(
+        self,
+        ids,
+        areas,
+        invalid_ids,
+        criteria_names,
+        criteria_dict,
+        filled,
+        normalized,
+        weights,
+        hierarchy=None,
+        tree=None,
+    ):
+        criteria_names = tuple(criteria_names)
+        if hierarchy is None:
+            hierarchy = CriteriaHierarchy(criteria_dict, criteria_names)
+        filled = _read_only(filled)
+        weights = np.asarray(weights, dtype=float)
+        if weights.ndim == 1:
+            weights = np.broadcast_to(weights, filled.shape)
+        if weights.shape != filled.shape:
+            raise ValueError("The weights must give one row of weights per object.")
+        invalid_ids = set(invalid_ids)
+        values = {
+            "ids": tuple(ids),
+            "areas": tuple(areas),
+            "row_of": MappingProxyType({_id: i for i, _id in enumerate(ids)}),
+            "invalid": _read_only([_id in invalid_ids for _id in ids], dtype=bool),
+            "criteria_names": criteria_names,
+            "criteria": MappingProxyType(
+                {
+                    name: MappingProxyType(dict(criteria_dict[name]))
+                    for name in criteria_names
+                }
+            ),
+            "attributes": tuple(
+                criteria_dict[name].get("attribute") for name in criteria_names
+            ),
+            "filled": filled,
+            "normalized": None if normalized is None else _read_only(normalized),
+            "weights": _read_only(weights),
+            "hierarchy": hierarchy,
+            "groups": tuple(
+                (MappingProxyType(fields), columns)
+                for fields, columns in hierarchy.groups()
+            ),
+            "tree": tree,
+            "_derived": {},
+            "_lock": threading.Lock(),
+        }
+        for name, value in values.items():
+            object.__setattr__(self, name, value)
+
+    @classmethod
+    def from_params(cls, params):
+        """Build the context from the request params of ``Criterion`` and the weights."""
+        filled_df = params["filled_data"]
+        criteria_names = params["criteria_names"]
+        norm_df = params.get("norm_data")
+        ids = list(filled_df.index)
+        return cls(
+            ids=ids,
+            areas=[params["ids_area"][_id] for _id in ids],
+            invalid_ids=params.get("invalid_ids", ()),
+            criteria_names=criteria_names,
+            criteria_dict=params["criteria_dict"],
+            filled=filled_df[list(criteria_names)].to_numpy(dtype=float),
+            normalized=None
+            if norm_df is None
+            else norm_df[list(criteria_names)].to_numpy(dtype=float),
+            weights=params["weights"],
+            hierarchy=params.get("hierarchy"),
+            tree=params.get("tree"),
+        )
+
+    def __setattr__(self, name, value):
+        raise AttributeError("AssessmentContext is immutable.")
+
+    def __delattr__(self, name):
+        raise AttributeError("AssessmentContext is immutable.")
+
+    def derived(self, key, build):
+        """
+        Return a block derived from the context, building it on first use.
+
+        Methods sharing a preprocessing step (e.g. the ranking block of VIKOR,
+        TOPSIS and GRA) compute it once per request. ``build`` is called with the
+        context and its result is made read-only.
+        """
+        with self._lock:
+            if key not in self._derived:
+                block = build(self)
+                if isinstance(block, np.ndarray):
+                    block.setflags(write=False)
+                self._derived[key] = block
+            return self._derived[key]
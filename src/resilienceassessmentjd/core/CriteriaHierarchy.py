@@ -0,0 +1,131 @@
+# !/usr/bin/env python
+# @FileName  :CriteriaHierarchy.py
+# @Time      :2026/10/19 下午5:10
+# @Author    :Wenjie Xu
+# @Email     :wenjie.xu.cn@outlook.com
+
+import re
+
+import numpy as np
+
+LEVELS = ("elements", "dimensions", "pairs")
+
+
+def natural_key(label):
+    """Sort key placing "E2" before "E10"."""
+    return tuple(
+        (0, int(part), "") if part.isdigit() else (1, 0, part)
+        for part in re.split(r"(\d+)", str(label))
+        if part
+    )
+
+
+def pair_key(pair):
+    """Sort key of a (dimension, element) pair, dimension first."""
+    return tuple(natural_key(label) for label in pair)
+
+
+def _read_only(columns):
+    columns = np.asarray(columns, dtype=np.intp)
+    columns.setflags(write=False)
+    return columns
+
+
+class CriteriaHierarchy:
+    """
+    Integer index of the dimension/element hierarchy of the criteria.
+
+    The index is built once by ``Criterion`` and holds the column positions of the
+    criteria of every element, dimension and (dimension, element) pair, for any
+    number of dimensions and elements. Labels are ordered naturally (``E2`` before
+    ``E10``), pairs by dimension first.
+
+    Parameters
+    ----------
+    criteria_dict : dict
+        The metadata of each criterion, with its ``dimension`` and ``element``.
+        Criteria without them are left out of the element and dimension groups.
+    criteria_names : sequence of str
+        The criteria, in column order.
+
+    Attributes
+    ----------
+    elements : dict
+        Maps each element to the column positions of its criteria.
+    dimensions : dict
+        Maps each dimension to the column positions of its criteria.
+    pairs : dict
+        Maps each ``(dimension, element)`` pair to the column positions of its
+        criteria.
+    """
+
+    def __init__(self, criteria_dict, criteria_names):
+        self.criteria_names = tuple(criteria_names)
+        dimensions = [criteria_dict[name].get("dimension") for name in criteria_names]
+        elements = [criteria_dict[name].get("element") for name in criteria_names]
+        self.elements = self._index(elements, natural_key)
+        self.dimensions = self._index(dimensions, natural_key)
+        self.pairs = self._index(zip(dimensions, elements, strict=True), pair_key)
+
+    @staticmethod
+    def _index(labels, key):
+        positions = {}
+        for j, label in enumerate(labels):
+            # Criteria placed only in a ``CriteriaTree`` have no dimension/element
+            if label is None or (isinstance(label, tuple) and None in label):
+                continue
+            positions.setdefault(label, []).append(j)
+        return {
+            label: _read_only(positions[label]) for label in sorted(positions, key=key)
+        }
+
+    def names(self, columns):
+        """Return the names of the criteria at ``columns``."""
+        return [self.criteria_names[j] for j in columns]
+
+    def groups(self):
+        """
+        List the assessment groups in output order.
+
+        Returns
+        -------
+        list of tuple
+            ``(fields, columns)`` for 综合评估, 要素评估 per element and 维度评估 per
+            dimension/element pair, where ``fields`` are the record fields
+            identifying the group.
+        """
+        groups = [({"type": "综合评估"}, _read_only(range(len(self.criteria_names))))]
+        for element, columns in self.elements.items():
+            groups.append(({"type": "要素评估", "element": element}, columns))
+        for (dimension, element), columns in self.pairs.items():
+            fields = {"type": "维度评估", "dimension": dimension, "element": element}
+            groups.append((fields, columns))
+        return groups
+
+    def segment_sum(self, values, level, axis=-1):
+        """
+        Sum ``values`` over the criteria of every group of one level.
+
+        Parameters
+        ----------
+        values : ndarray
+            An array with one entry per criterion along ``axis``.
+        level : str
+            "elements", "dimensions" or "pairs".
+
+        Returns
+        -------
+        ndarray
+            The group sums along ``axis``, in the order of the level's groups. Each
+            group is summed like ``values`` restricted to its criteria, so the
+            results match a sum over the selected columns exactly.
+        """
+        if level not in LEVELS:
+            raise ValueError(f"Unknown hierarchy level: {level}")
+        return np.stack(
+            [
+                np.take(values, columns, axis=axis).sum(axis=axis)
+                for columns in getattr(self, level).values()
+            ],
+            axis=axis,
+        )
@@ -0,0 +1,166 @@
+# !/usr/bin/env python
+# @FileName  :CriteriaTree.py
+# @Time      :2026/10/19 下午5:40
+# @Author    :Wenjie Xu
+# @Email     :wenjie.xu.cn@outlook.com
+
+import numpy as np
+from scipy import sparse
+
+
+class CriteriaTree:
+    """
+    An arbitrary-depth tree of criteria given by parent pointers.
+
+    The internal nodes are listed in ``criteria_tree`` as ``{"name", "parent"}``
+    (``parent`` is null for a root) and every criterion names its node in
+    ``parent``::
+
+        "criteria_tree": [
+            {"name": "保障能力", "parent": null},
+            {"name": "设施", "parent": "保障能力"}
+        ],
+        "criteria": [{"name": "库容", "parent": "设施", "attribute": "0"}]
+
+    The nodes are numbered in depth-first order, so the criteria below every node
+    are one contiguous range of the depth-first leaf order. Scores roll up to all
+    nodes at once: sums with one product by the sparse node × criterion
+    aggregation matrix, maxima with one segmented reduction over the ranges.
+
+    Parameters
+    ----------
+    tree_nodes : list of dict
+        The internal nodes with their ``name`` and ``parent``.
+    criteria_dict : dict
+        The metadata of each criterion, with the ``parent`` node of the criterion.
+    criteria_names : sequence of str
+        The criteria, in column order.
+
+    Attributes
+    ----------
+    nodes : tuple
+        The node names in depth-first order. Nodes left without criteria (e.g. all
+        their criteria were dropped as missing) are omitted.
+    parents : tuple
+        The parent of every node, or None for a root.
+    depths : ndarray
+        The depth of every node, 0 for the roots.
+    leaf_order : ndarray
+        The column positions of the criteria in depth-first order.
+    starts, ends : ndarray
+        The range of every node in ``leaf_order``.
+    aggregation : scipy.sparse.csr_matrix
+        The nodes × criteria 0/1 matrix; entry (i, j) is 1 when criterion j lies
+        below node i.
+    """
+
+    def __init__(self, tree_nodes, criteria_dict, criteria_names):
+        parent_of = {}
+        for node in tree_nodes:
+            name = node["name"]
+            if name in parent_of or name in criteria_dict:
+                raise ValueError(f"Duplicate criteria tree node: {name}")
+            parent_of[name] = node.get("parent")
+        children = {name: [] for name in parent_of}
+        roots = []
+        for name, parent in parent_of.items():
+            if parent is None:
+                roots.append(name)
+            elif parent in children:
+                children[parent].append(name)
+            else:
+                raise ValueError(f"Unknown parent {parent} of tree node {name}")
+        leaves = {name: [] for name in parent_of}
+        for j, name in enumerate(criteria_names):
+            parent = criteria_dict[name].get("parent")
+            if parent is None:
+                continue
+            if parent not in leaves:
+                raise ValueError(f"Unknown parent {parent} of criterion {name}")
+            leaves[parent].append(j)
+
+        nodes, parents, depths, starts, ends, leaf_order = [], [], [], [], [], []
+        visited = set()
+
+        def visit(name, parent, depth):
+            visited.add(name)
+            index, start = len(nodes), len(leaf_order)
+            nodes.append(name)
+            parents.append(parent)
+            depths.append(depth)
+            starts.append(start)
+            ends.append(start)
+            leaf_order.extend(leaves[name])
+            for child in children[name]:
+                visit(child, name, depth + 1)
+            ends[index] = len(leaf_order)
+
+        for root in roots:
+            visit(root, None, 0)
+        if len(visited) != len(parent_of):
+            cyclic = sorted(set(parent_of) - visited)
+            raise ValueError(f"The criteria tree contains a cycle: {cyclic}")
+
+        keep = [i for i in range(len(nodes)) if ends[i] > starts[i]]
+        self.criteria_names = tuple(criteria_names)
+        self.nodes = tuple(nodes[i] for i in keep)
+        self.parents = tuple(parents[i] for i in keep)
+        self.depths = np.array([depths[i] for i in keep], dtype=int)
+        self.leaf_order = np.array(leaf_order, dtype=np.intp)
+        self.starts = np.array([starts[i] for i in keep], dtype=np.intp)
+        self.ends = np.array([ends[i] for i in keep], dtype=np.intp)
+
+        rows = np.repeat(np.arange(len(self.nodes)), self.ends - self.starts)
+        cols = np.concatenate(
+            [self.leaf_order[s:e] for s, e in zip(self.starts, self.ends, strict=True)]
+            or [np.empty(0, dtype=np.intp)]
+        )
+        self.aggregation = sparse.csr_matrix(
+            (np.ones(len(rows)), (rows, cols)),
+            shape=(len(self.nodes), len(self.criteria_names)),
+        )
+
+    def columns(self, node_index):
+        """Return the column positions of the criteria below a node."""
+        return self.leaf_order[self.starts[node_index] : self.ends[node_index]]
+
+    def fields(self, node_index):
+        """Return the record fields identifying a node."""
+        return {
+            "type": "节点评估",
+            "node": self.nodes[node_index],
+            "parent": self.parents[node_index],
+            "depth": int(self.depths[node_index]),
+        }
+
+    def rollup_sum(self, values):
+        """
+        Sum the criteria of every node.
+
+        Parameters
+        ----------
+        values : ndarray
+            An n×m array, one column per criterion.
+
+        Returns
+        -------
+        ndarray
+            The n×k node sums, one sparse-dense product for all nodes.
+        """
+        return np.asarray((self.aggregation @ np.asarray(values).T).T)
+
+    def rollup_max(self, values):
+        """
+        Take the maximum over the criteria of every node, ignoring NaN.
+
+        Returns
+        -------
+        ndarray
+            The n×k node maxima; NaN where all criteria of a node are NaN.
+        """
+        values = np.asarray(values)
+        ordered = values[:, self.leaf_order]
+        # 追加一列, 使末端位置也是有效下标; 交错的起止下标只取偶数位结果
+        padded = np.concatenate([ordered, ordered[:, :1]], axis=1)
+        bounds = np.column_stack([self.starts, self.ends]).ravel()
+        return np.fmax.reduceat(padded, bounds, axis=1)[:, ::2]
@@ -10,6 +10,9 @@ import traceback
 import numpy as np
 import pandas as pd
 
+from .CriteriaHierarchy import CriteriaHierarchy
+from .CriteriaTree import CriteriaTree
+
 
 class Criterion:
     """
@@ -51,7 +54,14 @@ class Criterion:
             )  # Add the filled data to the parameters
             self.params["ids_area"] = self.ids_area
             self.params["invalid_ids"] = self.invalid_ids
-            if self.assess_method == "MEE":
+            # Column positions of every element, dimension and dimension/element
+            self.params["hierarchy"] = CriteriaHierarchy(
+                self.criteria_dict, self.criteria_names
+            )
+            assess_methods = self.assess_method
+            if not isinstance(assess_methods, (list, tuple)):
+                assess_methods = [assess_methods]
+            if "MEE" in assess_methods:
                 level_boundaries = self.mee_level_boundaries()
                 self.params["level_boundaries"] = level_boundaries
         except Exception as e:
@@ -60,6 +70,14 @@ class Criterion:
             print("Detailed information:")
             print(traceback.format_exc())
 
+        # Optional parent-pointer tree of criteria, rolled up by every method.
+        # An invalid tree raises ValueError to the caller instead of being
+        # dropped, as the tree nodes would silently be missing from the results
+        tree_nodes = self.params.get("criteria_tree")
+        if tree_nodes:
+            self.params["tree"] = CriteriaTree(
+                tree_nodes, self.criteria_dict, self.criteria_names
+            )
         return self.params
 
     # Get criterion MEE interval boundaries
@@ -7,6 +7,9 @@
 # from .ExceptionHandler import *
 import traceback
 
+from .Profiler import NULL_PROFILER
+from .ResultTable import ResultTable
+
 
 class DecisionMethod:
     """
@@ -50,6 +53,10 @@ class DecisionMethod:
         self.df = params.get("init_data")
         self.filled_df = params.get("filled_data")
         self.norm_df = params.get("norm_data")
+        # The read-only AssessmentContext shared by the assessment methods
+        self.context = params.get("context")
+        # Times the sub-steps of the method when the request is profiled
+        self.profiler = params.get("profiler") or NULL_PROFILER
 
     def preprocess_data(self):
         """
@@ -105,3 +112,30 @@ class DecisionMethod:
             print(f"Exception information: {str(e)}")
             print("Detailed information:")
             print(traceback.format_exc())
+
+    def iter_records(self):
+        """
+        Yield the result records of the decision method one by one.
+
+        Methods that can produce their records lazily override this, so the
+        records can be written out while they are computed instead of being
+        collected into one list. By default the records of ``execute`` are yielded.
+
+        Raises
+        ------
+        RuntimeError
+            If the method did not return results.
+        """
+        results = self.execute()
+        if results is None:
+            raise RuntimeError("The method did not return results.")
+        yield from results
+
+    def result_table(self):
+        """
+        Return the results of the decision method as a ``ResultTable``.
+
+        Methods that hold their scores in arrays override this and build the
+        columns directly; by default the table wraps the records of ``execute``.
+        """
+        return ResultTable.from_records(self.iter_records())
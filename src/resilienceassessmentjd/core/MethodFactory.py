@@ -4,15 +4,33 @@
 # @Author    :Wenjie Xu
 # @Email     :wenjie.xu.cn@outlook.com
 
-from ..methods.AHP import AHP
-from ..methods.DEMATEL import DEMATEL
-from ..methods.EWM import EWM
-from ..methods.HEWM import HEWM
-from ..methods.MACBETH import MACBETH
-from ..methods.MEE import MEE
-from ..methods.PCA import PCA
-from ..methods.VIKOR import VIKOR
-from .ScalingMethod import BenchmarkRatioNormalization, MinMaxNormalization
+import importlib
+import logging
+
+from .PluginCatalog import (
+    DECISION_METHODS_GROUP,
+    SCALING_METHODS_GROUP,
+    plugin_catalog,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def load_method_class(methods, method_name):
+    """
+    Return the class registered under ``method_name``, importing it if needed.
+
+    Classes may be registered by their import path ``"module:ClassName"``, where a
+    relative module is resolved against this package. The module is imported on
+    the first request for the method and the class replaces the path in
+    ``methods``.
+    """
+    method_class = methods[method_name]
+    if isinstance(method_class, str):
+        module_name, _, class_name = method_class.partition(":")
+        module = importlib.import_module(module_name, __package__)
+        method_class = methods[method_name] = getattr(module, class_name)
+    return method_class
 
 
 class DecisionMethodFactory:
@@ -25,7 +43,8 @@ class DecisionMethodFactory:
     Attributes
     ----------
     _methods : dict
-        A private dictionary that maps method names (str) to decision method classes.
+        A private dictionary that maps method names (str) to decision method classes,
+        or to their import paths until they are first requested.
 
     Methods
     -------
@@ -48,18 +67,22 @@ class DecisionMethodFactory:
         ----------
         method_name : str
             The name under which the decision method class is to be registered.
-        method_class : DecisionMethod
-            The class to be registered for the decision method.
+        method_class : DecisionMethod or str
+            The class to be registered for the decision method, or its import path
+            ``"module:ClassName"`` to import it on first use.
 
         """
         cls._methods[method_name] = method_class
-        print(f"Registered decision method: {method_name}")
+        logger.debug("Registered decision method: %s", method_name)
 
     @classmethod
     def get_method(cls, method_name, params):
         """
         Retrieve an instance of a registered decision method class, initialized with the specified parameters.
 
+        Names that are not registered are looked up in the plugin catalog, and the
+        plugin module is imported on this first request.
+
         Parameters
         ----------
         method_name : str
@@ -78,11 +101,28 @@ class DecisionMethodFactory:
             If the method name is not registered in the factory.
 
         """
+        if method_name not in cls._methods:
+            # Fall back to the methods provided by installed plugins
+            plugin = plugin_catalog.lookup(DECISION_METHODS_GROUP, method_name)
+            if plugin is not None:
+                cls.register_method(method_name, plugin)
         if method_name in cls._methods:
-            return cls._methods[method_name](params)
+            return load_method_class(cls._methods, method_name)(params)
         else:
             raise ValueError(f"Unknown decision method: {method_name}")
 
+    @classmethod
+    def available_methods(cls):
+        """
+        List the names of the registered and plugin decision methods.
+
+        Listing the plugins reads only their metadata; no plugin is imported.
+        """
+        return sorted(
+            set(cls._methods)
+            | set(plugin_catalog.groups().get(DECISION_METHODS_GROUP, {}))
+        )
+
 
 def register_decision_method(method_class):
     """
@@ -125,7 +165,8 @@ class ScalingMethodFactory:
     Attributes
     ----------
     _methods : dict
-        A private dictionary that maps method names (str) to scaling method classes.
+        A private dictionary that maps method names (str) to scaling method classes,
+        or to their import paths until they are first requested.
 
     Methods
     -------
@@ -148,18 +189,22 @@ class ScalingMethodFactory:
         ----------
         method_name : str
             The name under which the scaling method class is to be registered.
-        method_class : ScalingMethod
-            The class to be registered for the scaling method.
+        method_class : ScalingMethod or str
+            The class to be registered for the scaling method, or its import path
+            ``"module:ClassName"`` to import it on first use.
 
         """
         cls._methods[method_name] = method_class
-        print(f"Registered scaling method: {method_name}")
+        logger.debug("Registered scaling method: %s", method_name)
 
     @classmethod
     def get_method(cls, method_name, params):
         """
         Retrieve an instance of a registered scaling method class, initialized with the specified parameters.
 
+        Names that are not registered are looked up in the plugin catalog, and the
+        plugin module is imported on this first request.
+
         Parameters
         ----------
         method_name : str
@@ -178,11 +223,28 @@ class ScalingMethodFactory:
             If the method name is not registered in the factory.
 
         """
+        if method_name not in cls._methods:
+            # Fall back to the methods provided by installed plugins
+            plugin = plugin_catalog.lookup(SCALING_METHODS_GROUP, method_name)
+            if plugin is not None:
+                cls.register_method(method_name, plugin)
         if method_name in cls._methods:
-            return cls._methods[method_name](params)
+            return load_method_class(cls._methods, method_name)(params)
         else:
             raise ValueError(f"Unknown data scaling method: {method_name}")
 
+    @classmethod
+    def available_methods(cls):
+        """
+        List the names of the registered and plugin scaling methods.
+
+        Listing the plugins reads only their metadata; no plugin is imported.
+        """
+        return sorted(
+            set(cls._methods)
+            | set(plugin_catalog.groups().get(SCALING_METHODS_GROUP, {}))
+        )
+
 
 def register_scaling_method(method_class):
     """
@@ -215,16 +277,26 @@ def register_scaling_method(method_class):
     return method_class
 
 
-# Register decision methods in the DecisionMethodFactory
-DecisionMethodFactory.register_method("HEWM", HEWM)
-DecisionMethodFactory.register_method("AHP", AHP)
-DecisionMethodFactory.register_method("DEMATEL", DEMATEL)
-DecisionMethodFactory.register_method("EWM", EWM)
-DecisionMethodFactory.register_method("PCA", PCA)
-DecisionMethodFactory.register_method("MEE", MEE)
-DecisionMethodFactory.register_method("VIKOR", VIKOR)
-DecisionMethodFactory.register_method("MACBETH", MACBETH)
-
-# Register scaling methods in the ScalingMethodFactory
-ScalingMethodFactory.register_method("MinMax", MinMaxNormalization)
-ScalingMethodFactory.register_method("BRM", BenchmarkRatioNormalization)
+# Register decision methods in the DecisionMethodFactory, imported on first use
+DecisionMethodFactory.register_method("HEWM", "..methods.HEWM:HEWM")
+DecisionMethodFactory.register_method("AHP", "..methods.AHP:AHP")
+DecisionMethodFactory.register_method(
+    "HierarchicalAHP", "..methods.HierarchicalAHP:HierarchicalAHP"
+)
+DecisionMethodFactory.register_method("DEMATEL", "..methods.DEMATEL:DEMATEL")
+DecisionMethodFactory.register_method("EWM", "..methods.EWM:EWM")
+DecisionMethodFactory.register_method("PCA", "..methods.PCA:PCA")
+DecisionMethodFactory.register_method("MEE", "..methods.MEE:MEE")
+DecisionMethodFactory.register_method("VIKOR", "..methods.VIKOR:VIKOR")
+DecisionMethodFactory.register_method("TOPSIS", "..methods.TOPSIS:TOPSIS")
+DecisionMethodFactory.register_method("GRA", "..methods.GRA:GRA")
+DecisionMethodFactory.register_method("MACBETH", "..methods.MACBETH:MACBETH")
+DecisionMethodFactory.register_method(
+    "CombinedMethod", "..methods.CombinedMethod:CombinedMethod"
+)
+
+# Register scaling methods in the ScalingMethodFactory, imported on first use
+ScalingMethodFactory.register_method("MinMax", ".ScalingMethod:MinMaxNormalization")
+ScalingMethodFactory.register_method(
+    "BRM", ".ScalingMethod:BenchmarkRatioNormalization"
+)
@@ -0,0 +1,193 @@
+# !/usr/bin/env python
+# @FileName  :PeriodPanel.py
+# @Time      :2026/10/19 下午10:50
+# @Author    :Wenjie Xu
+# @Email     :wenjie.xu.cn@outlook.com
+
+import re
+import warnings
+
+import numpy as np
+
+# Periods are four-digit years
+PERIOD_PATTERN = re.compile(r"\d{4}")
+# Robust z-score of a period-over-period change above which it is flagged
+ANOMALY_THRESHOLD = 3.5
+
+
+def _read_only(values, dtype=np.intp):
+    values = np.asarray(values, dtype=dtype)
+    values.setflags(write=False)
+    return values
+
+
+class PeriodPanel:
+    """
+    Integer-coded (warehouse, period) index of the rows of a self-assessment.
+
+    The rows of a self-assessment request are the periods of every warehouse.
+    The panel codes every row by its warehouse and period once, so per-warehouse
+    outputs are array slices instead of string splits and groupbys. Warehouses
+    keep the order of their first row and their rows keep the request order;
+    periods are coded in chronological order. Only rows whose period is a
+    four-digit year are kept, and only warehouses with at least ``min_periods``
+    of them.
+
+    Parameters
+    ----------
+    warehouses : sequence of str
+        The warehouse of every row.
+    periods : sequence
+        The period of every row.
+    min_periods : int
+        The minimum number of periods of a warehouse.
+
+    Attributes
+    ----------
+    warehouses : tuple of str
+        The kept warehouses.
+    periods : tuple of str
+        The period labels, in chronological order.
+    rows : ndarray
+        The kept rows, grouped by warehouse.
+    offsets : ndarray
+        The rows of warehouse ``w`` are ``rows[offsets[w]:offsets[w + 1]]``.
+    warehouse_code, period_code : ndarray
+        The warehouse and period code of every entry of ``rows``.
+    """
+
+    def __init__(self, warehouses, periods, min_periods=2):
+        labels = [str(period) for period in periods]
+        # 正则只作用于不同的期次标签, 而非每一行
+        valid = {label for label in set(labels) if PERIOD_PATTERN.fullmatch(label)}
+        rows = [
+            row
+            for row, (warehouse, label) in enumerate(
+                zip(warehouses, labels, strict=True)
+            )
+            if warehouse and label in valid
+        ]
+        codes = {}
+        warehouse_code = np.array(
+            [codes.setdefault(warehouses[row], len(codes)) for row in rows],
+            dtype=np.intp,
+        )
+        kept = np.bincount(warehouse_code, minlength=len(codes)) >= min_periods
+        mask = kept[warehouse_code]
+        rows = np.asarray(rows, dtype=np.intp)[mask]
+        warehouse_code = (np.cumsum(kept) - 1)[warehouse_code[mask]]
+        # 按仓库分组, 组内保持请求中的顺序
+        order = np.argsort(warehouse_code, kind="stable")
+        rows, warehouse_code = rows[order], warehouse_code[order]
+        row_labels = [labels[row] for row in rows]
+        self.warehouses = tuple(w for w, code in codes.items() if kept[code])
+        self.periods = tuple(sorted(set(row_labels)))
+        period_of = {label: p for p, label in enumerate(self.periods)}
+        self.rows = _read_only(rows)
+        self.warehouse_code = _read_only(warehouse_code)
+        self.period_code = _read_only([period_of[label] for label in row_labels])
+        counts = np.bincount(warehouse_code, minlength=len(self.warehouses))
+        self.offsets = _read_only(np.concatenate([[0], np.cumsum(counts)]))
+
+    def __len__(self):
+        return len(self.warehouses)
+
+    def slices(self):
+        """Yield every warehouse with the slice of its entries in ``rows``."""
+        for w, warehouse in enumerate(self.warehouses):
+            yield warehouse, slice(self.offsets[w], self.offsets[w + 1])
+
+    def period_values(self, scores):
+        """
+        Arrange the scores of the kept rows as one ``period_values`` dict per
+        warehouse, in the row order of the request.
+
+        Parameters
+        ----------
+        scores : ndarray
+            One score per entry of ``rows``.
+        """
+        values = np.asarray(scores, dtype=float).tolist()
+        labels = [self.periods[p] for p in self.period_code]
+        return [
+            dict(zip(labels[part], values[part], strict=True))
+            for _, part in self.slices()
+        ]
+
+    def matrix(self, scores):
+        """
+        The warehouses × periods matrix of the scores of the kept rows, NaN for
+        the periods a warehouse does not have. A repeated period keeps its last
+        row.
+        """
+        values = np.full((len(self.warehouses), len(self.periods)), np.nan)
+        values[self.warehouse_code, self.period_code] = scores
+        return values
+
+    def years(self):
+        """The periods as numbers."""
+        return np.array([int(period) for period in self.periods], dtype=float)
+
+    def trends(self, scores, threshold=ANOMALY_THRESHOLD):
+        """
+        Compute the trends of the scores of all warehouses at once.
+
+        Returns
+        -------
+        dict
+            ``deltas``: the change of every warehouse and period from its previous
+            period with a score (NaN for the first), warehouses × periods.
+            ``slopes``: the least-squares slope of the scores of every warehouse
+            per year (NaN with fewer than two periods). ``anomalies``: the
+            changes whose robust z-score among the changes of all warehouses in
+            the same period exceeds ``threshold``; the z-score is the distance to
+            the median in units of 1.4826 × the median absolute deviation.
+        """
+        values = self.matrix(scores)
+        observed = ~np.isnan(values)
+        # 前向填充: 每个位置取此前最近一次有得分的期次
+        last = np.where(observed, np.arange(values.shape[1]), -1)
+        np.maximum.accumulate(last, axis=1, out=last)
+        previous = np.concatenate([np.full((len(values), 1), -1), last[:, :-1]], axis=1)
+        rows = np.arange(len(values))[:, np.newaxis]
+        deltas = np.where(
+            observed & (previous >= 0),
+            values - values[rows, np.maximum(previous, 0)],
+            np.nan,
+        )
+        years = np.broadcast_to(self.years(), values.shape)
+        count = observed.sum(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            x_mean = np.where(observed, years, 0).sum(axis=1) / count
+            y_mean = np.where(observed, values, 0).sum(axis=1) / count
+            dx = np.where(observed, years - x_mean[:, np.newaxis], 0)
+            dy = np.where(observed, values - y_mean[:, np.newaxis], 0)
+            slopes = (dx * dy).sum(axis=1) / (dx * dx).sum(axis=1)
+        slopes = np.where(count >= 2, slopes, np.nan)
+        with warnings.catch_warnings():
+            # 没有变化值的期次, 中位数为 NaN
+            warnings.simplefilter("ignore", RuntimeWarning)
+            median = np.nanmedian(deltas, axis=0)
+            mad = 1.4826 * np.nanmedian(np.abs(deltas - median), axis=0)
+        anomalies = np.greater(
+            np.abs(deltas - median),
+            threshold * mad,
+            out=np.zeros(values.shape, dtype=bool),
+            where=~np.isnan(deltas) & (mad > 0),
+        )
+        return {"deltas": deltas, "slopes": slopes, "anomalies": anomalies}
+
+    def trend_fields(self, trends, w):
+        """The ``trend`` field of the records of warehouse ``w``."""
+        deltas = trends["deltas"][w]
+        slope = float(trends["slopes"][w])
+        return {
+            "slope": None if np.isnan(slope) else slope,
+            "deltas": {
+                self.periods[p]: float(deltas[p])
+                for p in np.flatnonzero(~np.isnan(deltas))
+            },
+            "anomalies": [
+                self.periods[p] for p in np.flatnonzero(trends["anomalies"][w])
+            ],
+        }
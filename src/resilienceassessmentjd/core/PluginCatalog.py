@@ -0,0 +1,141 @@
+# !/usr/bin/env python
+# @FileName  :PluginCatalog.py
+# @Time      :2026/10/19 下午3:20
+# @Author    :Wenjie Xu
+# @Email     :wenjie.xu.cn@outlook.com
+
+import hashlib
+import json
+import logging
+import os
+import sys
+import threading
+
+logger = logging.getLogger(__name__)
+
+DECISION_METHODS_GROUP = "resilienceassessmentjd.decision_methods"
+SCALING_METHODS_GROUP = "resilienceassessmentjd.scaling_methods"
+
+
+class PluginCatalog:
+    """
+    A catalog of the third-party methods advertised through entry points.
+
+    Plugins declare their methods in the ``resilienceassessmentjd.decision_methods``
+    and ``resilienceassessmentjd.scaling_methods`` entry point groups, e.g. in
+    ``pyproject.toml``::
+
+        [project.entry-points."resilienceassessmentjd.decision_methods"]
+        ELECTRE = "inhouse_mcdm.electre:ELECTRE"
+
+    Building the catalog reads only the distribution metadata; a plugin module is
+    imported by the factories when its method name is first requested. The catalog
+    is cached on disk together with a fingerprint of the ``sys.path`` directories,
+    whose modification times change whenever distributions are installed or
+    removed, so the metadata is only scanned again after such a change.
+
+    Parameters
+    ----------
+    cache_path : str, optional
+        The catalog cache file. Defaults to ``plugins.json`` in the directory given
+        by ``RESILIENCEASSESSMENTJD_CACHE_DIR``, or in the user cache directory.
+    """
+
+    def __init__(self, cache_path=None):
+        self.cache_path = cache_path or self.default_cache_path()
+        self._groups = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def default_cache_path():
+        cache_dir = os.environ.get("RESILIENCEASSESSMENTJD_CACHE_DIR")
+        if not cache_dir:
+            cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+                os.path.expanduser("~"), ".cache"
+            )
+            cache_dir = os.path.join(cache_home, "resilienceassessmentjd")
+        return os.path.join(cache_dir, "plugins.json")
+
+    def lookup(self, group, method_name):
+        """
+        Return the import path ``"module:ClassName"`` of a plugin method.
+
+        Parameters
+        ----------
+        group : str
+            The entry point group of the method.
+        method_name : str
+            The name the method is requested by.
+
+        Returns
+        -------
+        str or None
+            The import path, or None if no installed plugin provides the method.
+        """
+        return self.groups().get(group, {}).get(method_name)
+
+    def groups(self):
+        """Return the catalog, loading it from the cache or the metadata once."""
+        if self._groups is None:
+            with self._lock:
+                if self._groups is None:
+                    self._groups = self._load()
+        return self._groups
+
+    def refresh(self):
+        """Scan the metadata again and rewrite the cache."""
+        with self._lock:
+            self._groups = self._scan()
+            self._write_cache(self.fingerprint(), self._groups)
+        return self._groups
+
+    @staticmethod
+    def fingerprint():
+        """Fingerprint the installed distributions by the sys.path directories."""
+        digest = hashlib.blake2b(sys.executable.encode(), digest_size=16)
+        for path in sys.path:
+            try:
+                mtime = os.stat(path or ".").st_mtime_ns
+            except OSError:
+                mtime = 0
+            digest.update(f"{path}\0{mtime}\0".encode())
+        return digest.hexdigest()
+
+    def _load(self):
+        fingerprint = self.fingerprint()
+        try:
+            with open(self.cache_path, encoding="utf-8") as file:
+                cache = json.load(file)
+            if cache.get("fingerprint") == fingerprint:
+                return cache["groups"]
+        except (OSError, ValueError, KeyError):
+            pass
+        groups = self._scan()
+        self._write_cache(fingerprint, groups)
+        return groups
+
+    @staticmethod
+    def _scan():
+        from importlib.metadata import entry_points
+
+        groups = {}
+        for group in (DECISION_METHODS_GROUP, SCALING_METHODS_GROUP):
+            groups[group] = {
+                entry_point.name: f"{entry_point.module}:{entry_point.attr}"
+                for entry_point in entry_points(group=group)
+            }
+        return groups
+
+    def _write_cache(self, fingerprint, groups):
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            temp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as file:
+                json.dump({"fingerprint": fingerprint, "groups": groups}, file)
+            os.replace(temp_path, self.cache_path)
+        except OSError as e:
+            # The catalog still works without the cache, e.g. on read-only systems
+            logger.debug("Could not write the plugin catalog cache: %s", e)
+
+
+plugin_catalog = PluginCatalog()
@@ -0,0 +1,270 @@
+# !/usr/bin/env python
+# @FileName  :Profiler.py
+# @Time      :2026/10/19 下午7:10
+# @Author    :Wenjie Xu
+# @Email     :wenjie.xu.cn@outlook.com
+
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def _rss_bytes():
+    """The resident set size of the process, or its peak where not available."""
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    if resource is not None:
+        # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+        scale = 1 if os.uname().sysname == "Darwin" else 1024
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+    return 0
+
+
+def group_label(fields):
+    """The sub-step label of an assessment group, e.g. "维度评估 D1 E2"."""
+    parts = [fields["type"]]
+    for key in ("dimension", "element", "node"):
+        if fields.get(key) is not None:
+            parts.append(str(fields[key]))
+    return " ".join(parts)
+
+
+class NullProfiler:
+    """The profiler of requests without profiling: every stage is a no-op."""
+
+    enabled = False
+
+    def stage(self, name, parent=None):
+        return nullcontext()
+
+    def each(self, items, label):
+        return items
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def running(self):
+        return nullcontext()
+
+    def report(self):
+        return []
+
+
+NULL_PROFILER = NullProfiler()
+
+
+class Profiler:
+    """
+    Per-stage instrumentation of one assessment request.
+
+    Every stage records its wall time, the CPU time of the process, the peak of
+    the memory traced by ``tracemalloc`` above its start, and the change of the
+    resident set size. Stages nest: a stage opened inside another one is named by
+    its path, e.g. ``assess/VIKOR/要素评估 E1``. Each thread keeps its own stack of
+    stages, so the methods of an ensemble can be profiled concurrently.
+
+    The peak of ``tracemalloc`` is global to the process: it is only reset when
+    a stage opens while no stage other than its enclosing ones is open. The
+    peak of a stage that overlaps a concurrent stage includes the allocations
+    of the other thread and may precede its start; its record has
+    ``peak_shared`` set.
+
+    Parameters
+    ----------
+    trace_memory : bool
+        Trace the Python allocations with ``tracemalloc``. Tracing slows the
+        request down noticeably; without it ``peak_kb`` is None.
+    """
+
+    enabled = True
+
+    def __init__(self, trace_memory=True):
+        self.trace_memory = trace_memory
+        self.records = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        # The open stages of all threads
+        self._open = []
+        self._started_tracing = False
+        self._depth = 0
+
+    def start(self):
+        """
+        Start tracing the memory, unless it is traced already. Calls nest: the
+        tracing lasts until the matching outermost ``stop``.
+        """
+        self._depth += 1
+        if self._depth == 1 and self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+    def stop(self):
+        """Stop the memory tracing started by the outermost ``start``."""
+        self._depth = max(self._depth - 1, 0)
+        if self._depth == 0 and self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    @contextmanager
+    def running(self):
+        """Trace the memory for the duration of the block."""
+        self.start()
+        try:
+            yield self
+        finally:
+            self.stop()
+
+    def _stack(self):
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    @contextmanager
+    def stage(self, name, parent=None):
+        """
+        Time the enclosed code as a stage.
+
+        Parameters
+        ----------
+        name : str
+            The name of the stage.
+        parent : str, optional
+            The path of the parent stage, for stages run on another thread than
+            their parent. By default the enclosing stage of the thread.
+        """
+        stack = self._stack()
+        if parent is None and stack:
+            parent = stack[-1]["stage"]
+        path = f"{parent}/{name}" if parent else name
+        frame = {"stage": path, "shared": False}
+        tracing = tracemalloc.is_tracing()
+        with self._lock:
+            # 外层阶段(含其他线程上的父阶段)之外仍有未结束的阶段, 即并发
+            outers = [f for f in self._open if path.startswith(f"{f['stage']}/")]
+            concurrent = len(outers) < len(self._open)
+            if concurrent:
+                # 峰值为全进程共享: 有并发阶段时不重置
+                for other in self._open:
+                    if all(other is not outer for outer in outers):
+                        other["shared"] = True
+                frame["shared"] = True
+            self._open.append(frame)
+            if tracing:
+                current, peak = tracemalloc.get_traced_memory()
+                if not concurrent:
+                    # 子阶段会重置峰值, 先把已有峰值计入外层阶段
+                    for outer in outers:
+                        outer["peak"] = max(outer["peak"], peak)
+                    tracemalloc.reset_peak()
+                frame["memory"] = frame["peak"] = current
+        frame["rss"] = _rss_bytes()
+        frame["cpu"] = time.process_time()
+        frame["wall"] = time.perf_counter()
+        stack.append(frame)
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - frame["wall"]
+            cpu = time.process_time() - frame["cpu"]
+            stack.pop()
+            peak_kb = None
+            with self._lock:
+                if tracing and tracemalloc.is_tracing():
+                    peak = max(frame["peak"], tracemalloc.get_traced_memory()[1])
+                    for outer in stack:
+                        outer["peak"] = max(outer["peak"], peak)
+                    peak_kb = (peak - frame["memory"]) / 1024
+                self._open = [f for f in self._open if f is not frame]
+            record = {
+                "stage": frame["stage"],
+                "wall_ms": wall * 1000,
+                "cpu_ms": cpu * 1000,
+                "peak_kb": peak_kb,
+                "peak_shared": frame["shared"],
+                "rss_delta_kb": (_rss_bytes() - frame["rss"]) / 1024,
+            }
+            with self._lock:
+                self.records.append(record)
+
+    def each(self, items, label):
+        """Yield ``items``, timing the loop body of each item as a stage."""
+        for item in items:
+            with self.stage(label(item)):
+                yield item
+
+    def report(self):
+        """Return the stage records, in the order the stages finished."""
+        with self._lock:
+            return list(self.records)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class ProfileMetrics:
+    """
+    Prometheus-style counters aggregated over the profiles of many requests.
+
+    Used by the batch mode of the CLI: every response adds its ``profile``, and
+    ``to_prometheus`` renders the totals in the Prometheus text format.
+    """
+
+    def __init__(self, prefix="resilience_assessment"):
+        self.prefix = prefix
+        self.requests = {}
+        self.stages = {}
+
+    def add(self, response):
+        """Add the status and the ``profile`` of a response."""
+        status = response.get("status", "")
+        self.requests[status] = self.requests.get(status, 0) + 1
+        for record in response.get("profile") or ():
+            totals = self.stages.setdefault(
+                record["stage"],
+                {"calls": 0, "wall": 0.0, "cpu": 0.0, "peak": 0.0},
+            )
+            totals["calls"] += 1
+            totals["wall"] += record["wall_ms"] / 1000
+            totals["cpu"] += record["cpu_ms"] / 1000
+            if record.get("peak_kb") is not None:
+                totals["peak"] = max(totals["peak"], record["peak_kb"] * 1024)
+
+    def to_prometheus(self):
+        """Render the counters in the Prometheus text exposition format."""
+        prefix = self.prefix
+        lines = [
+            f"# HELP {prefix}_requests_total Assessment requests by response status.",
+            f"# TYPE {prefix}_requests_total counter",
+        ]
+        for status, count in self.requests.items():
+            lines.append(
+                f'{prefix}_requests_total{{status="{_escape(status)}"}} {count}'
+            )
+        metrics = (
+            ("stage_calls_total", "counter", "Executions of each stage.", "calls"),
+            ("stage_wall_seconds_total", "counter", "Wall time of each stage.", "wall"),
+            ("stage_cpu_seconds_total", "counter", "CPU time of each stage.", "cpu"),
+            ("stage_peak_bytes", "gauge", "Largest traced memory peak.", "peak"),
+        )
+        for name, kind, help_text, key in metrics:
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+            for stage, totals in self.stages.items():
+                lines.append(
+                    f'{prefix}_{name}{{stage="{_escape(stage)}"}} {totals[key]}'
+                )
+        return "\n".join(lines) + "\n"
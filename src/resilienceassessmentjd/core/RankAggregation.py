@@ -0,0 +1,165 @@
+# !/usr/bin/env python
+# @FileName  :RankAggregation.py
+# @Time      :2026/10/19 下午4:20
+# @Author    :Wenjie Xu
+# @Email     :wenjie.xu.cn@outlook.com
+
+import numpy as np
+
+# MEE grades from the worst to the best
+MEE_GRADES = ("待整改", "合格", "良好", "优秀")
+
+
+class RankAggregation:
+    """
+    Consensus rankings over the 综合评估 results of several assessment methods.
+
+    Every method is reduced to one score per object (bigger is better): the
+    ``index_value`` of VIKOR/TOPSIS/GRA, the grade of MEE, or the score of the
+    latest period of MACBETH. Only objects scored by every method take part.
+
+    Methods
+    -------
+    Borda
+        Each method gives an object one point per object it ranks below it and half
+        a point per tie; objects are ranked by their total points.
+    Kemeny
+        A Kemeny-approximate ranking: the Borda ranking is improved by local
+        Kemenization, which moves an object ahead of its predecessor while a
+        majority of the methods prefers it.
+    """
+
+    methods = ("Borda", "Kemeny")
+
+    @classmethod
+    def aggregate(cls, results, consensus_methods):
+        """
+        Compute the consensus rankings of the method results.
+
+        Parameters
+        ----------
+        results : dict
+            Maps each assessment method to its list of result records.
+        consensus_methods : str or list of str
+            "Borda", "Kemeny" or a list of them.
+
+        Returns
+        -------
+        dict
+            Maps each consensus method to its 综合评估 records, with the Borda points
+            as ``index_value`` and the consensus rank as ``level``.
+        """
+        if isinstance(consensus_methods, str):
+            consensus_methods = [consensus_methods]
+        unknown = set(consensus_methods) - set(cls.methods)
+        if unknown:
+            raise ValueError(f"Unknown consensus methods: {sorted(unknown)}")
+
+        ids, areas, scores = cls.score_table(results)
+        points = cls.borda_points(scores)
+        borda_order = np.argsort(-points, kind="stable")
+
+        consensus = {}
+        for method in consensus_methods:
+            order = borda_order
+            if method == "Kemeny":
+                order = cls.local_kemenization(borda_order, scores)
+            level = np.empty(len(ids), dtype=int)
+            level[order] = np.arange(1, len(ids) + 1)
+            consensus[method] = [
+                {
+                    "id": _id,
+                    "area": areas[_id],
+                    "type": "综合评估",
+                    "index_value": float(points[i]),
+                    "level": int(level[i]),
+                }
+                for i, _id in enumerate(ids)
+            ]
+        return consensus
+
+    @classmethod
+    def score_table(cls, results):
+        """
+        Collect the 综合评估 score of every object and method.
+
+        Returns
+        -------
+        tuple
+            The ids scored by every method, their areas, and the k×n score matrix.
+        """
+        method_scores = []
+        areas = {}
+        for records in results.values():
+            scores = {}
+            for record in records or ():
+                if record.get("type") != "综合评估":
+                    continue
+                score = cls.record_score(record)
+                if score is not None:
+                    scores[record["id"]] = score
+                    areas.setdefault(record["id"], record.get("area"))
+            method_scores.append(scores)
+        if not method_scores:
+            raise ValueError("No assessment results to aggregate.")
+
+        ids = [
+            _id
+            for _id in method_scores[0]
+            if all(_id in scores for scores in method_scores[1:])
+        ]
+        if not ids:
+            raise ValueError("No object is scored by every assessment method.")
+        table = np.array([[scores[_id] for _id in ids] for scores in method_scores])
+        return ids, areas, table
+
+    @staticmethod
+    def record_score(record):
+        """将单条 综合评估 记录转换为分数 (越大越好), 无效记录返回 None."""
+        if isinstance(record.get("index_value"), (int, float)):
+            return float(record["index_value"])
+        if record.get("level") in MEE_GRADES:
+            return float(MEE_GRADES.index(record["level"]))
+        period_values = record.get("period_values")
+        if period_values:
+            return float(period_values[max(period_values)])
+        return None
+
+    @staticmethod
+    def borda_points(scores):
+        """
+        The Borda points of every object: per method, the objects ranked below it
+        plus half the objects tied with it.
+
+        The average rank of ``rankdata`` is 1 + the objects below + half the other
+        tied objects, so no pairwise comparison is needed.
+        """
+        # scipy.stats 导入耗时近 1 秒, 仅在需要共识排序时导入
+        from scipy.stats import rankdata
+
+        return (rankdata(scores, axis=1) - 1).sum(axis=0)
+
+    @staticmethod
+    def preference(scores, a, b):
+        """The number of methods preferring object a to b, ties counting half."""
+        return (scores[:, a] > scores[:, b]).sum() + 0.5 * (
+            scores[:, a] == scores[:, b]
+        ).sum()
+
+    @classmethod
+    def local_kemenization(cls, order, scores):
+        """
+        Move each object ahead while a majority prefers it to its predecessor.
+
+        Only adjacent pairs are compared, on demand, so no n×n preference matrix
+        is built.
+        """
+        order = list(order)
+        for i in range(1, len(order)):
+            j = i
+            while j > 0 and cls.preference(
+                scores, order[j], order[j - 1]
+            ) > cls.preference(scores, order[j - 1], order[j]):
+                order[j - 1], order[j] = order[j], order[j - 1]
+                j -= 1
+        return np.array(order, dtype=int)
@@ -0,0 +1,397 @@
+# !/usr/bin/env python
+# @FileName  :ResultSink.py
+# @Time      :2026/10/19 下午6:05
+# @Author    :Wenjie Xu
+# @Email     :wenjie.xu.cn@outlook.com
+
+import gzip
+import json
+import os
+from collections.abc import Iterator
+
+import numpy as np
+
+# Placeholder of the values of objects without valid data
+INVALID = "/"
+# Extensions of the compressed outputs
+COMPRESSIONS = {".gz": "gzip", ".zst": "zstd"}
+# Bytes collected before a write to the (possibly compressed) file
+BUFFER_SIZE = 1 << 20
+
+
+def json_default(value):
+    """Convert NumPy scalars and arrays for the JSON encoder."""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def get_encoder(name="json"):
+    """
+    Return a function encoding one value as compact UTF-8 JSON.
+
+    Parameters
+    ----------
+    name : str
+        "json" (the standard library) or "orjson". orjson is several times faster
+        but writes NaN as null, where the standard library writes NaN.
+    """
+    if name == "json":
+
+        def encode(value):
+            return json.dumps(
+                value, ensure_ascii=False, separators=(",", ":"), default=json_default
+            ).encode("utf-8")
+
+        return encode
+    if name == "orjson":
+        try:
+            import orjson
+        except ImportError as e:
+            raise ImportError(
+                "The orjson encoder requires orjson: pip install orjson"
+            ) from e
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+        def encode(value):
+            return orjson.dumps(value, default=json_default, option=option)
+
+        return encode
+    raise ValueError(f"Unknown JSON encoder: {name}")
+
+
+def check_compression(compression):
+    """Raise if ``compression`` is unknown or its module is not installed."""
+    if compression not in (None, *COMPRESSIONS.values()):
+        raise ValueError(f"Unknown compression: {compression}")
+    if compression == "zstd":
+        try:
+            import zstandard  # noqa: F401
+        except ImportError as e:
+            raise ImportError(
+                "zstd compression requires zstandard: pip install zstandard"
+            ) from e
+
+
+def open_output(path, compression=None):
+    """Open ``path`` for binary writing, optionally through gzip or zstd."""
+    check_compression(compression)
+    if compression == "gzip":
+        return gzip.open(path, "wb")
+    if compression == "zstd":
+        import zstandard
+
+        return zstandard.ZstdCompressor().stream_writer(open(path, "wb"))  # noqa: SIM115
+    return open(path, "wb")  # noqa: SIM115
+
+
+def is_stream(value):
+    """True for the lists and iterators of records that are written item by item."""
+    return isinstance(value, (list, tuple, Iterator))
+
+
+class JsonStreamWriter:
+    """
+    Write a response to a binary file without encoding it as a whole.
+
+    Records are encoded one at a time and collected into blocks of about
+    ``BUFFER_SIZE`` bytes, so the records of a generator are never all held in
+    memory, neither as objects nor as text.
+
+    Parameters
+    ----------
+    file : binary file
+        The output, e.g. from ``open_output``.
+    encoder : str
+        "json" or "orjson", see ``get_encoder``.
+    """
+
+    def __init__(self, file, encoder="json"):
+        self.file = file
+        self.encode = get_encoder(encoder)
+        self.buffer = []
+        self.size = 0
+        self.count = 0
+
+    def emit(self, data):
+        self.buffer.append(data)
+        self.size += len(data)
+        if self.size >= BUFFER_SIZE:
+            self.flush()
+
+    def flush(self):
+        if self.buffer:
+            self.file.write(b"".join(self.buffer))
+        self.buffer, self.size = [], 0
+
+    def write_document(self, response):
+        """Write ``response`` as one compact JSON document."""
+        self.write_value(response)
+        self.flush()
+
+    def write_value(self, value, depth=0):
+        # 响应与多方法结果的字典逐项写出, 记录列表逐条编码
+        if isinstance(value, dict) and depth < 2:
+            self.emit(b"{")
+            for i, (key, item) in enumerate(value.items()):
+                if i:
+                    self.emit(b",")
+                self.emit(self.encode(str(key)))
+                self.emit(b":")
+                self.write_value(item, depth + 1)
+            self.emit(b"}")
+        elif is_stream(value):
+            self.emit(b"[")
+            for i, record in enumerate(value):
+                if i:
+                    self.emit(b",")
+                self.emit(self.encode(record))
+                self.count += 1
+            self.emit(b"]")
+        else:
+            self.emit(self.encode(value))
+
+    def write_lines(self, response):
+        """
+        Write the records of ``response`` as JSON lines.
+
+        The records of several methods carry the ``method`` they come from, and
+        the consensus rankings their ``consensus`` method. A response without
+        records (e.g. an error) is written as a single line.
+        """
+        sections = [
+            (label, response.get(key))
+            for key, label in (("results", "method"), ("consensus", "consensus"))
+            if response.get(key) is not None
+        ]
+        if not sections or not all(self._has_records(value) for _, value in sections):
+            self.write_line(response)
+            sections = []
+        for label, value in sections:
+            if is_stream(value):
+                for record in value:
+                    self.write_line(record)
+            else:
+                for name, records in value.items():
+                    for record in records:
+                        self.write_line({label: name, **record})
+        self.flush()
+
+    def write_line(self, record):
+        self.emit(self.encode(record))
+        self.emit(b"\n")
+        self.count += 1
+
+    @staticmethod
+    def _has_records(value):
+        if isinstance(value, dict):
+            return all(is_stream(records) for records in value.values())
+        return is_stream(value)
+
+
+def write_response(response, path, format="json", encoder="json", compression=None):
+    """
+    Stream a ``UnifiedModel`` response to ``path``.
+
+    Parameters
+    ----------
+    response : dict
+        The response; its ``results`` may hold generators of records, which are
+        consumed while writing.
+    path : str
+        The output file.
+    format : str
+        "json" for one compact document, "jsonl" for one record per line.
+    encoder : str
+        "json" or "orjson".
+    compression : str, optional
+        "gzip" or "zstd".
+
+    Returns
+    -------
+    int
+        The number of records written.
+    """
+    if format not in ("json", "jsonl"):
+        raise ValueError(f"Unknown result format: {format}")
+    with open_output(path, compression) as file:
+        writer = JsonStreamWriter(file, encoder)
+        if format == "jsonl":
+            writer.write_lines(response)
+        else:
+            writer.write_document(response)
+    return writer.count
+
+
+class ResultSink:
+    """
+    Base class of the sinks that write result records incrementally.
+
+    A sink receives the records in batches, so a method can hand over the records
+    of one chunk of objects and release them before computing the next chunk.
+    Sinks are context managers; ``count`` holds the number of records written.
+
+    Parameters
+    ----------
+    path : str
+        The output file.
+    """
+
+    format = None
+
+    def __init__(self, path):
+        self.path = os.fspath(path)
+        self.count = 0
+
+    def write(self, records):
+        """Write one batch of records."""
+        raise NotImplementedError("This method should be overridden by subclasses.")
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.close()
+        return False
+
+
+class JsonLinesSink(ResultSink):
+    """
+    Write every record as one line of compact JSON.
+
+    Parameters
+    ----------
+    path : str
+        The output file.
+    encoder : str
+        "json" or "orjson".
+    compression : str, optional
+        "gzip" or "zstd".
+    """
+
+    format = "jsonl"
+
+    def __init__(self, path, encoder="json", compression=None):
+        super().__init__(path)
+        self.file = open_output(self.path, compression)
+        self.writer = JsonStreamWriter(self.file, encoder)
+
+    def write(self, records):
+        for record in records:
+            self.writer.write_line(record)
+        self.writer.flush()
+        self.count = self.writer.count
+
+    def close(self):
+        self.writer.flush()
+        self.file.close()
+
+
+class ParquetSink(ResultSink):
+    """
+    Write the records to a Parquet file, one row group per batch.
+
+    Requires ``pyarrow``. The ``"/"`` placeholders of invalid objects become nulls
+    in the numeric columns.
+
+    Parameters
+    ----------
+    path : str
+        The output file.
+    columns : dict, optional
+        Maps each column to its Arrow type name ("string", "int64", "float64",
+        ...). Without it the schema is inferred from the first batch.
+    """
+
+    format = "parquet"
+
+    def __init__(self, path, columns=None):
+        super().__init__(path)
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError(
+                "Writing Parquet results requires pyarrow: pip install pyarrow"
+            ) from e
+        self._pa, self._pq = pa, pq
+        self.schema = None
+        if columns:
+            self.schema = pa.schema(
+                [(name, pa.type_for_alias(dtype)) for name, dtype in columns.items()]
+            )
+        self.writer = None
+
+    def write(self, records):
+        pa = self._pa
+        records = list(records)
+        if not records:
+            return
+        if self.schema is None:
+            self.schema = pa.Table.from_pylist(self._clean(records)).schema
+        table = pa.Table.from_pylist(self._clean(records), schema=self.schema)
+        if self.writer is None:
+            self.writer = self._pq.ParquetWriter(self.path, self.schema)
+        self.writer.write_table(table)
+        self.count += len(records)
+
+    def _clean(self, records):
+        if self.schema is None:
+            return [
+                {key: None if value == INVALID else value for key, value in r.items()}
+                for r in records
+            ]
+        numeric = {
+            field.name
+            for field in self.schema
+            if not self._pa.types.is_string(field.type)
+        }
+        return [
+            {
+                key: None if key in numeric and value == INVALID else value
+                for key, value in record.items()
+            }
+            for record in records
+        ]
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+SINKS = {
+    ".jsonl": JsonLinesSink,
+    ".parquet": ParquetSink,
+}
+
+
+def open_sink(path, columns=None, encoder="json"):
+    """
+    Open the sink for ``path``, chosen by its extension.
+
+    Parameters
+    ----------
+    path : str
+        A ``.jsonl`` (optionally ``.jsonl.gz`` or ``.jsonl.zst``) or ``.parquet``
+        file.
+    columns : dict, optional
+        The typed columns of a Parquet sink.
+    encoder : str
+        The JSON encoder of a JSON lines sink, "json" or "orjson".
+    """
+    root, ext = os.path.splitext(os.fspath(path).lower())
+    compression = COMPRESSIONS.get(ext)
+    if compression is not None:
+        ext = os.path.splitext(root)[1]
+    if ext not in SINKS or (compression and SINKS[ext] is ParquetSink):
+        raise ValueError(
+            f"Unsupported result sink {path}; expected one of {sorted(SINKS)}"
+        )
+    if SINKS[ext] is ParquetSink:
+        return ParquetSink(path, columns)
+    return JsonLinesSink(path, encoder, compression)
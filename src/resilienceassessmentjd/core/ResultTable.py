@@ -0,0 +1,201 @@
+# !/usr/bin/env python
+# @FileName  :ResultTable.py
+# @Time      :2026/10/19 下午6:40
+# @Author    :Wenjie Xu
+# @Email     :wenjie.xu.cn@outlook.com
+
+import numpy as np
+import pandas as pd
+
+from .ResultSink import INVALID
+
+# Fields identifying the assessment group of a record, low-cardinality strings
+GROUP_FIELDS = ("type", "dimension", "element", "node", "parent", "depth")
+
+
+def require_pyarrow():
+    """Import pyarrow, or raise an ImportError naming the missing dependency."""
+    try:
+        import pyarrow as pa
+    except ImportError as e:
+        raise ImportError(
+            "Columnar (Arrow/Parquet) results require pyarrow: pip install pyarrow"
+        ) from e
+    return pa
+
+
+def _kind(values):
+    """The column type of a value array: "float64", "int64" or "string"."""
+    dtype = np.asarray(values).dtype
+    if dtype.kind == "f":
+        return "float64"
+    if dtype.kind in "iub":
+        return "int64"
+    return "string"
+
+
+class ResultTable:
+    """
+    Columnar results of one assessment method.
+
+    The methods add the score arrays of each assessment group; the ``id`` and
+    ``area`` columns are tiled and the group fields (type, dimension, element, ...)
+    repeated, so the table is built without per-record dicts. Objects without any
+    valid data (the ``"/"`` records) get null values.
+
+    Parameters
+    ----------
+    ids : sequence
+        The object ids, in the row order of the score arrays.
+    areas : sequence
+        The area of every object.
+    invalid : sequence of bool, optional
+        True for the objects without any valid data.
+    """
+
+    def __init__(self, ids, areas, invalid=None):
+        self.ids = np.asarray(ids, dtype=object)
+        self.areas = np.asarray(areas, dtype=object)
+        self.invalid = (
+            np.zeros(len(self.ids), dtype=bool)
+            if invalid is None
+            else np.asarray(invalid, dtype=bool)
+        )
+        self.groups = []
+        self.kinds = {}
+        self.records = None
+
+    @classmethod
+    def from_records(cls, records):
+        """
+        Wrap the records of a method without a columnar builder.
+
+        The columns then follow the keys of the records (e.g. ``period_values`` of
+        MACBETH becomes a struct column).
+        """
+        table = cls([], [])
+        table.records = list(records)
+        return table
+
+    def add_group(self, fields, rows=None, **values):
+        """
+        Add the scores of one assessment group.
+
+        Parameters
+        ----------
+        fields : dict
+            The fields identifying the group, e.g. ``{"type": "要素评估",
+            "element": "E1"}``.
+        rows : slice, optional
+            The objects covered by ``values``, by default all of them.
+        **values : ndarray
+            One array per value column (``index_value``, ``level``, the MEE grade
+            values, ...), with one entry per object.
+        """
+        rows = slice(None) if rows is None else rows
+        for name, array in values.items():
+            self.kinds.setdefault(name, _kind(array))
+        self.groups.append((fields, rows, values))
+
+    def columns(self):
+        """
+        Return the columns of the table.
+
+        Returns
+        -------
+        dict
+            Maps each column to ``(values, null)``, where ``null`` marks the null
+            entries of ``values``.
+        """
+        positions = np.arange(len(self.ids))
+        row_index = [positions[rows] for _, rows, _ in self.groups]
+        lengths = [len(index) for index in row_index]
+        row_index = (
+            np.concatenate(row_index) if row_index else np.empty(0, dtype=np.intp)
+        )
+        invalid = self.invalid[row_index]
+        no_null = np.zeros(len(row_index), dtype=bool)
+        columns = {
+            "id": (self.ids[row_index], no_null),
+            "area": (self.areas[row_index], no_null),
+        }
+        for key in GROUP_FIELDS:
+            if not any(key in fields for fields, _, _ in self.groups):
+                continue
+            values = np.repeat(
+                np.array(
+                    [fields.get(key) for fields, _, _ in self.groups], dtype=object
+                ),
+                lengths,
+            )
+            columns[key] = (values, np.equal(values, None))
+        for name, kind in self.kinds.items():
+            parts, missing = [], []
+            for (_, _, values), length in zip(self.groups, lengths, strict=True):
+                if name in values:
+                    parts.append(np.asarray(values[name]))
+                    missing.append(np.zeros(length, dtype=bool))
+                else:
+                    parts.append(np.zeros(length, dtype=object))
+                    missing.append(np.ones(length, dtype=bool))
+            columns[name] = (
+                np.concatenate(parts).astype(object if kind == "string" else kind),
+                np.concatenate(missing) | invalid,
+            )
+        return columns
+
+    def _kind_of(self, name):
+        if name == "depth":
+            return "int64"
+        return self.kinds.get(name, "string")
+
+    def to_arrow(self):
+        """Return the results as a ``pyarrow.Table`` with typed columns."""
+        pa = require_pyarrow()
+        if self.records is not None:
+            return pa.Table.from_pylist(
+                [
+                    {k: None if v == INVALID else v for k, v in record.items()}
+                    for record in self.records
+                ]
+            )
+        arrays = {}
+        for name, (values, null) in self.columns().items():
+            kind = self._kind_of(name)
+            if kind == "string":
+                array = pa.array(np.where(null, None, values), type=pa.string())
+                if name in GROUP_FIELDS:
+                    array = array.dictionary_encode()
+            else:
+                filled = np.where(null, 0, values).astype(kind)
+                array = pa.array(filled, type=pa.type_for_alias(kind), mask=null)
+            arrays[name] = array
+        return pa.table(arrays)
+
+    def to_pandas(self):
+        """Return the results as a DataFrame with nullable typed columns."""
+        if self.records is not None:
+            return pd.DataFrame.from_records(self.records).replace(INVALID, None)
+        data = {}
+        for name, (values, null) in self.columns().items():
+            kind = self._kind_of(name)
+            if kind == "string":
+                data[name] = pd.array(np.where(null, None, values), dtype="string")
+                if name in GROUP_FIELDS:
+                    data[name] = data[name].astype("category")
+            else:
+                filled = np.where(null, 0, values).astype(kind)
+                array_type = (
+                    pd.arrays.FloatingArray
+                    if kind == "float64"
+                    else pd.arrays.IntegerArray
+                )
+                data[name] = array_type(filled, null.astype(bool))
+        return pd.DataFrame(data)
+
+    def write_parquet(self, path):
+        """Write the results to a Parquet file."""
+        require_pyarrow()
+        import pyarrow.parquet as pq
+
+        pq.write_table(self.to_arrow(), path)
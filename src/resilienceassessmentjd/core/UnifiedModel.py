@@ -4,9 +4,20 @@
 # @Author    :Wenjie Xu
 # @Email     :wenjie.xu.cn@outlook.com
 
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from .AssessmentContext import AssessmentContext
 from .Criterion import Criterion
 from .ExceptionHandler import BusinessException
 from .MethodFactory import DecisionMethodFactory, ScalingMethodFactory
+from .Profiler import NULL_PROFILER, Profiler
+from .RankAggregation import RankAggregation
+
+logger = logging.getLogger(__name__)
 
 
 class UnifiedModel:
@@ -17,6 +28,12 @@ class UnifiedModel:
     -----------
     request : dict
         The JSON request containing the method and parameters for resilience assessment.
+        ``assess_method`` may be a list of methods, which share one pass of data
+        parsing, weighting and scaling; the optional ``consensus`` ("Borda",
+        "Kemeny" or a list of them) adds consensus rankings of their results.
+        With ``"profile": true`` the response holds the wall time, CPU time and
+        memory of every stage and method sub-step under ``profile``; a dict of
+        ``Profiler`` options, e.g. ``{"trace_memory": false}``, also enables it.
     """
 
     def __init__(self, request):
@@ -25,43 +42,230 @@ class UnifiedModel:
         self.assess_type = request.get("assess_type", "")
         self.assess_method = request.get("assess_method", "")
         self.weights = None
+        self.context = None
+        self.weight_report = []
+        self.assess_report = []
+        # Per-stage instrumentation, returned under "profile" when requested
+        profile = request.get("profile")
+        if isinstance(profile, dict):
+            self.profiler = Profiler(**profile)
+        else:
+            self.profiler = Profiler() if profile else NULL_PROFILER
+        # An invalid request, e.g. a malformed criteria tree, is raised by
+        # ``prepare`` and reported by ``execute`` as an error response
+        self.request_error = None
         # Get the processed params
-        create_criteria = Criterion(request)
-        self.params = create_criteria.get_criteria()
+        with self.profiler.running(), self.profiler.stage("criteria"):
+            create_criteria = Criterion(request)
+            try:
+                self.params = create_criteria.get_criteria()
+            except ValueError as e:
+                self.params = create_criteria.params
+                self.request_error = e
+        self.params["profiler"] = self.profiler
 
-    def execute(self):
+    def execute(self, stream=False, columnar=False):
         """
         Execute the unified model to perform resilience assessment.
+
+        Parameters
+        ----------
+        stream : bool
+            Return the results of a single assessment method as a generator of
+            records, computed while it is consumed (e.g. by
+            ``ResultSink.write_response``). Errors raised while consuming the
+            generator propagate to the caller, and the profile does not cover
+            the records computed while consuming it.
+        columnar : bool
+            Return the results as a ``pyarrow.Table`` (one per method for several
+            methods) with typed columns, built from the score arrays of the
+            methods. Requires pyarrow.
         """
         try:
-            weights = self.determine_weight()  # Determine the weights
-            if weights["status"] == "success":
-                self.params["weights"] = weights[
-                    "weights"
-                ]  # Add the weights to the parameters
-            else:
-                raise BusinessException("Failed to calculate weights.")
+            with self.profiler.running():
+                response = self._execute(stream, columnar)
+        except Exception as e:
+            response = {
+                "status": "1",
+                "message": f"Exception information: {str(e)}",
+            }
+        if self.profiler.enabled:
+            response["profile"] = self.profiler.report()
+        return response
+
+    def prepare(self):
+        """
+        Scale the data, determine the weights and build the shared context.
+
+        Returns
+        -------
+        dict
+            The params every assessment method is instantiated with.
+
+        Raises
+        ------
+        ValueError
+            If the request is invalid, e.g. its criteria tree is malformed.
+        """
+        with self.profiler.running():
+            return self._prepare()
+
+    def _prepare(self):
+        if self.request_error is not None:
+            raise self.request_error
+        profiler = self.profiler
+        # Scale first, so objective weight methods can use the normalized data
+        with profiler.stage("scaling"):
             normalized_data = self.scaling_data()  # Scale the data
-            if normalized_data["status"] == "success":
-                self.params["norm_data"] = normalized_data[
-                    "data"
-                ]  # Add the normalized data to the parameters
+        if normalized_data["status"] == "success":
+            self.params["norm_data"] = normalized_data[
+                "data"
+            ]  # Add the normalized data to the parameters
+        with profiler.stage("weights"):
+            weights = self.determine_weight()  # Determine the weights
+        if weights["status"] == "success":
+            self.params["weights"] = self.expand_weights(
+                weights["weights"]
+            )  # Add the weights to the parameters
+        else:
+            raise BusinessException("Failed to calculate weights.")
+        # The shared, read-only data of every assessment method
+        with profiler.stage("context"):
+            self.context = AssessmentContext.from_params(self.params)
+        self.params["weights"] = self.context.weights
+        self.params["context"] = self.context
+        return self.params
+
+    def _execute(self, stream, columnar):
+        profiler = self.profiler
+        self._prepare()
+        if isinstance(self.assess_method, (list, tuple)):
+            return self.execute_ensemble(self.assess_method, columnar)
+        with profiler.stage("assess"), profiler.stage(str(self.assess_method)):
             method_instance = DecisionMethodFactory.get_method(
                 self.request.get("assess_method"), self.params
             )
             # Get the method instance
-            results = method_instance.execute()  # Execute the method
-            return {
-                "status": "0",
-                "message": "success",
-                "assess_type": self.assess_type,
-                "results": results,  # Format the output
-            }
+            if columnar:
+                results = method_instance.result_table().to_arrow()
+            elif stream:
+                results = method_instance.iter_records()
+            else:
+                results = method_instance.execute()  # Execute the method
+        return {
+            "status": "0",
+            "message": "success",
+            "assess_type": self.assess_type,
+            "results": results,  # Format the output
+        }
+
+    def execute_ensemble(self, method_names, columnar=False):
+        """
+        Run several assessment methods on the shared, already weighted params.
+
+        With ``columnar`` every method returns an Arrow table; the consensus
+        rankings are computed from result records and are not available then.
+
+        Returns
+        -------
+        dict
+            The response with the results of every method under ``results`` and,
+            if requested, the consensus rankings under ``consensus``.
+        """
+        consensus = self.request.get("consensus")
+        if columnar and consensus:
+            raise BusinessException(
+                "Consensus rankings are not available for columnar results."
+            )
+        with self.profiler.stage("assess"):
+            results = dict(
+                zip(
+                    method_names,
+                    self.run_assess_methods(method_names, columnar),
+                    strict=True,
+                )
+            )
+        response = {
+            "status": "0",
+            "message": "success",
+            "assess_type": self.assess_type,
+            "results": results,
+        }
+        if consensus:
+            with self.profiler.stage("consensus"):
+                response["consensus"] = RankAggregation.aggregate(results, consensus)
+        return response
+
+    def run_assess_methods(self, method_names, columnar=False):
+        """
+        Execute the given assessment methods on a thread pool.
+
+        Every method reads the parsed data, weights and normalized data computed
+        once for the request, and the read-only ``AssessmentContext``. The wall
+        time and the outcome of every method are recorded in
+        ``self.assess_report``.
+
+        Returns
+        -------
+        list
+            The results of each method, in the same order as ``method_names``.
+
+        Raises
+        ------
+        BusinessException
+            If any of the methods fails, naming every failed method.
+        """
+        if len(set(method_names)) != len(method_names):
+            raise BusinessException("Duplicate assessment methods requested.")
+        with ThreadPoolExecutor(max_workers=len(method_names)) as executor:
+            reports = list(
+                executor.map(
+                    self._run_assess_method,
+                    method_names,
+                    [columnar] * len(method_names),
+                )
+            )
+
+        self.assess_report = [
+            {key: value for key, value in report.items() if key != "results"}
+            for report in reports
+        ]
+        for report in self.assess_report:
+            logger.debug(
+                "Assessment method %s finished in %.2f ms (%s)",
+                report["method"],
+                report["elapsed_ms"],
+                report["status"],
+            )
+
+        failed = [report for report in reports if report["status"] != "success"]
+        if failed:
+            raise BusinessException(
+                "Failed to run assessment methods. "
+                + "; ".join(f"{r['method']}: {r['message']}" for r in failed)
+            )
+        return [report["results"] for report in reports]
+
+    def _run_assess_method(self, method_name, columnar=False):
+        """Execute a single assessment method and time it."""
+        start = time.perf_counter()
+        try:
+            with self.profiler.stage(method_name, parent="assess"):
+                method_instance = DecisionMethodFactory.get_method(
+                    method_name, self.params
+                )
+                if columnar:
+                    results = method_instance.result_table().to_arrow()
+                else:
+                    results = method_instance.execute()
+            if results is None:
+                raise BusinessException("The method did not return results.")
+            report = {"status": "success", "message": "success", "results": results}
         except Exception as e:
-            return {
-                "status": "1",
-                "message": f"Exception information: {str(e)}",
-            }
+            report = {"status": "error", "message": str(e)}
+        report["method"] = method_name
+        report["elapsed_ms"] = (time.perf_counter() - start) * 1000
+        return report
 
     def determine_weight(self):
         """
@@ -74,38 +278,122 @@ class UnifiedModel:
 
         # If all three methods are provided, return the combined weights
         if subjective_method and objective_method and combined_method:
-            # Execute the subjective and objective methods to get the weights
-            subj_weights = DecisionMethodFactory.get_method(
-                subjective_method, self.params
-            ).execute()
-            obj_weights = DecisionMethodFactory.get_method(
-                objective_method, self.params
-            ).execute()
+            # The subjective and objective methods are independent, so run them
+            # concurrently and collect the weights in the serial order
+            subj_weights, obj_weights = self.run_weight_methods(
+                [subjective_method, objective_method]
+            )
             combined_params = {
                 "subjective_weights": subj_weights,
                 "objective_weights": obj_weights,
             }
-            self.params["combined_params"] = combined_params
-            combined_instance = DecisionMethodFactory.get_method(
-                combined_method, self.params
-            )
-            combined_weights = combined_instance.execute()
+            with self.profiler.stage(combined_method):
+                combined_instance = DecisionMethodFactory.get_method(
+                    combined_method, {**self.params, "combined_params": combined_params}
+                )
+                combined_weights = combined_instance.execute()
             return combined_weights
 
         # If only the subjective method is provided, return the subjective weights
         elif subjective_method:
-            return DecisionMethodFactory.get_method(
-                subjective_method, self.params
-            ).execute()
+            (weights,) = self.run_weight_methods([subjective_method])
+            return {"status": "success", "weights": weights}
         # If only the objective method is provided, return the objective weights
         elif objective_method:
-            return DecisionMethodFactory.get_method(
-                objective_method, self.params
-            ).execute()
+            (weights,) = self.run_weight_methods([objective_method])
+            return {"status": "success", "weights": weights}
         # If any valid weight determination method is provided, return the ValueError
         else:
             raise BusinessException("No valid weight determination method provided.")
 
+    def expand_weights(self, weights):
+        """
+        Expand a per-criterion weight vector to one weight row per evaluation object.
+
+        Methods such as AHP return a single weight per criterion, while the
+        assessment methods expect the per-object weight matrix produced by HEWM.
+        """
+        if np.ndim(weights) == 1:
+            return np.tile(
+                np.asarray(weights, dtype=float), (len(self.params["filled_data"]), 1)
+            )
+        return weights
+
+    def run_weight_methods(self, method_names):
+        """
+        Execute the given weight methods on a thread pool.
+
+        The weight methods spend their time in NumPy/BLAS, which releases the GIL,
+        so independent methods overlap. The wall time and the outcome of every
+        method are recorded in ``self.weight_report``.
+
+        Parameters
+        ----------
+        method_names : list of str
+            The names of the registered weight methods to execute.
+
+        Returns
+        -------
+        list
+            The weights of each method, in the same order as ``method_names``.
+
+        Raises
+        ------
+        BusinessException
+            If any of the methods fails, naming every failed method.
+        """
+        if len(method_names) == 1:
+            reports = [self._run_weight_method(method_names[0])]
+        else:
+            with ThreadPoolExecutor(max_workers=len(method_names)) as executor:
+                reports = list(executor.map(self._run_weight_method, method_names))
+
+        self.weight_report = [
+            {key: value for key, value in report.items() if key != "weights"}
+            for report in reports
+        ]
+        for report in self.weight_report:
+            logger.debug(
+                "Weight method %s finished in %.2f ms (%s)",
+                report["method"],
+                report["elapsed_ms"],
+                report["status"],
+            )
+
+        failed = [report for report in reports if report["status"] != "success"]
+        if failed:
+            raise BusinessException(
+                "Failed to calculate weights. "
+                + "; ".join(f"{r['method']}: {r['message']}" for r in failed)
+            )
+        return [report["weights"] for report in reports]
+
+    def _run_weight_method(self, method_name):
+        """Execute a single weight method and time it."""
+        start = time.perf_counter()
+        try:
+            with self.profiler.stage(method_name, parent="weights"):
+                result = DecisionMethodFactory.get_method(
+                    method_name, self.params
+                ).execute()
+            if isinstance(result, dict):
+                if result.get("status") != "success":
+                    raise BusinessException(
+                        result.get("error", "The method did not return weights.")
+                    )
+                weights = result["weights"]
+            elif result is None:
+                raise BusinessException("The method did not return weights.")
+            else:
+                # Some objective methods return the bare weight vector
+                weights = result
+            report = {"status": "success", "message": "success", "weights": weights}
+        except Exception as e:
+            report = {"status": "error", "message": str(e)}
+        report["method"] = method_name
+        report["elapsed_ms"] = (time.perf_counter() - start) * 1000
+        return report
+
     def scaling_data(self):
         """
         Scale the data for resilience assessment.
@@ -3,11 +3,20 @@ Core module for ResilienceAssessmentJD.
 This module contains the core components for resilience assessment.
 """
 
-from .DecisionMethod import DecisionMethod
-from .ExceptionHandler import ExceptionHandler
-from .MethodFactory import DecisionMethodFactory, ScalingMethodFactory
-from .ScalingMethod import ScalingMethod
-from .UnifiedModel import UnifiedModel
+from typing import TYPE_CHECKING
+
+from .._lazy import lazy_package
+
+if TYPE_CHECKING:
+    from .AssessmentContext import AssessmentContext
+    from .DecisionMethod import DecisionMethod
+    from .ExceptionHandler import ExceptionHandler
+    from .MethodFactory import DecisionMethodFactory, ScalingMethodFactory
+    from .Profiler import Profiler
+    from .RankAggregation import RankAggregation
+    from .ResultTable import ResultTable
+    from .ScalingMethod import ScalingMethod
+    from .UnifiedModel import UnifiedModel
 
 __all__ = [
     "UnifiedModel",
@@ -16,4 +25,24 @@ __all__ = [
     "DecisionMethod",
     "ScalingMethod",
     "ExceptionHandler",
+    "RankAggregation",
+    "AssessmentContext",
+    "ResultTable",
+    "Profiler",
 ]
+
+lazy_package(
+    __name__,
+    {
+        "UnifiedModel": ".UnifiedModel",
+        "DecisionMethodFactory": ".MethodFactory",
+        "ScalingMethodFactory": ".MethodFactory",
+        "DecisionMethod": ".DecisionMethod",
+        "ScalingMethod": ".ScalingMethod",
+        "ExceptionHandler": ".ExceptionHandler",
+        "RankAggregation": ".RankAggregation",
+        "AssessmentContext": ".AssessmentContext",
+        "ResultTable": ".ResultTable",
+        "Profiler": ".Profiler",
+    },
+)
@@ -8,8 +8,21 @@ import numpy as np
 
 from ..core.DecisionMethod import DecisionMethod
 
+# 随机一致性指标 RI, 按矩阵阶数索引
+RANDOM_INDICES = [0, 0, 0.58, 0.90, 1.12, 1.24, 1.32, 1.41, 1.45, 1.49]
+
 
 class AHP(DecisionMethod):
+    """
+    Analytic Hierarchy Process.
+
+    ``ahp_params`` is either a single n×n judgment matrix, a k×n×n stack of expert
+    judgment matrices, or a dict with the keys ``matrices``, ``aggregation``
+    ("AIJ" or "AIP"), ``expert_weights`` and ``consistency_threshold``.
+    All matrices of a stack are validated, prioritized and checked for consistency
+    in one batched pass.
+    """
+
     def __init__(self, params):
         super().__init__(params)
         # Get the AHP data matrix
@@ -17,30 +30,105 @@ class AHP(DecisionMethod):
 
     def execute(self):
         """AHP 特定的执行逻辑"""
-        if not self._is_positive_reciprocal_matrix(self.ahp_params):
+        ahp_params = self.ahp_params
+        if not isinstance(ahp_params, dict):
+            ahp_params = {"matrices": ahp_params}
+        matrices = np.asarray(ahp_params.get("matrices", []), dtype=float)
+        if matrices.ndim == 2:
+            matrices = matrices[np.newaxis]
+        if matrices.ndim != 3 or matrices.shape[1] != matrices.shape[2]:
+            return {"error": "AHP judgment matrices must be square."}
+
+        is_reciprocal = self.check_reciprocity(matrices)
+        if not is_reciprocal.all():
             return {
-                "error": "Data does not meet the positive reciprocal matrix requirement."
+                "error": "Data does not meet the positive reciprocal matrix requirement.",
+                "invalid_experts": np.flatnonzero(~is_reciprocal).tolist(),
             }
-        eigenvalues, eigenvectors = np.linalg.eig(self.ahp_params)
-        max_index = np.argmax(eigenvalues)
-        # max_eigenvalue = eigenvalues[max_index].real
-        eigenvector = eigenvectors[:, max_index].real
-        weights = eigenvector / eigenvector.sum()
-        # consistency_ratio = self._calculate_consistency_ratio(max_eigenvalue)
 
-        return {"status": "success", "weights": weights.round(4).tolist()}
+        max_eigenvalues, priorities = self.priority_vectors(matrices)
+        consistency_ratios = self.consistency_ratios(max_eigenvalues, matrices.shape[1])
+        threshold = ahp_params.get("consistency_threshold", 0.1)
+
+        aggregation = ahp_params.get("aggregation", "AIJ")
+        expert_weights = ahp_params.get("expert_weights")
+        if aggregation == "AIJ":
+            group_matrix = self.aggregate_judgments(matrices, expert_weights)
+            group_eigenvalue, weights = self.priority_vectors(group_matrix[np.newaxis])
+            group_ratio = self.consistency_ratios(group_eigenvalue, matrices.shape[1])
+            weights, group_ratio = weights[0], float(group_ratio[0])
+        elif aggregation == "AIP":
+            weights = self.aggregate_priorities(priorities, expert_weights)
+            group_ratio = None
+        else:
+            return {"error": f"Unknown AHP aggregation method: {aggregation}"}
+
+        return {
+            "status": "success",
+            "weights": weights.round(4).tolist(),
+            "consistency_ratio": group_ratio,
+            "expert_consistency_ratios": consistency_ratios.tolist(),
+            "inconsistent_experts": np.flatnonzero(
+                consistency_ratios > threshold
+            ).tolist(),
+        }
+
+    @staticmethod
+    def check_reciprocity(matrices):
+        """检查每个判断矩阵是否为正互反矩阵."""
+        matrices = np.asarray(matrices, dtype=float)
+        positive = (matrices > 0).all(axis=(-2, -1))
+        with np.errstate(divide="ignore"):
+            reciprocal = np.isclose(
+                matrices, 1 / np.swapaxes(matrices, -2, -1), atol=1e-10
+            ).all(axis=(-2, -1))
+        return positive & reciprocal
 
     @staticmethod
-    def _is_positive_reciprocal_matrix(self, matrix):
-        """检查矩阵是否正反矩阵."""
-        return np.allclose(matrix, 1 / matrix.T, atol=1e-10)
+    def priority_vectors(matrices):
+        """批量计算判断矩阵的最大特征值及归一化的主特征向量."""
+        eigenvalues, eigenvectors = np.linalg.eig(matrices)
+        max_index = np.argmax(eigenvalues.real, axis=-1)
+        max_eigenvalues = np.take_along_axis(
+            eigenvalues.real, max_index[:, np.newaxis], axis=-1
+        )[:, 0]
+        eigenvector = np.take_along_axis(
+            eigenvectors.real, max_index[:, np.newaxis, np.newaxis], axis=-1
+        )[..., 0]
+        weights = eigenvector / eigenvector.sum(axis=-1, keepdims=True)
+        return max_eigenvalues, weights
 
-    def _calculate_consistency_ratio(self, max_eigenvalue):
+    @staticmethod
+    def consistency_ratios(max_eigenvalues, size):
         """计算AHP矩阵的一致性比."""
-        size = self.data.shape[0]
-        random_indices = [0, 0, 0.58, 0.90, 1.12, 1.24, 1.32, 1.41, 1.45, 1.49]
-        CI = (max_eigenvalue - size) / (size - 1)
+        max_eigenvalues = np.asarray(max_eigenvalues, dtype=float)
         RI = (
-            random_indices[size] if size < len(random_indices) else 1.51
+            RANDOM_INDICES[size] if size < len(RANDOM_INDICES) else 1.51
         )  # Default RI value for larger matrices
-        return CI / RI if RI != 0 else 0
+        if RI == 0:
+            return np.zeros_like(max_eigenvalues)
+        CI = (max_eigenvalues - size) / (size - 1)
+        return CI / RI
+
+    @staticmethod
+    def aggregate_judgments(matrices, expert_weights=None):
+        """AIJ: 对各专家判断矩阵按元素取加权几何平均, 结果仍为正互反矩阵."""
+        expert_weights = AHP._expert_weights(expert_weights, len(matrices))
+        return np.exp(np.tensordot(expert_weights, np.log(matrices), axes=1))
+
+    @staticmethod
+    def aggregate_priorities(priorities, expert_weights=None):
+        """AIP: 对各专家的优先级向量取加权几何平均并归一化."""
+        expert_weights = AHP._expert_weights(expert_weights, len(priorities))
+        weights = np.exp(expert_weights @ np.log(priorities))
+        return weights / weights.sum()
+
+    @staticmethod
+    def _expert_weights(expert_weights, k):
+        """专家权重默认相等, 并归一化为和为1."""
+        if expert_weights is None:
+            return np.full(k, 1 / k)
+        expert_weights = np.asarray(expert_weights, dtype=float)
+        if expert_weights.shape != (k,):
+            raise ValueError("The number of expert weights must match the matrices.")
+        return expert_weights / expert_weights.sum()
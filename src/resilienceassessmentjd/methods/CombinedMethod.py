@@ -13,9 +13,12 @@ class CombinedMethod(DecisionMethod):
     # TODO: Implement Weight Combined Method
 
     def __init__(self, parameters):
-        self.subj_weights = np.array(parameters["subjective_weights"])
-        self.obj_weights = np.array(parameters["objective_weights"])
+        super().__init__(parameters)
+        # UnifiedModel 将主客观权重放在 combined_params 中传入
+        combined_params = parameters.get("combined_params", parameters)
+        self.subj_weights = np.array(combined_params["subjective_weights"])
+        self.obj_weights = np.array(combined_params["objective_weights"])
 
     def execute(self):
         combined_weights = (self.subj_weights + self.obj_weights) / 2  # 简单平均
-        return combined_weights.tolist()
+        return {"status": "success", "weights": combined_weights.tolist()}
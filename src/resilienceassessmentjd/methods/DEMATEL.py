@@ -4,66 +4,260 @@
 # @Author    :Wenjie Xu
 # @Email     :wenjie.xu.cn@outlook.com
 
+import warnings
+
 import numpy as np
+import scipy.linalg
+from scipy import sparse
 
 from ..core.DecisionMethod import DecisionMethod
 
+TOTAL_RELATION_ERROR = (
+    "Failed to compute total relation matrix. The matrix might not be invertible: "
+    "I - N is singular when every row (or column) sum of the influence matrix "
+    "equals the largest one, e.g. for a uniform expert matrix."
+)
+
 
 class DEMATEL(DecisionMethod):
+    """
+    Decision Making Trial and Evaluation Laboratory.
+
+    The direct influence matrix is read from ``dematel_params`` (falling back to the
+    legacy ``data`` key), either as the matrix itself or as a dict with the keys
+    ``matrix``, ``solver`` ("solve", "lu" or "neumann"), ``tol``, ``max_terms``,
+    ``include_matrices`` and ``expert_weights``. The total relation matrix is
+    obtained by solving (I - N) T = N, so no explicit inverse is formed. The
+    truncated Neumann series keeps sparse influence matrices sparse on the left of
+    every product.
+
+    A k×n×n stack of expert matrices is evaluated in one call: every expert and the
+    weighted mean of the direct matrices are solved as one batch of LU solves, and
+    the agreement of the experts is summarized in a consensus matrix.
+    """
+
+    solvers = ("solve", "lu", "neumann")
+
     def __init__(self, parameters):
-        data = np.array(parameters["data"])
-        super().__init__(data)
-        self.data = data
+        super().__init__(parameters)
+        dematel_params = parameters.get("dematel_params", parameters.get("data"))
+        if not isinstance(dematel_params, dict):
+            dematel_params = {"matrix": dematel_params}
+        matrix = dematel_params.get("matrix")
+        self.data = matrix if sparse.issparse(matrix) else np.asarray(matrix, float)
+        self.solver = dematel_params.get("solver", "solve")
+        self.tol = dematel_params.get("tol", 1e-10)
+        self.max_terms = dematel_params.get("max_terms", 1000)
+        self.include_matrices = dematel_params.get("include_matrices", True)
+        self.expert_weights = dematel_params.get("expert_weights")
 
     def execute(self):
         """执行DEMATEL特定的计算."""
         # 确保数据是DEMATEL要求的方阵
-        if self.data.shape[0] != self.data.shape[1]:
+        if self.data.ndim not in (2, 3) or self.data.shape[-1] != self.data.shape[-2]:
             return {"error": "DEMATEL data must be a square matrix."}
+        if self.solver not in self.solvers:
+            return {"error": f"Unknown DEMATEL solver: {self.solver}"}
+        if self.data.ndim == 3:
+            return self.execute_group()
 
-        # 计算归一化直接关系矩阵
-        normalized_matrix = self.normalize_matrix(self.data)
+        analysis = self.analyze(self.data)
+        if analysis is None:
+            return {"error": TOTAL_RELATION_ERROR}
+
+        result = {
+            "status": "success",
+            "solver": self.solver,
+            "influence_degree": analysis["d"].tolist(),
+            "affected_degree": analysis["r"].tolist(),
+            "cause_degree": analysis["d_plus_r"].tolist(),
+            "effect_degree": analysis["d_minus_r"].tolist(),
+            "description": "DEMATEL method executed successfully.",
+        }
+        if self.include_matrices:
+            normalized_matrix = analysis["normalized_matrix"]
+            if sparse.issparse(normalized_matrix):
+                normalized_matrix = normalized_matrix.toarray()
+            result["normalized_matrix"] = normalized_matrix.tolist()
+            result["total_relation_matrix"] = analysis["total_relation_matrix"].tolist()
+        return result
+
+    def execute_group(self):
+        """对 k×n×n 的专家直接影响矩阵堆叠执行群组DEMATEL."""
+        group = self.analyze_group(self.data, self.expert_weights)
+        if group is None:
+            return {"error": TOTAL_RELATION_ERROR}
+        aggregate, experts = group["aggregate"], group["experts"]
+        result = {
+            "status": "success",
+            "solver": self.solver,
+            "influence_degree": aggregate["d"].tolist(),
+            "affected_degree": aggregate["r"].tolist(),
+            "cause_degree": aggregate["d_plus_r"].tolist(),
+            "effect_degree": aggregate["d_minus_r"].tolist(),
+            "experts": {
+                "influence_degree": experts["d"].tolist(),
+                "affected_degree": experts["r"].tolist(),
+                "cause_degree": experts["d_plus_r"].tolist(),
+                "effect_degree": experts["d_minus_r"].tolist(),
+            },
+            "consensus_matrix": group["consensus_matrix"].tolist(),
+            "description": "Group DEMATEL method executed successfully.",
+        }
+        if self.include_matrices:
+            result["normalized_matrix"] = aggregate["normalized_matrix"].tolist()
+            result["total_relation_matrix"] = aggregate[
+                "total_relation_matrix"
+            ].tolist()
+            result["experts"]["total_relation_matrix"] = experts[
+                "total_relation_matrix"
+            ].tolist()
+        return result
+
+    def analyze_group(self, matrices, expert_weights=None):
+        """
+        Run DEMATEL on a k×n×n stack of expert direct influence matrices.
+
+        The weighted mean of the direct matrices is appended to the stack, so the
+        aggregate and all experts are solved in one batched call.
+
+        Returns
+        -------
+        dict or None
+            The ``aggregate`` and per-expert ``experts`` analyses (arrays with a
+            leading expert axis) and the ``consensus_matrix``, or None if any total
+            relation matrix cannot be computed.
+        """
+        k = matrices.shape[0]
+        if expert_weights is None:
+            expert_weights = np.full(k, 1 / k)
+        expert_weights = np.asarray(expert_weights, dtype=float)
+        if expert_weights.shape != (k,):
+            raise ValueError("The number of expert weights must match the matrices.")
+        expert_weights = expert_weights / expert_weights.sum()
+        mean_matrix = np.tensordot(expert_weights, matrices, axes=1)
 
+        analysis = self.analyze(np.concatenate([matrices, mean_matrix[np.newaxis]]))
+        if analysis is None:
+            return None
+        experts = {key: value[:k] for key, value in analysis.items()}
+        aggregate = {key: value[k] for key, value in analysis.items()}
+        return {
+            "aggregate": aggregate,
+            "experts": experts,
+            "consensus_matrix": self.consensus_matrix(
+                experts["total_relation_matrix"], expert_weights
+            ),
+        }
+
+    @staticmethod
+    def consensus_matrix(total_relation_matrices, expert_weights):
+        """
+        按元素计算专家间的一致程度: 1 - 加权变异系数, 截断到 [0, 1].
+
+        1 表示所有专家对该影响关系的判断完全一致.
+        """
+        mean = np.tensordot(expert_weights, total_relation_matrices, axes=1)
+        variance = np.tensordot(
+            expert_weights, (total_relation_matrices - mean) ** 2, axes=1
+        )
+        with np.errstate(divide="ignore", invalid="ignore"):
+            variation = np.where(mean != 0, np.sqrt(variance) / np.abs(mean), 0.0)
+        return np.clip(1 - variation, 0, 1)
+
+    def analyze(self, matrix):
+        """
+        Run DEMATEL on one direct influence matrix, or on a stack of them.
+
+        Returns
+        -------
+        dict or None
+            The normalized and total relation matrices together with the D, R,
+            D+R and D-R arrays, or None if the total relation matrix cannot be
+            computed.
+        """
+        # 计算归一化直接关系矩阵
+        normalized_matrix = self.normalize_matrix(matrix)
         # 计算总关系矩阵
         total_relation_matrix = self.calculate_total_relation_matrix(normalized_matrix)
         if total_relation_matrix is None:
-            return {
-                "error": "Failed to compute total relation matrix. The matrix might not be invertible."
-            }
-
+            return None
         # 分析结果
         d, r = self.calculate_impact_degrees(total_relation_matrix)
-        d_plus_r, d_minus_r = d + r, d - r
-
         return {
-            "normalized_matrix": normalized_matrix.tolist(),
-            "total_relation_matrix": total_relation_matrix.tolist(),
-            "influence_degree": d.tolist(),
-            "affected_degree": r.tolist(),
-            "cause_degree": d_plus_r.tolist(),
-            "effect_degree": d_minus_r.tolist(),
-            "description": "DEMATEL method executed successfully.",
+            "normalized_matrix": normalized_matrix,
+            "total_relation_matrix": total_relation_matrix,
+            "d": d,
+            "r": r,
+            "d_plus_r": d + r,
+            "d_minus_r": d - r,
         }
 
     def normalize_matrix(self, matrix):
-        """通过除以所有元素的和来使矩阵归一化."""
-        matrix_sum = np.sum(matrix)
-        if matrix_sum == 0:
+        """
+        除以最大行和与最大列和中的较大者, 使归一化矩阵 N 的谱半径不超过 1.
+
+        谱半径小于 1 时总关系矩阵的级数收敛; 若每行 (或每列) 之和都等于该最大值,
+        例如各元素相同的专家矩阵, 谱半径恰为 1, I - N 奇异, 总关系矩阵不存在.
+        """
+        abs_matrix = abs(matrix)
+        if matrix.ndim == 3:
+            scale = np.maximum(
+                abs_matrix.sum(axis=-1).max(axis=-1),
+                abs_matrix.sum(axis=-2).max(axis=-1),
+            )[:, np.newaxis, np.newaxis]
+        else:
+            scale = max(abs_matrix.sum(axis=1).max(), abs_matrix.sum(axis=0).max())
+        if np.any(scale == 0):
             raise ValueError(
-                "Sum of all elements in the matrix is zero, normalization impossible."
+                "All elements of the matrix are zero, normalization impossible."
             )
-        return matrix / matrix_sum
+        return matrix / scale
 
     def calculate_total_relation_matrix(self, normalized_matrix):
-        """利用矩阵反演计算总关系矩阵."""
-        identity_matrix = np.eye(normalized_matrix.shape[0])  # Identity matrix
+        """求解 (I - N) T = N 得到总关系矩阵 T = N (I - N)^-1."""
+        if self.solver == "neumann":
+            return self._neumann_series(normalized_matrix)
+
+        n = normalized_matrix.shape[-1]
+        if sparse.issparse(normalized_matrix):
+            normalized_matrix = normalized_matrix.toarray()
+        system = np.eye(n) - normalized_matrix
         try:
-            return np.linalg.inv(identity_matrix - normalized_matrix) - identity_matrix
-        except np.linalg.LinAlgError:
+            with warnings.catch_warnings():
+                # lu_factor 对奇异矩阵只发出警告, 视为求解失败
+                warnings.simplefilter("error", scipy.linalg.LinAlgWarning)
+                # np.linalg.solve 对矩阵堆叠逐个做LU分解, 即批量LU求解
+                if self.solver == "lu" and normalized_matrix.ndim == 2:
+                    lu_piv = scipy.linalg.lu_factor(system, check_finite=False)
+                    total = scipy.linalg.lu_solve(
+                        lu_piv, normalized_matrix, check_finite=False
+                    )
+                else:
+                    total = np.linalg.solve(system, normalized_matrix)
+        except (
+            np.linalg.LinAlgError,
+            scipy.linalg.LinAlgError,
+            scipy.linalg.LinAlgWarning,
+        ):
             return None
+        return total if np.isfinite(total).all() else None
+
+    def _neumann_series(self, normalized_matrix):
+        """截断的 Neumann 级数 T = N + N^2 + ..., 适用于稀疏影响矩阵."""
+        term = normalized_matrix
+        if sparse.issparse(term):
+            term = term.toarray()
+        total = term.copy()
+        for _ in range(self.max_terms - 1):
+            term = normalized_matrix @ term
+            total += term
+            if np.abs(term).max() < self.tol:
+                return total
+        return None
 
     def calculate_impact_degrees(self, total_relation_matrix):
         """计算影响程度(行和)和被影响程度(列和)."""
-        d = np.sum(total_relation_matrix, axis=1)  # Impact degrees
-        r = np.sum(total_relation_matrix, axis=0)  # Being impacted degrees
+        d = np.sum(total_relation_matrix, axis=-1)  # Impact degrees
+        r = np.sum(total_relation_matrix, axis=-2)  # Being impacted degrees
         return d, r
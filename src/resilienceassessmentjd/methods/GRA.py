@@ -0,0 +1,19 @@
+# !/usr/bin/env python
+# @FileName  :GRA.py
+# @Time      :2026/10/19 下午3:55
+# @Author    :Wenjie Xu
+# @Email     :wenjie.xu.cn@outlook.com
+
+from .RankingCore import RankingMethod
+
+
+class GRA(RankingMethod):
+    """
+    Grey Relational Analysis.
+
+    The objects are ranked by their weighted grey relational grade to the best
+    value of each criterion (bigger is better). The distinguishing coefficient
+    ``rho`` can be set in ``gra_params`` and defaults to 0.5.
+    """
+
+    method = "GRA"
@@ -0,0 +1,171 @@
+# !/usr/bin/env python
+# @FileName  :HierarchicalAHP.py
+# @Time      :2026/10/19 上午10:12
+# @Author    :Wenjie Xu
+# @Email     :wenjie.xu.cn@outlook.com
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from scipy import sparse
+
+from ..core.DecisionMethod import DecisionMethod
+from .AHP import AHP
+
+ROOT = "goal"
+
+
+class HierarchicalAHP(DecisionMethod):
+    """
+    Hierarchical Analytic Hierarchy Process over the D/E criteria tree.
+
+    The tree is goal -> dimension (``D1``) -> dimension/element (``D1_E1``) ->
+    criterion. ``ahp_params`` maps node names to the judgment matrix (or the
+    k×n×n expert stack) comparing the children of that node, ordered as the
+    children appear in the criteria list. Nodes without judgments give equal
+    priorities to their children.
+
+    Local priorities are cached by the content of their judgments, so changing the
+    judgments of one node only recomputes that node. Global weights are the product
+    of the local priorities along each root-to-leaf path, composed for all criteria
+    by a single sparse matrix product in log space. The cache is shared by all
+    instances and guarded by a lock, so concurrent requests may use it.
+    """
+
+    _local_cache = OrderedDict()
+    _cache_size = 1024
+    _cache_lock = threading.Lock()
+
+    def __init__(self, params):
+        super().__init__(params)
+        self.ahp_params = params.get("ahp_params", {})
+        self.criteria_dict = params["criteria_dict"]
+        self.criteria_names = params["criteria_names"]
+
+    def execute(self):
+        """层次AHP的执行逻辑."""
+        children = self.build_tree(self.criteria_dict, self.criteria_names)
+        if children is None:
+            return {
+                "error": "Hierarchical AHP requires the dimension and element tags "
+                "of every criterion."
+            }
+        nodes, path_matrix = self.path_incidence(children, self.criteria_names)
+
+        local_weights = {}
+        consistency_ratios = {}
+        for parent, child_nodes in children.items():
+            judgments = self.ahp_params.get(parent)
+            priorities, ratio = self.local_priorities(judgments, len(child_nodes))
+            if priorities is None:
+                return {
+                    "error": f"Judgments of node {parent} do not meet the positive "
+                    f"reciprocal matrix requirement for {len(child_nodes)} children."
+                }
+            consistency_ratios[parent] = ratio
+            local_weights.update(zip(child_nodes, priorities, strict=True))
+
+        local = np.array([local_weights[node] for node in nodes])
+        with np.errstate(divide="ignore"):
+            weights = np.exp(path_matrix @ np.log(local))
+
+        return {
+            "status": "success",
+            "weights": weights.round(4).tolist(),
+            "local_priorities": {
+                parent: [local_weights[child] for child in child_nodes]
+                for parent, child_nodes in children.items()
+            },
+            "consistency_ratios": consistency_ratios,
+        }
+
+    @staticmethod
+    def build_tree(criteria_dict, criteria_names):
+        """
+        根据准则的 dimension 与 element 标签构建 goal -> D -> D_E -> 准则 的树.
+        任一准则缺少标签时返回 None.
+        """
+        children = {ROOT: []}
+        for name in criteria_names:
+            tags = criteria_dict.get(name, {})
+            dimension, element = tags.get("dimension"), tags.get("element")
+            if dimension is None or element is None:
+                return None
+            node = f"{dimension}_{element}"
+            if dimension not in children:
+                children[ROOT].append(dimension)
+                children[dimension] = []
+            if node not in children:
+                children[dimension].append(node)
+                children[node] = []
+            children[node].append(name)
+        return children
+
+    @staticmethod
+    def path_incidence(children, criteria_names):
+        """
+        Build the sparse leaf × node path incidence matrix of the tree.
+
+        Entry (i, j) is 1 when node j lies on the path from the goal to criterion i,
+        so the log of the global weight of every criterion is one sparse product
+        with the log of the local weights.
+        """
+        nodes = [child for child_nodes in children.values() for child in child_nodes]
+        position = {node: j for j, node in enumerate(nodes)}
+        parent_of = {
+            child: parent
+            for parent, child_nodes in children.items()
+            for child in child_nodes
+        }
+        rows, cols = [], []
+        for i, name in enumerate(criteria_names):
+            node = name
+            while node != ROOT:
+                rows.append(i)
+                cols.append(position[node])
+                node = parent_of[node]
+        path_matrix = sparse.csr_matrix(
+            (np.ones(len(rows)), (rows, cols)), shape=(len(criteria_names), len(nodes))
+        )
+        return nodes, path_matrix
+
+    @classmethod
+    def local_priorities(cls, judgments, size):
+        """
+        Compute the local priorities and consistency ratio of one node.
+
+        Results are cached by the content of the judgments, so unchanged nodes are
+        not recomputed between requests.
+        """
+        if judgments is None or size == 1:
+            return [1 / size] * size, 0.0
+
+        matrices = np.asarray(judgments, dtype=float)
+        if matrices.ndim == 2:
+            matrices = matrices[np.newaxis]
+        if (
+            matrices.ndim != 3
+            or matrices.shape[1:] != (size, size)
+            or not AHP.check_reciprocity(matrices).all()
+        ):
+            return None, None
+
+        key = hashlib.blake2b(matrices.tobytes(), digest_size=16).hexdigest()
+        key = f"{matrices.shape}:{key}"
+        with cls._cache_lock:
+            if key in cls._local_cache:
+                cls._local_cache.move_to_end(key)
+                return cls._local_cache[key]
+
+        # 计算在锁外进行: 并发的相同请求可能各自计算一次, 以最后写入的结果为准
+        group_matrix = AHP.aggregate_judgments(matrices)
+        eigenvalue, priorities = AHP.priority_vectors(group_matrix[np.newaxis])
+        ratio = float(AHP.consistency_ratios(eigenvalue, size)[0])
+        result = (priorities[0].tolist(), ratio)
+        with cls._cache_lock:
+            cls._local_cache[key] = result
+            if len(cls._local_cache) > cls._cache_size:
+                cls._local_cache.popitem(last=False)
+        return result
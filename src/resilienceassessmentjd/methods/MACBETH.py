@@ -4,14 +4,14 @@
 # @Author    :Wenjie Xu
 # @Email     :wenjie.xu.cn@outlook.com
 
-import re
 import traceback
-from collections import defaultdict
 
 import numpy as np
 import pandas as pd
 
+from ..core.CriteriaHierarchy import CriteriaHierarchy
 from ..core.DecisionMethod import DecisionMethod
+from ..core.PeriodPanel import ANOMALY_THRESHOLD, PeriodPanel
 
 
 class MACBETH(DecisionMethod):
@@ -24,12 +24,14 @@ class MACBETH(DecisionMethod):
     def __init__(self, params):
         super().__init__(params)
         self.id_list = [f"{i['id']}_{i['period']}" for i in self.params.get("data", [])]
-        self.norm_df.index = self.id_list
-        self.filled_df.index = self.id_list
+        # Relabel without modifying the frames shared with other methods
+        self.norm_df = self.norm_df.set_axis(self.id_list)
+        self.filled_df = self.filled_df.set_axis(self.id_list)
         self.weights = pd.DataFrame(
-            self.params["weights"].copy(),
+            self.params["weights"],
             columns=self.params["criteria_names"],
             index=self.id_list,
+            copy=False,
         )
         self.ids_area = self.params["ids_area"]
         self.criteria_dict = self.params["criteria_dict"]
@@ -115,85 +117,80 @@ class MACBETH(DecisionMethod):
             )
             return filtered_data
         try:
-            elements = {f"E{i}": self.get_keys_by_value(self.criteria_dict, "element", f"E{i}") for i in range(1, 4)}
-            dimensions = {f"D{i}": self.get_keys_by_value(self.criteria_dict, "dimension", f"D{i}") for i in
-                          range(1, 4)}
-            # 创建结果列表
-            result = []
-
-            obj_list = self.filter_warehouses(list(self.filled_df.index))
-            for _, _name in obj_list.items():
-                _data = self.filled_df.loc[_name]
+            hierarchy = self.params.get("hierarchy") or CriteriaHierarchy(
+                self.criteria_dict, self.params["criteria_names"]
+            )
+            tree = self.params.get("tree")
+            macbeth_params = self.params.get("macbeth_params") or {}
+            # (储备库, 期次) 整数编码, 只保留至少有两个年份的储备库
+            data = self.params["data"]
+            panel = PeriodPanel([i["id"] for i in data], [i["period"] for i in data])
+            columns = list(self.filled_df.columns)
+            scores = np.empty((len(panel.rows), len(columns)))
+            # 每个储备库计为一个同名子步骤, 阶段名不含仓库 id 以免指标标签无界
+            for _name, part in self.profiler.each(
+                panel.slices(), lambda item: "warehouse"
+            ):
+                _data = self.filled_df.iloc[panel.rows[part]]
                 min_vals = _data.min()
                 max_vals = _data.max()
                 range_vals = max_vals - min_vals
                 # Prevent normalization errors, If a column's data range is 0, keep the original value
                 for column in _data.columns:
                     if range_vals[column] != 0:
-                        _data[column] = (_data[column] - min_vals[column]) / range_vals[column]
+                        _data[column] = (_data[column] - min_vals[column]) / range_vals[
+                            column
+                        ]
 
                 pairwise_comparisons = self.preprocess_data(_data)
-                scores = self.perform_computation(_data, pairwise_comparisons)
-                _weights = self.weights.loc[_name]
-                # 维度层
-                for i in ["D1", "D2", "D3"]:
-                    set_D = set(dimensions[i])
-                    for j in ["E1", "E2", "E3"]:
-                        set_E = set(elements[j])
-                        common = list(set_E.intersection(set_D))
-                        if common:
-                            dim_scores = (scores[common] * _weights[common]).sum(axis=1)
-                            df_reset = dim_scores.reset_index()
-                            df_reset.columns = ["name_year", "score"]
-                            # 分割name_year列
-                            df_reset[["name", "year"]] = df_reset["name_year"].str.rsplit("_", n=1, expand=True)
-                            # 对数据进行分组处理
-                            for name, group in df_reset.groupby("name"):
-                                period_values = group.set_index("year")["score"].to_dict()
-                                result.append({
-                                    "id": name,
-                                    "area": self.ids_area[name],
-                                    "type": "维度评估",
-                                    "dimension": i,
-                                    "element": j,
-                                    "period_values": period_values
-                                })
-                # 要素层
-                for i in ["E1", "E2", "E3"]:
-                    common = elements[i]
-                    if common:
-                        dim_scores = (scores[common] * _weights[common]).sum(axis=1)
-                        df_reset = dim_scores.reset_index()
-                        df_reset.columns = ["name_year", "score"]
-                        # 分割name_year列
-                        df_reset[["name", "year"]] = df_reset["name_year"].str.rsplit("_", n=1, expand=True)
-                        # 对数据进行分组处理
-                        for name, group in df_reset.groupby("name"):
-                            period_values = group.set_index("year")["score"].to_dict()
-                            result.append({
-                                "id": name,
-                                "area": self.ids_area[name],
-                                "type": "要素评估",
-                                "element": i,
-                                "period_values": period_values
-                            })
-
-                # 计算综合权重
-                overall_scores = (scores * _weights).sum(axis=1)
-                # 重命名列
-                df_reset = overall_scores.reset_index()
-                df_reset.columns = ["name_year", "score"]
-                # 分割name_year列
-                df_reset[["name", "year"]] = df_reset["name_year"].str.rsplit("_", n=1, expand=True)
-                # 对数据进行分组处理
-                for name, group in df_reset.groupby("name"):
-                    period_values = group.set_index("year")["score"].to_dict()
-                    result.append({
+                scores[part] = self.perform_computation(
+                    _data, pairwise_comparisons
+                ).to_numpy(dtype=float)
+            # 加权得分, 所有储备库一次按 维度/要素、要素 与 节点 汇总
+            weighted = scores * self.weights.iloc[panel.rows][columns].to_numpy()
+            levels = [
+                [
+                    {"type": "维度评估", "dimension": i, "element": j}
+                    for i, j in hierarchy.pairs
+                ],
+                [{"type": "要素评估", "element": i} for i in hierarchy.elements],
+            ]
+            level_scores = [
+                hierarchy.segment_sum(weighted, "pairs"),
+                hierarchy.segment_sum(weighted, "elements"),
+            ]
+            if tree is not None:
+                levels.append([tree.fields(k) for k in range(len(tree.nodes))])
+                level_scores.append(tree.rollup_sum(weighted))
+            levels.append([{"type": "综合评估"}])
+            level_scores.append(np.nansum(weighted, axis=1)[:, np.newaxis])
+            # 各分组的 period_values 按储备库切片得到, 无需拆分字符串或分组
+            sections = []
+            for fields, group_scores in zip(levels, level_scores, strict=True):
+                for k, group_fields in enumerate(fields):
+                    section = {
+                        "fields": group_fields,
+                        "period_values": panel.period_values(group_scores[:, k]),
+                    }
+                    if macbeth_params.get("trends"):
+                        section["trends"] = panel.trends(
+                            group_scores[:, k],
+                            macbeth_params.get("anomaly_threshold", ANOMALY_THRESHOLD),
+                        )
+                    sections.append(section)
+            # 创建结果列表, 按储备库输出
+            result = []
+            for w, name in enumerate(panel.warehouses):
+                for section in sections:
+                    record = {
                         "id": name,
                         "area": self.ids_area[name],
-                        "type": "综合评估",
-                        "period_values": period_values
-                    })
+                        **section["fields"],
+                        "period_values": section["period_values"][w],
+                    }
+                    if "trends" in section:
+                        record["trend"] = panel.trend_fields(section["trends"], w)
+                    result.append(record)
             return result
 
         except Exception as e:
@@ -206,24 +203,6 @@ class MACBETH(DecisionMethod):
     def get_keys_by_value(d, value_key, target_value):
         return [k for k, v in d.items() if v[value_key] == target_value]
 
-    @staticmethod
-    def filter_warehouses(warehouse_list):
-        # 使用defaultdict来组织数据
-        warehouses = defaultdict(list)
-
-        # 遍历列表,将相同储备库的不同年份项目组合在一起
-        for item in warehouse_list:
-            # 使用正则表达式分离储备库名称和年份
-            match = re.match(r"(.+)_(\d{4})$", item)
-            if match:
-                name, year = match.groups()
-                warehouses[name].append(item)
-
-        # 筛选出至少有两个不同年份的储备库
-        result = {name: years for name, years in warehouses.items() if len(years) >= 2}
-
-        return result
-
     @staticmethod
     def fixed_result():
         return [
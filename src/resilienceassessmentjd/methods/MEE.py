@@ -4,13 +4,31 @@
 # @Author    :Wenjie Xu
 # @Email     :wenjie.xu.cn@outlook.com
 
-import copy
 import traceback
 
 import numpy as np
-import pandas as pd
 
+from ..core.CriteriaHierarchy import CriteriaHierarchy
 from ..core.DecisionMethod import DecisionMethod
+from ..core.Profiler import NULL_PROFILER
+from ..core.ResultSink import open_sink
+from ..core.ResultTable import ResultTable
+
+GRADES = ("待整改", "合格", "良好", "优秀")
+GRADE_FIELDS = ("rectified_value", "qualified_value", "good_value", "excellent_value")
+# Typed columns of the records written to a Parquet sink
+RECORD_COLUMNS = {
+    "id": "string",
+    "area": "string",
+    "type": "string",
+    "dimension": "string",
+    "element": "string",
+    "node": "string",
+    "parent": "string",
+    "depth": "int64",
+    **dict.fromkeys(GRADE_FIELDS, "float64"),
+    "level": "string",
+}
 
 
 class MEE(DecisionMethod):
@@ -23,21 +41,14 @@ class MEE(DecisionMethod):
     def __init__(self, params):
         super().__init__(params)
 
-    def preprocess_data(self, df_chosed):
+    def level_boundaries_from_range(self, min_vals, max_vals):
         """
-        If level_boundaries exists in params, it is used directly.
-
-        Otherwise, a default level_boundaries is calculated.
-        Calculate the mean and standard deviation of each criterion.
-        Divide into four levels according to the mean and standard deviation:
-        to be rectified, qualified, good, and excellent.
+        Compute the default level boundaries from the range of each criterion.
 
-        In order to divide into four levels, you can choose n = 0.5, 1, 1.5, 2.
+        ``min_vals`` and ``max_vals`` map each criterion to its minimum and
+        maximum, so the boundaries can also come from a streaming pass over the
+        data.
         """
-        # Check for unique values in each column
-        unique_values = {
-            column: df_chosed[column].unique() for column in df_chosed.columns
-        }
         # n_values = [0.5, 1, 1.5, 2]
         attribute_0 = self.get_keys_by_value(
             self.params["criteria_dict"], "attribute", "0"
@@ -49,9 +60,9 @@ class MEE(DecisionMethod):
             self.params["criteria_dict"], "attribute", "2"
         )
         level_boundaries = {}
-        for column, _ in unique_values.items():
+        for column in min_vals:
             # For other indicators, use the 25th, 50th, and 75th percentiles to divide the grades
-            max_val, min_val = df_chosed[column].max(), df_chosed[column].min()
+            max_val, min_val = max_vals[column], min_vals[column]
             interval = (max_val - min_val) / 4
             round_digits = 2
             if column in attribute_0:
@@ -101,282 +112,284 @@ class MEE(DecisionMethod):
                 }
         return level_boundaries
 
-    def perform_computation(self, level_boundaries, df_chosed):
+    def execute(self):
         """
-        Perform the specific computation for the MEE method.
+        Execute the Matter-Element Extension Model (MEE).
+
+        ``mee_params.chunk_size`` processes the objects in chunks of rows, so only
+        the correlation degrees of one chunk are held in memory. With
+        ``mee_params.sink`` (a ``.jsonl`` or ``.parquet`` file) the records of every
+        chunk are written to the sink as soon as they are computed.
 
         Returns
         -------
-        result : dict
-            The result of the computation.
+        result : list or dict
+            The result of the MEE execution, or the sink path, format and number of
+            records written when a sink is given.
         """
         try:
-            correlation_degrees = {}
-            for column_name, column_data in df_chosed.items():
-                # 读取经典域
-                boundary = level_boundaries.get(column_name)
-                # 读取节域
-                all_values = [
-                    item for sublist in boundary.values() for item in sublist
-                ]  # 元素提取出来并扁平化到一个列表中
-                _min, _max = min(all_values), max(all_values)
-                _corr = []
-                for i in boundary:
-                    lower, upper = boundary.get(i)
-                    # 计算关联度
-                    # 经典域物元距离
-                    distance_cla = np.abs(column_data - 0.5 * (lower + upper)) - 0.5 * (
-                        upper - lower
-                    )
-                    # 节域物元距离1
-                    distance_ext = np.abs(column_data - 0.5 * (_min + _max)) - 0.5 * (
-                        _max - _min
-                    )
-                    # 使用布尔索引检查指标的值是否在经典域物元区间内
-                    is_in_range = (distance_cla >= lower) & (distance_cla <= upper)
-                    # 检查是否存在相等的距离
-                    equal_distances = np.isclose(distance_cla, distance_ext)
-                    # 利用向量化运算计算关联度
-                    _epsilon = 1e-10  # 防止除以0
-                    _corr.append(
-                        pd.Series(
-                            np.where(
-                                is_in_range,
-                                -distance_cla
-                                / np.clip(np.abs(upper - lower), _epsilon, None),
-                                # 使用 np.clip() 函数来限制最小分母值
-                                np.where(
-                                    equal_distances,
-                                    0,  # 当距离相等时，关联度设为0
-                                    distance_cla / (distance_ext - distance_cla),
-                                ),
-                            ),
-                            name=i,
-                            index=is_in_range.index,
-                        )
-                    )
-                _corr = pd.concat(_corr, axis=1)
-                _corr["分类等级"] = _corr.idxmax(axis=1)
-                # 重命名索引列
-                _corr.reset_index(inplace=True)
-                # 重命名索引列
-                _corr.rename(columns={"index": "评估对象"}, inplace=True)
-                correlation_degrees[column_name] = _corr
-            return correlation_degrees
+            mee_params = self.params.get("mee_params") or {}
+            chunks = self.iter_chunks(mee_params.get("chunk_size"))
+            sink_path = mee_params.get("sink")
+            if sink_path is None:
+                return [record for records in chunks for record in records]
+            with open_sink(sink_path, RECORD_COLUMNS) as sink:
+                for records in chunks:
+                    sink.write(records)
+            return {"sink": sink.path, "format": sink.format, "records": sink.count}
+
         except Exception as e:
             print(f"Exception caught: {type(e).__name__}")
             print(f"Exception information: {str(e)}")
             print("Detailed information:")
             print(traceback.format_exc())
 
-    def execute(self):
+    def iter_records(self):
+        """逐块生成记录; 设置 ``mee_params.chunk_size`` 时内存中只保留一个分块."""
+        for records in self.iter_chunks(
+            (self.params.get("mee_params") or {}).get("chunk_size")
+        ):
+            yield from records
+
+    def iter_chunks(self, chunk_size=None):
         """
-        Execute the Matter-Element Extension Model (MEE).
+        Yield the records of the objects, one list per chunk of rows.
+
+        Within a chunk the records are ordered like the unchunked result:
+        维度评估, 要素评估, 综合评估, then 节点评估.
+        """
+        ids = list(self.params["ids_area"])
+        for rows, sections in self.iter_sections(chunk_size):
+            records = []
+            with self.profiler.stage("records"):
+                for fields, degrees in sections:
+                    records.extend(self.build_records(fields, degrees, ids[rows]))
+            yield records
+
+    def result_table(self):
+        """由各分组的关联度数组直接生成列式结果, 不创建逐条记录."""
+        ids = list(self.params["ids_area"])
+        invalid_ids = set(self.params["invalid_ids"])
+        table = ResultTable(
+            ids,
+            [self.params["ids_area"][_id] for _id in ids],
+            [_id in invalid_ids for _id in ids],
+        )
+        grades = np.array(GRADES, dtype=object)
+        for rows, sections in self.iter_sections(
+            (self.params.get("mee_params") or {}).get("chunk_size")
+        ):
+            for fields, degrees in sections:
+                levels = np.where(np.isnan(degrees), -np.inf, degrees).argmax(axis=1)
+                values = dict(zip(GRADE_FIELDS, degrees.T, strict=True))
+                table.add_group(fields, rows=rows, **values, level=grades[levels])
+        return table
+
+    def iter_sections(self, chunk_size=None):
+        """
+        Yield the weighted correlation degrees of every group, chunk by chunk.
+
+        The level boundaries only need the range of every criterion, which a
+        first streaming pass collects chunk by chunk. The correlation degrees of
+        a row do not depend on the other rows, so each chunk then goes through
+        the correlation kernel on its own.
+
+        Yields
+        ------
+        tuple
+            The ``slice`` of the rows of the chunk and its ``sections``.
+        """
+        criteria_names = list(self.params["criteria_names"])
+        df_chosed = self.norm_df[criteria_names]
+        # df_chosed = self.filled_df
+        n_rows = len(df_chosed)
+        chunk_size = int(chunk_size or n_rows or 1)
+        if chunk_size < 1:
+            raise ValueError("The MEE chunk size must be positive.")
+        starts = range(0, n_rows, chunk_size)
+
+        with self.profiler.stage("boundaries"):
+            domain = self.stream_boundaries(
+                df_chosed, criteria_names, starts, chunk_size
+            )
+
+        weights = np.asarray(self.params["weights"])
+        hierarchy = self.params.get("hierarchy") or CriteriaHierarchy(
+            self.params["criteria_dict"], self.params["criteria_names"]
+        )
+        tree = self.params.get("tree")
+        # 第二遍: 逐块计算关联度并按分组汇总
+        for start in starts:
+            stop = min(start + chunk_size, n_rows)
+            block = df_chosed.iloc[start:stop].to_numpy(dtype=float)
+            # 各准则的加权关联度, 形状为 (准则数, 对象数, 等级数)
+            with self.profiler.stage("correlation"):
+                weighted_degrees = (
+                    self.correlation_kernel(block, *domain, self.profiler)
+                    * weights[start:stop].T[:, :, np.newaxis]
+                )
+            with self.profiler.stage("sections"):
+                sections = self.sections(weighted_degrees, hierarchy, tree)
+            yield slice(start, stop), sections
+
+    def stream_boundaries(self, df_chosed, criteria_names, starts, chunk_size):
+        """第一遍: 流式统计各准则的最小值与最大值, 确定经典域与节域."""
+        min_vals = np.full(len(criteria_names), np.nan)
+        max_vals = np.full(len(criteria_names), np.nan)
+        for start in starts:
+            block = df_chosed.iloc[start : start + chunk_size].to_numpy(dtype=float)
+            min_vals = np.fmin(min_vals, np.fmin.reduce(block, axis=0))
+            max_vals = np.fmax(max_vals, np.fmax.reduce(block, axis=0))
+        return self.domain_from_range(min_vals, max_vals, criteria_names)
+
+    def domain_from_range(self, min_vals, max_vals, criteria_names):
+        """由各准则的最小值与最大值确定经典域与节域, 手动设置的经典域优先."""
+        # 读取自动设置的经典域
+        level_boundaries = self.level_boundaries_from_range(
+            dict(zip(criteria_names, min_vals, strict=True)),
+            dict(zip(criteria_names, max_vals, strict=True)),
+        )
+        # 更新手动设置的经典域
+        exist_boundaries = self.params.get("level_boundaries")
+        # 检查并更新存在的键
+        for key, boundaries in exist_boundaries.items():
+            if key in level_boundaries:
+                level_boundaries[key] = boundaries
+        return self.boundary_arrays(level_boundaries, criteria_names)
+
+    @staticmethod
+    def boundary_arrays(level_boundaries, criteria_names):
+        """
+        Arrange the level boundaries as arrays for the correlation kernel.
 
         Returns
         -------
-        result : list
-            The result of the MEE execution.
+        tuple
+            The lower and upper bounds of the classical domains (criteria ×
+            grades, in the order of ``GRADES``), and the lower and upper bounds of
+            the joint domain of every criterion.
         """
-        try:
-            df_chosed = self.norm_df
-            # df_chosed = self.filled_df
-            # 读取自动设置的经典域
-            level_boundaries = self.preprocess_data(df_chosed)
-            # 更新手动设置的经典域
-            exist_boundaries = self.params.get("level_boundaries")
-            # 检查并更新存在的键
-            for key, boundaries in exist_boundaries.items():
-                if key in level_boundaries:
-                    level_boundaries[key] = boundaries
-
-            correlation_degrees = self.perform_computation(level_boundaries, df_chosed)
-
-            weights = pd.DataFrame(
-                self.params["weights"].copy(),
-                columns=self.params["criteria_names"],
-                index=self.params["ids_area"].keys(),
-            )
-            ids_area = self.params["ids_area"]
-            criteria_dict = self.params["criteria_dict"]
+        lower, upper, domain_min, domain_max = [], [], [], []
+        for criterion in criteria_names:
+            boundary = level_boundaries[criterion]
+            lower.append([boundary[grade][0] for grade in GRADES])
+            upper.append([boundary[grade][1] for grade in GRADES])
+            # 节域为全部经典域的并集
+            all_values = [item for sublist in boundary.values() for item in sublist]
+            domain_min.append(min(all_values))
+            domain_max.append(max(all_values))
+        return (
+            np.array(lower, dtype=float),
+            np.array(upper, dtype=float),
+            np.array(domain_min, dtype=float),
+            np.array(domain_max, dtype=float),
+        )
 
-            elements = {
-                f"E{i}": self.get_keys_by_value(criteria_dict, "element", f"E{i}")
-                for i in range(1, 4)
-            }
-            dimensions = {
-                f"D{i}": self.get_keys_by_value(criteria_dict, "dimension", f"D{i}")
-                for i in range(1, 4)
-            }
-            corr_comp = {
-                f"{d}_{e}": pd.DataFrame()
-                for d in ["D1", "D2", "D3"]
-                for e in ["E1", "E2", "E3"]
-            }
-            corr_comp.update({f"E{i}": pd.DataFrame() for i in range(1, 4)})
-
-            result = []
-            for criterion, data in correlation_degrees.items():
-                corr_criterion = data[["待整改", "合格", "良好", "优秀"]] * weights[
-                    criterion
-                ].values.reshape(-1, 1)
-                for d, d_criteria in dimensions.items():
-                    if criterion in d_criteria:
-                        for e, e_criteria in elements.items():
-                            if criterion in e_criteria:
-                                key = f"{d}_{e}"
-                                corr_comp[key] = self.add_to_df(
-                                    corr_comp[key], corr_criterion
-                                )
-                for e, e_criteria in elements.items():
-                    if criterion in e_criteria:
-                        corr_comp[e] = self.add_to_df(corr_comp[e], corr_criterion)
-            for key, value in corr_comp.items():
-                value = copy.deepcopy(value)
-                if value.empty:
-                    continue
-                value["分类等级"] = value.idxmax(axis=1)
-                value["评估对象"] = list(ids_area.keys())
-
-                if key in ["E1", "E2", "E3"]:
-                    for _id, area in ids_area.items():
-                        if _id in self.params["invalid_ids"]:
-                            score = {
-                                "id": _id,
-                                "area": area,
-                                "type": "要素评估",
-                                "element": key,
-                                "rectified_value": "/",
-                                "qualified_value": "/",
-                                "good_value": "/",
-                                "excellent_value": "/",
-                                "level": "/",
-                            }
-                        else:
-                            score = {
-                                "id": _id,
-                                "area": area,
-                                "type": "要素评估",
-                                "element": key,
-                                "rectified_value": value.loc[
-                                    value["评估对象"] == _id, "待整改"
-                                ].values[0],
-                                "qualified_value": value.loc[
-                                    value["评估对象"] == _id, "合格"
-                                ].values[0],
-                                "good_value": value.loc[
-                                    value["评估对象"] == _id, "良好"
-                                ].values[0],
-                                "excellent_value": value.loc[
-                                    value["评估对象"] == _id, "优秀"
-                                ].values[0],
-                                "level": value.loc[
-                                    value["评估对象"] == _id, "分类等级"
-                                ].values[0],
-                            }
-                        result.append(score)
-                elif key.split("_")[0] in ["D1", "D2", "D3"] and key.split("_")[1] in [
-                    "E1",
-                    "E2",
-                    "E3",
-                ]:
-                    for _id, area in ids_area.items():
-                        if _id in self.params["invalid_ids"]:
-                            score = {
-                                "id": _id,
-                                "area": area,
-                                "type": "维度评估",
-                                "dimension": key.split("_")[0],
-                                "element": key.split("_")[1],
-                                "rectified_value": "/",
-                                "qualified_value": "/",
-                                "good_value": "/",
-                                "excellent_value": "/",
-                                "level": "/",
-                            }
-                        else:
-                            score = {
-                                "id": _id,
-                                "area": area,
-                                "type": "维度评估",
-                                "dimension": key.split("_")[0],
-                                "element": key.split("_")[1],
-                                "rectified_value": value.loc[
-                                    value["评估对象"] == _id, "待整改"
-                                ].values[0],
-                                "qualified_value": value.loc[
-                                    value["评估对象"] == _id, "合格"
-                                ].values[0],
-                                "good_value": value.loc[
-                                    value["评估对象"] == _id, "良好"
-                                ].values[0],
-                                "excellent_value": value.loc[
-                                    value["评估对象"] == _id, "优秀"
-                                ].values[0],
-                                "level": value.loc[
-                                    value["评估对象"] == _id, "分类等级"
-                                ].values[0],
-                            }
-                        result.append(score)
-
-            # 计算综合评估结果
-            corr_comp = pd.DataFrame()
-            for criterion, data in correlation_degrees.items():
-                corr_criterion = data[["待整改", "合格", "良好", "优秀"]] * weights[
-                    criterion
-                ].values.reshape(-1, 1)
-                corr_comp = self.add_to_df(corr_comp, corr_criterion)
-
-            corr_comp["分类等级"] = corr_comp.idxmax(axis=1)
-            corr_comp["评估对象"] = list(ids_area.keys())
-
-            for _id, area in ids_area.items():
-                if _id in self.params["invalid_ids"]:
-                    compre_score = {
-                        "id": _id,
-                        "area": area,
-                        "type": "综合评估",
-                        "rectified_value": "/",
-                        "qualified_value": "/",
-                        "good_value": "/",
-                        "excellent_value": "/",
-                        "level": "/",
-                    }
-                else:
-                    compre_score = {
-                        "id": _id,
-                        "area": area,
-                        "type": "综合评估",
-                        "rectified_value": corr_comp.loc[
-                            corr_comp["评估对象"] == _id, "待整改"
-                        ].values[0],
-                        "qualified_value": corr_comp.loc[
-                            corr_comp["评估对象"] == _id, "合格"
-                        ].values[0],
-                        "good_value": corr_comp.loc[
-                            corr_comp["评估对象"] == _id, "良好"
-                        ].values[0],
-                        "excellent_value": corr_comp.loc[
-                            corr_comp["评估对象"] == _id, "优秀"
-                        ].values[0],
-                        "level": corr_comp.loc[
-                            corr_comp["评估对象"] == _id, "分类等级"
-                        ].values[0],
-                    }
-                result.append(compre_score)
-
-            return result
+    @staticmethod
+    def correlation_kernel(
+        values, lower, upper, domain_min, domain_max, profiler=NULL_PROFILER
+    ):
+        """
+        Compute the correlation degrees of a block of objects to every grade.
 
-        except Exception as e:
-            print(f"Exception caught: {type(e).__name__}")
-            print(f"Exception information: {str(e)}")
-            print("Detailed information:")
-            print(traceback.format_exc())
+        The elementary correlation function of every value to the classical
+        domain (``lower``, ``upper``) of each grade within the joint domain
+        (``domain_min``, ``domain_max``) of its criterion. ``values`` holds one row
+        per object and one column per criterion, and the result has the shape
+        (criteria, objects, grades). Each grade is one sub-step of the
+        ``profiler``.
+        """
+        values = values.T
+        _min, _max = domain_min[:, np.newaxis], domain_max[:, np.newaxis]
+        # 节域物元距离, 与等级无关
+        distance_ext = np.abs(values - 0.5 * (_min + _max)) - 0.5 * (_max - _min)
+        degrees = np.empty((*values.shape, len(GRADES)))
+        _epsilon = 1e-10  # 防止除以0
+        for g, grade in enumerate(GRADES):
+            with profiler.stage(grade), np.errstate(divide="ignore", invalid="ignore"):
+                _lower, _upper = lower[:, g, np.newaxis], upper[:, g, np.newaxis]
+                # 经典域物元距离
+                distance_cla = np.abs(values - 0.5 * (_lower + _upper)) - 0.5 * (
+                    _upper - _lower
+                )
+                is_in_range = (distance_cla >= _lower) & (distance_cla <= _upper)
+                equal_distances = np.isclose(distance_cla, distance_ext)
+                degrees[:, :, g] = np.where(
+                    is_in_range,
+                    -distance_cla / np.clip(np.abs(_upper - _lower), _epsilon, None),
+                    # 当距离相等时，关联度设为0
+                    np.where(
+                        equal_distances, 0, distance_cla / (distance_ext - distance_cla)
+                    ),
+                )
+        return degrees
+
+    @staticmethod
+    def sections(weighted_degrees, hierarchy, tree=None):
+        """
+        Sum the weighted correlation degrees of every assessment group.
+
+        Returns
+        -------
+        list of tuple
+            ``(fields, degrees)`` for 维度评估 per dimension/element, 要素评估 per
+            element, 综合评估 and, with a criteria tree, 节点评估 per node.
+        """
+        # 按 维度/要素 和 要素 分段求和, 各组内按准则顺序累加
+        pair_sums = hierarchy.segment_sum(weighted_degrees, "pairs", axis=0)
+        element_sums = hierarchy.segment_sum(weighted_degrees, "elements", axis=0)
+
+        sections = []
+        for (dimension, element), degrees in zip(
+            hierarchy.pairs, pair_sums, strict=True
+        ):
+            fields = {
+                "type": "维度评估",
+                "dimension": dimension,
+                "element": element,
+            }
+            sections.append((fields, degrees))
+        for element, degrees in zip(hierarchy.elements, element_sums, strict=True):
+            sections.append(({"type": "要素评估", "element": element}, degrees))
+        # 计算综合评估结果
+        sections.append(({"type": "综合评估"}, weighted_degrees.sum(axis=0)))
+        # 节点评估: 所有节点的关联度由一次稀疏乘积汇总
+        if tree is not None:
+            n_criteria, n_objects, n_grades = weighted_degrees.shape
+            node_degrees = tree.rollup_sum(
+                weighted_degrees.reshape(n_criteria, -1).T
+            ).T.reshape(len(tree.nodes), n_objects, n_grades)
+            for k, degrees in enumerate(node_degrees):
+                sections.append((tree.fields(k), degrees))
+        return sections
 
     @staticmethod
     def get_keys_by_value(d, value_key, target_value):
         return [k for k, v in d.items() if v[value_key] == target_value]
 
-    @staticmethod
-    def add_to_df(df, new_data):
-        return new_data if df.empty else df + new_data
+    def build_records(self, fields, degrees, ids=None):
+        """
+        Build the records of one assessment group.
+
+        ``degrees`` holds the weighted correlation degree of every object in
+        ``ids`` (by default all objects, in the order of ``ids_area``) to each
+        grade; the grade with the largest degree is the level of the object.
+        """
+        if ids is None:
+            ids = list(self.params["ids_area"])
+        ids_area = self.params["ids_area"]
+        invalid_ids = set(self.params["invalid_ids"])
+        levels = np.where(np.isnan(degrees), -np.inf, degrees).argmax(axis=1)
+        records = []
+        for row, _id in enumerate(ids):
+            record = {"id": _id, "area": ids_area[_id], **fields}
+            if _id in invalid_ids:
+                values = ["/"] * len(GRADES)
+                level = "/"
+            else:
+                values = degrees[row]
+                level = GRADES[levels[row]]
+            record.update(zip(GRADE_FIELDS, values, strict=True))
+            record["level"] = level
+            records.append(record)
+        return records
@@ -4,70 +4,302 @@
 # @Author    :Wenjie Xu
 # @Email     :wenjie.xu.cn@outlook.com
 
+import hashlib
+import warnings
+
 import numpy as np
 
 from ..core.DecisionMethod import DecisionMethod
 
+# Share of the variance covered by the selected components
+VARIANCE_COVERED = 0.95
+
 
 class PCA(DecisionMethod):
+    """
+    Principal Component Analysis.
+
+    The data is read from ``pca_params`` (falling back to the legacy ``data`` key).
+    ``pca_params`` accepts the keys ``data``, ``mode``, ``n_components``,
+    ``oversamples``, ``power_iterations``, ``random_state``, ``chunks``,
+    ``chunk_size`` and ``return_projections``.
+
+    The components cover 95% of the variance, at most ``n_components`` of them
+    in every mode; the result reports the ``variance_covered``, and a warning is
+    issued when the cap stops short of 95%.
+
+    Modes
+    -----
+    full
+        Dense covariance of the standardized data and a full eigendecomposition.
+    randomized
+        Randomized SVD of the standardized data for the top ``n_components``
+        components, without forming the covariance matrix.
+    incremental
+        Streams row chunks and accumulates the scatter matrix, so only one chunk
+        and an m×m matrix are held in memory. ``chunks`` is an iterable of row
+        blocks, or a callable returning one; projections need a second pass, so
+        they require a callable or a re-iterable such as a list.
+
+    Without explicit data PCA runs on the normalized ``norm_df`` and also returns
+    per-criterion ``weights``, so it can be used as an ``objective_method``. The
+    decomposition is cached in the request params by the content of the data, so
+    the weighting step and a later PCA report in the same request decompose the
+    data only once.
+    """
+
+    modes = ("full", "randomized", "incremental")
+
     def __init__(self, parameters):
-        data = np.array(parameters["data"])
-        super().__init__(data)
-        self.data = data
+        super().__init__(parameters)
+        pca_params = parameters.get("pca_params", {})
+        data = pca_params.get("data")
+        # 未提供数据时, 基于归一化后的 norm_df 计算客观权重
+        self.weighting = (
+            data is None and "chunks" not in pca_params and self.norm_df is not None
+        )
+        if self.weighting:
+            data = self.norm_df.to_numpy(dtype=float)
+        elif data is None and "chunks" not in pca_params:
+            data = parameters.get("data")
+        self.data = None if data is None else np.asarray(data, dtype=float)
+        self.mode = pca_params.get("mode", "full")
+        self.n_components = pca_params.get("n_components")
+        self.oversamples = pca_params.get("oversamples", 10)
+        self.power_iterations = pca_params.get("power_iterations", 2)
+        self.random_state = pca_params.get("random_state")
+        self.chunks = pca_params.get("chunks")
+        self.chunk_size = pca_params.get("chunk_size", 100000)
+        self.return_projections = pca_params.get(
+            "return_projections", not self.weighting
+        )
 
     def execute(self):
         """执行主成分分析."""
-        data = np.array(self.data)
-        if data.size == 0 or np.any(np.isnan(data)):
-            return {
-                "error": "Data cannot be empty and must not contain NaN values for PCA."
-            }
+        if self.mode not in self.modes:
+            return {"error": f"Unknown PCA mode: {self.mode}"}
+        if self.mode != "incremental" or self.chunks is None:
+            data = self.data
+            if data is None or data.size == 0 or np.any(np.isnan(data)):
+                return {
+                    "error": "Data cannot be empty and must not contain NaN values for PCA."
+                }
+        if (
+            self.mode == "incremental"
+            and self.return_projections
+            and not self._is_reiterable(self.chunks)
+        ):
+            return {"error": "Projections need a callable or re-iterable chunk source."}
+
+        decomposition = self.decompose()
+        eigenvalues = decomposition["eigenvalues"]
+
+        # 选择前N个特征向量(主成分),N可以根据特征值准则定义
+        total_variance = decomposition["total_variance"]
+        num_components = self.select_number_of_components(eigenvalues, total_variance)
+        principal_components = decomposition["eigenvectors"][:, :num_components]
+        variance_covered = float(np.sum(eigenvalues[:num_components]) / total_variance)
+        if variance_covered < VARIANCE_COVERED:
+            warnings.warn(
+                f"{num_components} PCA components cover {variance_covered:.1%} of "
+                f"the variance, less than {VARIANCE_COVERED:.0%}; raise n_components "
+                "to cover more.",
+                stacklevel=2,
+            )
+
+        result = {
+            "explained_variance": eigenvalues[:num_components].tolist(),
+            "variance_covered": variance_covered,
+            "components": principal_components.tolist(),
+            "mode": self.mode,
+            "description": "PCA method executed successfully.",
+        }
+        if self.weighting:
+            result["status"] = "success"
+            result["weights"] = self.calculate_weights(
+                eigenvalues[:num_components], principal_components
+            ).tolist()
+        if self.return_projections:
+            # 将数据投影到主成分上
+            projected_data = np.concatenate(
+                [
+                    (chunk - decomposition["mean"])
+                    / decomposition["scale"]
+                    @ principal_components
+                    for chunk in self._iter_chunks()
+                ]
+            )
+            result["projected_data"] = projected_data.tolist()
+        return result
+
+    def decompose(self):
+        """
+        Compute the eigenvalues and eigenvectors of the standardized covariance.
+
+        Returns
+        -------
+        dict
+            ``eigenvalues`` in descending order, the matching ``eigenvectors`` as
+            columns, the ``total_variance`` of the standardized data, and the
+            column ``mean`` and ``scale`` used for standardization.
+        """
+        if not self.weighting:
+            return self._decompose()
+        # 键含数据内容的摘要, 替换 norm_df 后不会取到旧的分解
+        digest = hashlib.blake2b(self.data.tobytes(), digest_size=16).hexdigest()
+        cache_key = (
+            self.mode,
+            self.n_components,
+            self.random_state,
+            self.data.shape,
+            digest,
+        )
+        cache = self.params.get("pca_decomposition")
+        if cache is not None and cache["key"] == cache_key:
+            return cache["decomposition"]
+        decomposition = self._decompose()
+        self.params["pca_decomposition"] = {
+            "key": cache_key,
+            "decomposition": decomposition,
+        }
+        return decomposition
+
+    def _decompose(self):
+        if self.mode == "incremental":
+            return self.incremental_decomposition(self._iter_chunks())
 
         # 标准化数据(均值=0,方差=1)
-        standardized_data = self.standardize_data(data)
+        mean, scale = self.standardization_parameters(self.data)
+        standardized_data = (self.data - mean) / scale
+        if self.mode == "randomized":
+            decomposition = self.randomized_decomposition(standardized_data)
+        else:
+            decomposition = self.full_decomposition(standardized_data)
+        decomposition["mean"], decomposition["scale"] = mean, scale
+        return decomposition
+
+    @staticmethod
+    def calculate_weights(explained_variance, principal_components):
+        """
+        以各主成分的方差贡献率加权各准则载荷的绝对值, 归一化后作为准则权重.
+        """
+        variance_share = explained_variance / np.sum(explained_variance)
+        weights = np.abs(principal_components) @ variance_share
+        if weights.sum() == 0:
+            return np.full(len(weights), 1 / len(weights))
+        return weights / weights.sum()
 
+    @staticmethod
+    def full_decomposition(standardized_data):
+        """协方差矩阵的完整特征分解."""
         # 计算协方差矩阵
         covariance_matrix = np.cov(standardized_data, rowvar=False)
+        return PCA._sorted_eigh(covariance_matrix)
 
-        # 计算特征值和特征向量
-        eigenvalues, eigenvectors = np.linalg.eigh(covariance_matrix)
+    def randomized_decomposition(self, standardized_data):
+        """随机化SVD, 仅计算前 n_components 个主成分."""
+        n, m = standardized_data.shape
+        k = min(self.n_components or min(m, 10), m)
+        sketch_size = min(k + self.oversamples, m)
+        rng = np.random.default_rng(self.random_state)
 
-        # 按降序对特征值和特征向量进行排序
-        sorted_indices = np.argsort(eigenvalues)[::-1]
-        eigenvalues = eigenvalues[sorted_indices]
-        eigenvectors = eigenvectors[:, sorted_indices]
+        # 随机投影得到列空间的近似, 并用幂迭代提高精度
+        sample = standardized_data @ rng.standard_normal((m, sketch_size))
+        basis, _ = np.linalg.qr(sample)
+        for _ in range(self.power_iterations):
+            basis, _ = np.linalg.qr(standardized_data.T @ basis)
+            basis, _ = np.linalg.qr(standardized_data @ basis)
+        _, singular_values, vt = np.linalg.svd(
+            basis.T @ standardized_data, full_matrices=False
+        )
+        return {
+            "eigenvalues": singular_values[:k] ** 2 / (n - 1),
+            "eigenvectors": vt[:k].T,
+            "total_variance": np.sum(standardized_data**2) / (n - 1),
+        }
 
-        # 选择前N个特征向量(主成分),N可以根据特征值准则定义
-        num_components = self.select_number_of_components(eigenvalues)
-        principal_components = eigenvectors[:, :num_components]
+    @staticmethod
+    def incremental_decomposition(chunks):
+        """逐块累积散度矩阵, 再对标准化后的协方差矩阵做特征分解."""
+        n, shift, total, scatter = 0, None, None, None
+        for chunk in chunks:
+            chunk = np.asarray(chunk, dtype=float)
+            if shift is None:
+                # 以第一块的均值为平移量, 减少累积平方和时的数值误差
+                shift = chunk.mean(axis=0)
+                total = np.zeros_like(shift)
+                scatter = np.zeros((shift.size, shift.size))
+            centered = chunk - shift
+            n += len(chunk)
+            total += centered.sum(axis=0)
+            scatter += centered.T @ centered
+        if n < 2:
+            raise ValueError("PCA needs at least two rows of data.")
 
-        # 将数据投影到主成分上
-        projected_data = np.dot(standardized_data, principal_components)
+        offset = total / n
+        scatter -= n * np.outer(offset, offset)
+        scale = np.sqrt(np.diag(scatter) / n)
+        scale[scale == 0] = 1
+        covariance_matrix = scatter / (n - 1) / np.outer(scale, scale)
+        decomposition = PCA._sorted_eigh(covariance_matrix)
+        decomposition["mean"], decomposition["scale"] = shift + offset, scale
+        return decomposition
 
+    @staticmethod
+    def _sorted_eigh(covariance_matrix):
+        """计算特征值和特征向量, 并按降序排序."""
+        eigenvalues, eigenvectors = np.linalg.eigh(covariance_matrix)
+        sorted_indices = np.argsort(eigenvalues)[::-1]
         return {
-            "explained_variance": eigenvalues[:num_components].tolist(),
-            "components": principal_components.tolist(),
-            "projected_data": projected_data.tolist(),
-            "description": "PCA method executed successfully.",
+            "eigenvalues": eigenvalues[sorted_indices],
+            "eigenvectors": eigenvectors[:, sorted_indices],
+            "total_variance": np.trace(covariance_matrix),
         }
 
-    def standardize_data(self, data):
-        """将数据标准化,使其均值为零,方差为1"""
+    def _iter_chunks(self):
+        """按块返回数据行."""
+        if self.chunks is None:
+            for start in range(0, len(self.data), self.chunk_size):
+                yield self.data[start : start + self.chunk_size]
+            return
+        chunks = self.chunks() if callable(self.chunks) else self.chunks
+        for chunk in chunks:
+            yield np.asarray(chunk, dtype=float)
+
+    @staticmethod
+    def _is_reiterable(chunks):
+        return chunks is None or callable(chunks) or iter(chunks) is not chunks
+
+    @staticmethod
+    def standardization_parameters(data):
+        """计算标准化所需的均值和标准差, 标准差为0的列保持不缩放."""
         mean = np.mean(data, axis=0)
         std = np.std(data, axis=0)
+        std[std == 0] = 1
+        return mean, std
+
+    def standardize_data(self, data):
+        """将数据标准化,使其均值为零,方差为1"""
+        mean, std = self.standardization_parameters(data)
         standardized_data = (data - mean) / std
         return standardized_data
 
-    def select_number_of_components(self, eigenvalues):
-        """选择主成分的个数.该标准可以基于已解释方差."""
-        total_variance = np.sum(eigenvalues)
+    def select_number_of_components(self, eigenvalues, total_variance=None):
+        """
+        选择主成分的个数.该标准可以基于已解释方差.
+        各模式下个数均不超过 n_components.
+        """
+        if total_variance is None:
+            total_variance = np.sum(eigenvalues)
+        if self.n_components is not None:
+            eigenvalues = eigenvalues[: self.n_components]
         variance_covered = 0.0
         num_components = 0
         for eigenvalue in eigenvalues:
             variance_covered += eigenvalue
             num_components += 1
             if (
-                variance_covered / total_variance >= 0.95
+                variance_covered / total_variance >= VARIANCE_COVERED
             ):  # 95% variance covered criterion
                 break
         return num_components
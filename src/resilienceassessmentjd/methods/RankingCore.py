@@ -0,0 +1,302 @@
+# !/usr/bin/env python
+# @FileName  :RankingCore.py
+# @Time      :2026/10/19 下午3:50
+# @Author    :Wenjie Xu
+# @Email     :wenjie.xu.cn@outlook.com
+
+import traceback
+
+import numpy as np
+
+from ..core.AssessmentContext import AssessmentContext
+from ..core.DecisionMethod import DecisionMethod
+from ..core.Profiler import NULL_PROFILER, group_label
+from ..core.ResultTable import ResultTable
+
+
+class RankingCore:
+    """
+    Vectorized distance and aggregation core of the ranking methods.
+
+    VIKOR, TOPSIS and GRA rank the objects on the same normalized block: the filled
+    data with cost criteria (attribute "1") converted by 1 - x, and every column
+    divided by its absolute sum. The block is derived once per request from the
+    ``AssessmentContext``, and every criteria group (综合评估, 要素评估 per element
+    and 维度评估 per dimension/element) is scored with whole-array operations on a
+    column slice of the block, so several methods are evaluated on one block in a
+    single pass. With a ``CriteriaTree`` every node of the tree is scored as well;
+    the ideal solutions are per criterion, so the criteria terms are computed once
+    and rolled up to all nodes together.
+
+    Parameters
+    ----------
+    params : dict
+        The request params, with the ``context`` of the request. Without a context
+        one is built from the ``Criterion`` params and the ``weights`` matrix.
+    """
+
+    methods = ("VIKOR", "TOPSIS", "GRA")
+
+    def __init__(self, params):
+        self.params = params
+        context = params.get("context")
+        if context is None:
+            context = AssessmentContext.from_params(params)
+        self.context = context
+        self.values = context.derived("ranking_block", self.ranking_block)
+        self.weights = context.weights
+        self.groups = context.groups
+        self.profiler = params.get("profiler") or NULL_PROFILER
+
+    @staticmethod
+    def ranking_block(context):
+        """将成本型准则转换为 1-x, 再按列绝对值之和归一化."""
+        values = context.filled.copy()
+        cost = [attribute == "1" for attribute in context.attributes]
+        # For negative indicators (type 1), a 1-x conversion is required
+        values[:, cost] = 1 - values[:, cost]
+        # Sum each column contiguously (pairwise), as pandas does
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return values / np.ascontiguousarray(np.abs(values).T).sum(axis=1)
+
+    def evaluate(self, methods):
+        """
+        Score every criteria group with each of ``methods`` in one pass.
+
+        Returns
+        -------
+        dict
+            Maps each method name to a list of ``(fields, index_value, level)`` per
+            group, where ``index_value`` holds the score of every object (bigger is
+            better) and ``level`` its rank.
+        """
+        unknown = set(methods) - set(self.methods)
+        if unknown:
+            raise ValueError(f"Unknown ranking methods: {sorted(unknown)}")
+        vikor_v = self.params.get("vikor_params", {}).get("v", 0.5)
+        gra_rho = self.params.get("gra_params", {}).get("rho", 0.5)
+
+        results = {method: [] for method in methods}
+        # 每个分组计为一个子步骤
+        groups = self.profiler.each(self.groups, lambda group: group_label(group[0]))
+        for fields, columns in groups:
+            # Row-contiguous slices keep the row sums in the same (pairwise) order
+            values = np.ascontiguousarray(self.values[:, columns])
+            weights = np.ascontiguousarray(self.weights[:, columns])
+            # Calculate ideal solution and negative ideal solution
+            f_star, f_minus = values.max(axis=0), values.min(axis=0)
+            for method in methods:
+                if method == "VIKOR":
+                    _, _, q = self.vikor(values, weights, f_star, f_minus, vikor_v)
+                    index_value = 1 - q
+                elif method == "TOPSIS":
+                    index_value = self.topsis(values, weights)
+                else:
+                    index_value = self.gra(values, weights, f_star, gra_rho)
+                results[method].append((fields, index_value, self.rank(index_value)))
+        if self.context.tree is not None:
+            with self.profiler.stage("节点评估"):
+                tree_scores = self.evaluate_tree(methods, vikor_v, gra_rho)
+            for method, scores in tree_scores.items():
+                results[method].extend(scores)
+        return results
+
+    def evaluate_tree(self, methods, vikor_v=0.5, gra_rho=0.5):
+        """
+        Score every node of the criteria tree.
+
+        The VIKOR regrets and the squared TOPSIS distances of each criterion do
+        not depend on the group, so they roll up to all nodes with one sparse
+        product (sums) or one segmented reduction (maxima). The GRA coefficients
+        depend on the extreme distances of the node and are computed per node.
+        """
+        tree = self.context.tree
+        values, weights = self.values, self.weights
+        f_star, f_minus = values.max(axis=0), values.min(axis=0)
+
+        results = {method: [] for method in methods}
+        for method in methods:
+            if method == "VIKOR":
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    regret = weights * (f_star - values) / (f_star - f_minus)
+                S = tree.rollup_sum(np.nan_to_num(regret, nan=0.0))
+                R = tree.rollup_max(regret)
+                index_value = 1 - self.compromise(S, R, vikor_v)
+            elif method == "TOPSIS":
+                weighted = weights * values
+                d_positive = tree.rollup_sum((weighted - weighted.max(axis=0)) ** 2)
+                d_negative = tree.rollup_sum((weighted - weighted.min(axis=0)) ** 2)
+                d_positive, d_negative = np.sqrt(d_positive), np.sqrt(d_negative)
+                total = d_positive + d_negative
+                index_value = np.divide(
+                    d_negative, total, out=np.ones_like(total), where=total != 0
+                )
+            else:
+                index_value = np.column_stack(
+                    [
+                        self.gra(
+                            values[:, columns],
+                            weights[:, columns],
+                            f_star[columns],
+                            gra_rho,
+                        )
+                        for columns in map(tree.columns, range(len(tree.nodes)))
+                    ]
+                )
+            for k in range(len(tree.nodes)):
+                node_value = np.ascontiguousarray(index_value[:, k])
+                results[method].append(
+                    (tree.fields(k), node_value, self.rank(node_value))
+                )
+        return results
+
+    def records(self, methods):
+        """按 VIKOR 的输出结构, 为每个方法生成 综合评估/要素评估/维度评估 记录."""
+        scores = self.evaluate(methods)
+        with self.profiler.stage("records"):
+            return {
+                method: self.build_records(method_scores)
+                for method, method_scores in scores.items()
+            }
+
+    def build_records(self, scores):
+        return list(self.iter_records(scores))
+
+    def result_table(self, scores):
+        """由各分组的得分数组直接生成列式结果, 不创建逐条记录."""
+        context = self.context
+        table = ResultTable(context.ids, context.areas, context.invalid)
+        for fields, index_value, level in scores:
+            table.add_group(fields, index_value=index_value, level=level)
+        return table
+
+    def iter_records(self, scores):
+        """逐条生成各分组的记录, 不必在内存中保留整个结果列表."""
+        context = self.context
+        for fields, index_value, level in scores:
+            for _id, row in context.row_of.items():
+                score = {"id": _id, "area": context.areas[row], **fields}
+                if context.invalid[row]:
+                    score["index_value"] = "/"
+                    score["level"] = "/"
+                else:
+                    score["index_value"] = index_value[row]
+                    score["level"] = int(level[row])
+                yield score
+
+    @staticmethod
+    def vikor(values, weights, f_star, f_minus, v=0.5):
+        """
+        Compute the VIKOR group utility S, individual regret R and index Q.
+
+        Criteria without spread (f* = f-) carry no information and are skipped.
+        """
+        with np.errstate(divide="ignore", invalid="ignore"):
+            regret = weights * (f_star - values) / (f_star - f_minus)
+        S = np.nansum(regret, axis=1)
+        R = np.fmax.reduce(regret, axis=1)
+        return S, R, RankingCore.compromise(S, R, v)
+
+    @staticmethod
+    def compromise(S, R, v=0.5):
+        """
+        Compute the VIKOR index Q from S and R.
+
+        ``S`` and ``R`` hold one object per row and may hold one group per column;
+        each column is scaled by its own range.
+        """
+        S_star, S_minus = np.min(S, axis=0), np.max(S, axis=0)
+        R_star, R_minus = np.min(R, axis=0), np.max(R, axis=0)
+        # Avoid dividing by zero
+        S_range = S_minus - S_star
+        R_range = R_minus - R_star
+        S_term = np.divide(
+            S - S_star, S_range, out=np.zeros_like(S), where=S_range != 0
+        )
+        R_term = np.divide(
+            R - R_star, R_range, out=np.zeros_like(R), where=R_range != 0
+        )
+        return v * S_term + (1 - v) * R_term
+
+    @staticmethod
+    def topsis(values, weights):
+        """TOPSIS 相对贴近度: 到负理想解的距离 / (到正、负理想解的距离之和)."""
+        weighted = weights * values
+        d_positive = np.sqrt(((weighted - weighted.max(axis=0)) ** 2).sum(axis=1))
+        d_negative = np.sqrt(((weighted - weighted.min(axis=0)) ** 2).sum(axis=1))
+        total = d_positive + d_negative
+        # 所有对象相同时, 给予满分
+        return np.divide(d_negative, total, out=np.ones_like(total), where=total != 0)
+
+    @staticmethod
+    def gra(values, weights, reference, rho=0.5):
+        """灰色关联度: 以各准则的最优值为参考序列, 按权重加权平均关联系数."""
+        delta = np.abs(reference - values)
+        delta_min, delta_max = delta.min(), delta.max()
+        if delta_max == 0:
+            coefficients = np.ones_like(delta)
+        else:
+            coefficients = (delta_min + rho * delta_max) / (delta + rho * delta_max)
+        weight_sum = weights.sum(axis=1)
+        return np.divide(
+            (weights * coefficients).sum(axis=1),
+            weight_sum,
+            out=coefficients.mean(axis=1),
+            where=weight_sum != 0,
+        )
+
+    @staticmethod
+    def rank(index_value):
+        """
+        Rank the objects by descending index value, NaN last.
+
+        Ties keep the order of ``DataFrame.sort_values(ascending=False)``, so the
+        levels match the original pandas implementation.
+        """
+        missing = np.isnan(index_value)
+        positions = np.flatnonzero(~missing)[::-1]
+        order = positions[index_value[positions].argsort(kind="quicksort")][::-1]
+        order = np.concatenate([order, np.flatnonzero(missing)])
+        level = np.empty(len(index_value), dtype=int)
+        level[order] = np.arange(1, len(index_value) + 1)
+        return level
+
+    @staticmethod
+    def rank_rows(index_values):
+        """Rank every row of a K×n array of index values like ``rank``."""
+        if np.isnan(index_values).any():
+            return np.array([RankingCore.rank(row) for row in index_values])
+        n = index_values.shape[1]
+        # 与 rank 相同: 对逆序的行排序再翻转, 并列时的顺序不变
+        order = index_values[:, ::-1].argsort(axis=1, kind="quicksort")[:, ::-1]
+        levels = np.empty_like(order)
+        np.put_along_axis(levels, n - 1 - order, np.arange(1, n + 1), axis=1)
+        return levels
+
+
+class RankingMethod(DecisionMethod):
+    """
+    Base class of the decision methods scored by the ``RankingCore``.
+
+    Subclasses name their method in ``method``; ``execute`` returns the
+    综合评估/要素评估/维度评估 (and 节点评估) records of that method.
+    """
+
+    method = None
+
+    def execute(self):
+        try:
+            return RankingCore(self.params).records([self.method])[self.method]
+        except Exception as e:
+            print(f"Exception caught: {type(e).__name__}")
+            print(f"Exception information: {str(e)}")
+            print("Detailed information:")
+            print(traceback.format_exc())
+
+    def iter_records(self):
+        core = RankingCore(self.params)
+        yield from core.iter_records(core.evaluate([self.method])[self.method])
+
+    def result_table(self):
+        core = RankingCore(self.params)
+        return core.result_table(core.evaluate([self.method])[self.method])
@@ -0,0 +1,18 @@
+# !/usr/bin/env python
+# @FileName  :TOPSIS.py
+# @Time      :2026/10/19 下午3:55
+# @Author    :Wenjie Xu
+# @Email     :wenjie.xu.cn@outlook.com
+
+from .RankingCore import RankingMethod
+
+
+class TOPSIS(RankingMethod):
+    """
+    Technique for Order Preference by Similarity to an Ideal Solution.
+
+    The objects are ranked by their relative closeness to the ideal solution of the
+    weighted normalized block (bigger is better).
+    """
+
+    method = "TOPSIS"
@@ -1,27 +1,42 @@
 """
 Methods module for ResilienceAssessmentJD.
 This module contains various assessment methods implementations.
+
+Each method is imported on first access, together with its dependencies.
 """
 
-# 导入各种评估方法
-from .AHP import AHP
-from .CombinedMethod import CombinedMethod
-from .DEMATEL import DEMATEL
-from .EWM import EWM
-from .HEWM import HEWM
-from .MACBETH import MACBETH
-from .MEE import MEE
-from .PCA import PCA
-from .VIKOR import VIKOR
+from typing import TYPE_CHECKING
+
+from .._lazy import lazy_package
+
+if TYPE_CHECKING:
+    # 导入各种评估方法
+    from .AHP import AHP
+    from .CombinedMethod import CombinedMethod
+    from .DEMATEL import DEMATEL
+    from .EWM import EWM
+    from .GRA import GRA
+    from .HEWM import HEWM
+    from .HierarchicalAHP import HierarchicalAHP
+    from .MACBETH import MACBETH
+    from .MEE import MEE
+    from .PCA import PCA
+    from .TOPSIS import TOPSIS
+    from .VIKOR import VIKOR
 
 __all__ = [
     "AHP",
     "DEMATEL",
     "EWM",
     "HEWM",
+    "HierarchicalAHP",
     "MEE",
     "PCA",
     "VIKOR",
+    "TOPSIS",
+    "GRA",
     "MACBETH",
     "CombinedMethod",
 ]
+
+lazy_package(__name__, {name: f".{name}" for name in __all__})